@@ -1,15 +1,77 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # Database Configuration
     DATABASE_URL: str
     
+    # Database Connection Pool (per engine, per process)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SLOW_CHECKOUT_MS: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode
+    DB_PGBOUNCER: bool = False
+    
+    # Read Replica (optional; reporting reads and exports)
+    DATABASE_REPLICA_URL: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    # After a user commits a write, their reads stay on the primary this long
+    DB_READ_AFTER_WRITE_SECONDS: int = 10
+    
     # Security Configuration
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     
+    # Authenticated User Cache
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Invalidations reach every process over Redis pub/sub; the TTL bounds
+    # staleness for a process that missed one
+    USER_CACHE_TTL_SECONDS: int = 30
+    # Shared tier in Redis, so a cold process can skip the database
+    USER_CACHE_REDIS: bool = False
+    USER_CACHE_REDIS_TTL_SECONDS: int = 300
+    
+    # Password Hashing
+    # Changing the cost rehashes each user's password at their next login
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # Hashing threads per API process; 0 uses one per CPU core
+    PASSWORD_HASH_WORKERS: int = 0
+    # Hash operations allowed to wait for a thread before /auth returns 503
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
+    # "memory" counts per API process; "redis" shares counts across processes
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_WINDOW_SECONDS: int = 60
+    # Requests per window per user, or per client IP without a valid token
+    RATE_LIMIT_AUTHENTICATED: int = 100
+    RATE_LIMIT_ANONYMOUS: int = 20
+    # Tighter limits for expensive routes ("METHOD /path" -> requests per
+    # window per user), counted on top of the limits above
+    RATE_LIMIT_ROUTES: Dict[str, int] = {
+        "POST /competitor/analyze": 5,
+        "POST /serp/compare": 10,
+        "POST /links/scan": 10,
+        "POST /meta/generate": 20,
+        "POST /meta/generate/stream": 20,
+        "POST /meta/bulk": 2,
+        "POST /meta/bulk/{job_id}/resume": 5,
+        "POST /auth/login": 10,
+        "POST /auth/register": 5,
+        "POST /auth/forgot-password": 5,
+    }
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = ["/health", "/metrics", "/docs", "/redoc", "/openapi.json"]
+    # Proxies (IPs or CIDR ranges) whose X-Forwarded-For / X-Real-IP name
+    # the client; requests from anywhere else are keyed on the peer address
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = ["127.0.0.1", "::1"]
+    
     # Apify Configuration (for web scraping)
     APIFY_API_TOKEN: str
     APIFY_API_URL: str = "https://api.apify.com/v2"
@@ -22,6 +84,78 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # Bulk Meta Generation
+    BULK_META_CONCURRENCY: int = 8
+    BULK_META_BATCH_SIZE: int = 100
+    BULK_META_MAX_URLS: int = 50000
+    # A queued or running job whose last batch commit is older than this is
+    # presumed orphaned (lost message, worker crash) and may be resumed
+    BULK_META_STALE_SECONDS: int = 900
+    
+    # Chunked Scans
+    LINK_SCAN_CHUNK_SIZE: int = 50
+    LINK_CHECK_CONCURRENCY: int = 20
+    SERP_KEYWORD_CHUNK_SIZE: int = 10
+    # Rows per INSERT ... ON CONFLICT statement when persisting scan results
+    LINK_UPSERT_BATCH_SIZE: int = 2000
+    
+    # Celery Payload Serialization
+    CELERY_SERIALIZER: str = "msgpack-zstd"
+    CELERY_COMPRESSION_THRESHOLD: int = 4096
+    CELERY_OFFLOAD_THRESHOLD: int = 1048576
+    CELERY_BLOB_STORE_URL: str = ""
+    CELERY_BLOB_TTL_SECONDS: int = 86400
+    CELERY_RESULT_EXPIRES: int = 86400
+    
+    # List Pagination and Streaming
+    PAGINATION_DEFAULT_LIMIT: int = 100
+    PAGINATION_MAX_LIMIT: int = 1000
+    # Rows fetched per round trip when streaming from a server-side cursor
+    STREAM_YIELD_PER: int = 1000
+    
+    # Response Compression (gzip, or brotli when the brotli package is installed)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    
+    # SERP History Storage
+    SERP_PARTITION_PREMAKE_MONTHS: int = 3
+    SERP_RAW_RETENTION_DAYS: int = 90
+    SERP_DAILY_RETENTION_DAYS: int = 730
+    # Longest range answered from raw rows / daily rollups; longer ranges
+    # read the weekly rollup.
+    SERP_RAW_MAX_RANGE_DAYS: int = 31
+    SERP_DAILY_MAX_RANGE_DAYS: int = 180
+    
+    # Response Cache (ETags and cached bodies for polled endpoints)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+    # Larger responses still get ETags but their bodies are not kept
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 262144
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    # Version tokens in Redis; expiry only costs clients one full response
+    RESPONSE_CACHE_VERSION_TTL_SECONDS: int = 86400
+    
+    # Job Submission Deduplication
+    IDEMPOTENCY_REUSE_WINDOW_SECONDS: int = 300
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 6 * 3600
+    
+    # Scheduler
+    # Catch-up policy for runs missed while the scheduler was down:
+    # "skip" drops them, "once" runs a single catch-up, "all" replays each one
+    # (up to SCHEDULER_MAX_CATCHUP_RUNS per tick).
+    SCHEDULER_TICK_SECONDS: int = 30
+    SCHEDULER_BATCH_SIZE: int = 500
+    SCHEDULER_MAX_JITTER_SECONDS: int = 300
+    SCHEDULER_CATCHUP_POLICY: str = "once"
+    SCHEDULER_MAX_CATCHUP_RUNS: int = 10
+    
+    # Metrics (Prometheus)
+    # /metrics on the API; block it at the proxy, it is not authenticated
+    METRICS_ENABLED: bool = True
+    # Port for a worker's own /metrics endpoint; 0 disables it
+    METRICS_WORKER_PORT: int = 0
+    
     # Email Configuration (SMTP)
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
@@ -0,0 +1,139 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('password_hash', sa.String(), nullable=False),
+        sa.Column('role', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'projects',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+
+    op.create_table(
+        'meta_tags',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('url', sa.String()),
+        sa.Column('input_content', sa.Text()),
+        sa.Column('variants', postgresql.JSONB()),
+        sa.Column('scores', postgresql.JSONB()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+
+    op.create_table(
+        'meta_bulk_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('sitemap_url', sa.String()),
+        sa.Column('urls', postgresql.JSONB()),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('cursor', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+
+    op.create_table(
+        'broken_links',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('source_url', sa.String(), nullable=False),
+        sa.Column('broken_url', sa.String(), nullable=False),
+        sa.Column('status_code', sa.Integer()),
+        sa.Column('first_detected', sa.DateTime()),
+        sa.Column('last_detected', sa.DateTime()),
+    )
+
+    op.create_table(
+        'competitor_analysis',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('target_url', sa.String(), nullable=False),
+        sa.Column('competitor_urls', postgresql.JSONB()),
+        sa.Column('similarity_score', sa.Float()),
+        sa.Column('keyword_gap', postgresql.JSONB()),
+        sa.Column('topic_clusters', postgresql.JSONB()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+
+    op.create_table(
+        'serp_history',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('rank', sa.Integer()),
+        sa.Column('detected_at', sa.DateTime()),
+    )
+
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('job_type', sa.String(), nullable=False),
+        sa.Column('idempotency_key', sa.String()),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('result', postgresql.JSONB()),
+        sa.Column('error', sa.Text()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_jobs_idempotency_key', 'jobs', ['idempotency_key'])
+
+    op.create_table(
+        'schedules',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('task_type', sa.String(), nullable=False),
+        sa.Column('cron_expression', sa.String(), nullable=False),
+        sa.Column('params', postgresql.JSONB(), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=False),
+        sa.Column('jitter_seconds', sa.Integer(), nullable=False),
+        sa.Column('next_run_at', sa.DateTime(), nullable=False),
+        sa.Column('last_run_at', sa.DateTime()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_schedules_project_id', 'schedules', ['project_id'])
+    op.create_index('ix_schedules_enabled_next_run_at', 'schedules', ['enabled', 'next_run_at'])
+
+
+def downgrade():
+    op.drop_table('schedules')
+    op.drop_table('jobs')
+    op.drop_table('serp_history')
+    op.drop_table('competitor_analysis')
+    op.drop_table('broken_links')
+    op.drop_table('meta_bulk_jobs')
+    op.drop_table('meta_tags')
+    op.drop_table('projects')
+    op.drop_table('users')
@@ -0,0 +1,51 @@
+"""composite indexes for list and history queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+Every list endpoint filters by project_id, and rank history reads a keyword
+newest-first. Indexes are built CONCURRENTLY on PostgreSQL so existing
+deployments keep accepting writes while they build.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_projects_owner_id_created_at', 'projects', ['owner_id', 'created_at']),
+    ('ix_meta_tags_project_id_created_at', 'meta_tags', ['project_id', 'created_at']),
+    ('ix_broken_links_project_id_first_detected', 'broken_links', ['project_id', 'first_detected']),
+    ('ix_competitor_analysis_project_id_created_at', 'competitor_analysis', ['project_id', 'created_at']),
+    (
+        'ix_serp_history_project_id_keyword_detected_at',
+        'serp_history',
+        ['project_id', 'keyword', sa.text('detected_at DESC')]
+    ),
+    ('ix_serp_history_keyword_detected_at', 'serp_history', ['keyword', sa.text('detected_at DESC')]),
+]
+
+
+def upgrade():
+    concurrently = op.get_context().dialect.name == 'postgresql'
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=concurrently,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    concurrently = op.get_context().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently, if_exists=True)
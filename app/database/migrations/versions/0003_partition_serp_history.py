@@ -0,0 +1,166 @@
+"""partition serp_history by month and add rank rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+On PostgreSQL serp_history becomes a RANGE-partitioned table with one
+partition per month, so retention drops whole partitions instead of
+deleting rows. Existing rows are copied into the new partitions and the
+daily/weekly rollups are backfilled from them. The copy holds a lock on
+serp_history for its duration; run it in a maintenance window on large
+tables.
+"""
+from datetime import date, datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+HISTORY_INDEXES = [
+    ('ix_serp_history_project_id_keyword_detected_at', ['project_id', 'keyword', sa.text('detected_at DESC')]),
+    ('ix_serp_history_keyword_detected_at', ['keyword', sa.text('detected_at DESC')]),
+]
+
+# Best position per domain per snapshot, folded into one row per bucket.
+BACKFILL_ROLLUP = """
+INSERT INTO {table} (project_id, keyword, domain, bucket, best_rank, worst_rank,
+                     rank_sum, samples, last_rank, last_seen_at)
+SELECT project_id, keyword, domain, {bucket} AS bucket,
+       min(rank), max(rank), sum(rank), count(*),
+       (array_agg(rank ORDER BY detected_at DESC))[1], max(detected_at)
+FROM (
+    SELECT project_id, keyword, domain, detected_at, min(rank) AS rank
+    FROM serp_history
+    WHERE rank IS NOT NULL
+    GROUP BY project_id, keyword, domain, detected_at
+) snapshots
+GROUP BY project_id, keyword, domain, {bucket}
+"""
+
+
+def _next_month(value):
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _rollup_table(name):
+    op.create_table(
+        name,
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), primary_key=True),
+        sa.Column('keyword', sa.String(), primary_key=True),
+        sa.Column('domain', sa.String(), primary_key=True),
+        sa.Column('bucket', sa.Date(), primary_key=True),
+        sa.Column('best_rank', sa.Integer(), nullable=False),
+        sa.Column('worst_rank', sa.Integer(), nullable=False),
+        sa.Column('rank_sum', sa.Integer(), nullable=False),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.Column('last_rank', sa.Integer(), nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=False),
+    )
+
+
+def _upgrade_postgresql():
+    for name, _ in HISTORY_INDEXES:
+        op.drop_index(name, table_name='serp_history', if_exists=True)
+    op.rename_table('serp_history', 'serp_history_unpartitioned')
+    op.execute("ALTER TABLE serp_history_unpartitioned RENAME CONSTRAINT serp_history_pkey TO serp_history_unpartitioned_pkey")
+
+    op.create_table(
+        'serp_history',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('rank', sa.Integer()),
+        sa.Column('detected_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'detected_at'),
+        postgresql_partition_by='RANGE (detected_at)',
+    )
+
+    oldest = None
+    if not op.get_context().as_sql:
+        oldest = op.get_bind().execute(sa.text("SELECT min(detected_at) FROM serp_history_unpartitioned")).scalar()
+    today = datetime.utcnow().date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = date(today.year, today.month, 1)
+    for _ in range(PREMAKE_MONTHS):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE serp_history_y{month:%Y}m{month:%m} PARTITION OF serp_history "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+
+    # Rows without a timestamp cannot be routed to a partition.
+    op.execute(
+        "INSERT INTO serp_history (id, project_id, keyword, domain, rank, detected_at) "
+        "SELECT id, project_id, keyword, domain, rank, "
+        "coalesce(detected_at, (SELECT min(detected_at) FROM serp_history_unpartitioned), now()) "
+        "FROM serp_history_unpartitioned"
+    )
+    op.drop_table('serp_history_unpartitioned')
+
+    for name, columns in HISTORY_INDEXES:
+        op.create_index(name, 'serp_history', columns)
+
+
+def _downgrade_postgresql():
+    op.rename_table('serp_history', 'serp_history_partitioned')
+    op.create_table(
+        'serp_history',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('projects.id'), nullable=False),
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.Column('domain', sa.String(), nullable=False),
+        sa.Column('rank', sa.Integer()),
+        sa.Column('detected_at', sa.DateTime()),
+    )
+    op.execute(
+        "INSERT INTO serp_history (id, project_id, keyword, domain, rank, detected_at) "
+        "SELECT id, project_id, keyword, domain, rank, detected_at FROM serp_history_partitioned"
+    )
+    # Dropping the parent drops its partitions and their indexes.
+    op.drop_table('serp_history_partitioned')
+    for name, columns in HISTORY_INDEXES:
+        op.create_index(name, 'serp_history', columns)
+
+
+def upgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+        daily_bucket, weekly_bucket = "detected_at::date", "date_trunc('week', detected_at)::date"
+    else:
+        op.execute("UPDATE serp_history SET detected_at = CURRENT_TIMESTAMP WHERE detected_at IS NULL")
+        with op.batch_alter_table('serp_history', recreate='always') as batch:
+            batch.alter_column('detected_at', existing_type=sa.DateTime(), nullable=False)
+            batch.create_primary_key('pk_serp_history', ['id', 'detected_at'])
+        daily_bucket, weekly_bucket = None, None
+
+    _rollup_table('serp_rank_daily')
+    _rollup_table('serp_rank_weekly')
+
+    # The backfill relies on array_agg ordering; other dialects start with
+    # empty rollups, which fill as new rankings are recorded.
+    if daily_bucket:
+        op.execute(BACKFILL_ROLLUP.format(table='serp_rank_daily', bucket=daily_bucket))
+        op.execute(BACKFILL_ROLLUP.format(table='serp_rank_weekly', bucket=weekly_bucket))
+
+
+def downgrade():
+    op.drop_table('serp_rank_weekly')
+    op.drop_table('serp_rank_daily')
+
+    if op.get_context().dialect.name == 'postgresql':
+        _downgrade_postgresql()
+    else:
+        with op.batch_alter_table('serp_history', recreate='always') as batch:
+            batch.drop_constraint('pk_serp_history', type_='primary')
+            batch.create_primary_key('pk_serp_history', ['id'])
+            batch.alter_column('detected_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,68 @@
+"""unique broken links per project with status tracking
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+Scans upsert on (project_id, source_url, broken_url), so duplicates of
+that key are collapsed first: the surviving row keeps the earliest
+first_detected and the latest last_detected.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('broken_links', sa.Column('status', sa.String(), nullable=False, server_default='active'))
+    op.add_column('broken_links', sa.Column('resolved_at', sa.DateTime()))
+
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute("""
+            WITH groups AS (
+                SELECT project_id, source_url, broken_url,
+                       min(id::text)::uuid AS keep_id,
+                       min(first_detected) AS first_detected,
+                       max(last_detected) AS last_detected
+                FROM broken_links
+                GROUP BY project_id, source_url, broken_url
+                HAVING count(*) > 1
+            ), merged AS (
+                UPDATE broken_links b
+                SET first_detected = g.first_detected, last_detected = g.last_detected
+                FROM groups g
+                WHERE b.id = g.keep_id
+                RETURNING g.project_id, g.source_url, g.broken_url, g.keep_id
+            )
+            DELETE FROM broken_links b
+            USING merged m
+            WHERE b.project_id = m.project_id
+              AND b.source_url = m.source_url
+              AND b.broken_url = m.broken_url
+              AND b.id <> m.keep_id
+        """)
+    else:
+        op.execute("""
+            DELETE FROM broken_links
+            WHERE id NOT IN (
+                SELECT min(id) FROM broken_links
+                GROUP BY project_id, source_url, broken_url
+            )
+        """)
+
+    with op.batch_alter_table('broken_links') as batch:
+        batch.create_unique_constraint(
+            'uq_broken_links_project_id_source_url_broken_url',
+            ['project_id', 'source_url', 'broken_url']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('broken_links') as batch:
+        batch.drop_constraint('uq_broken_links_project_id_source_url_broken_url', type_='unique')
+        batch.drop_column('resolved_at')
+        batch.drop_column('status')
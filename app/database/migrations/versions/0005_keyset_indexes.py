@@ -0,0 +1,82 @@
+"""match list and history indexes to the keyset page order
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+Cursor-paginated endpoints page newest-first by (timestamp, id), so id now
+closes each index and a page is a single range scan; GET /serp/{project_id}
+also gets an index leading with project_id then detected_at. The
+replacements are built before the old indexes are dropped. serp_history is
+partitioned on PostgreSQL, where indexes cannot be built CONCURRENTLY, so
+its indexes block writes to it while they build.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+OLD_INDEXES = [
+    ('ix_meta_tags_project_id_created_at', 'meta_tags', ['project_id', 'created_at']),
+    ('ix_broken_links_project_id_first_detected', 'broken_links', ['project_id', 'first_detected']),
+    ('ix_competitor_analysis_project_id_created_at', 'competitor_analysis', ['project_id', 'created_at']),
+    (
+        'ix_serp_history_project_id_keyword_detected_at',
+        'serp_history',
+        ['project_id', 'keyword', sa.text('detected_at DESC')]
+    ),
+    ('ix_serp_history_keyword_detected_at', 'serp_history', ['keyword', sa.text('detected_at DESC')]),
+]
+
+NEW_INDEXES = [
+    ('ix_meta_tags_project_id_created_at_id', 'meta_tags', ['project_id', 'created_at', 'id']),
+    ('ix_broken_links_project_id_first_detected_id', 'broken_links', ['project_id', 'first_detected', 'id']),
+    ('ix_competitor_analysis_project_id_created_at_id', 'competitor_analysis', ['project_id', 'created_at', 'id']),
+    (
+        'ix_serp_history_project_id_detected_at_id',
+        'serp_history',
+        ['project_id', sa.text('detected_at DESC'), sa.text('id DESC')]
+    ),
+    (
+        'ix_serp_history_project_id_keyword_detected_at_id',
+        'serp_history',
+        ['project_id', 'keyword', sa.text('detected_at DESC'), sa.text('id DESC')]
+    ),
+    (
+        'ix_serp_history_keyword_detected_at_id',
+        'serp_history',
+        ['keyword', sa.text('detected_at DESC'), sa.text('id DESC')]
+    ),
+]
+
+PARTITIONED_TABLES = ('serp_history',)
+
+
+def _concurrently(table):
+    return op.get_context().dialect.name == 'postgresql' and table not in PARTITIONED_TABLES
+
+
+def _create(indexes):
+    for name, table, columns in indexes:
+        op.create_index(name, table, columns, postgresql_concurrently=_concurrently(table), if_not_exists=True)
+
+
+def _drop(indexes):
+    for name, table, _ in indexes:
+        op.drop_index(name, table_name=table, postgresql_concurrently=_concurrently(table), if_exists=True)
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        _create(NEW_INDEXES)
+        _drop(OLD_INDEXES)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        _create(OLD_INDEXES)
+        _drop(NEW_INDEXES)
@@ -0,0 +1,40 @@
+"""make keyset sort columns NOT NULL
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+List endpoints page by (timestamp, id) with a row-value comparison, which
+is never true for a NULL timestamp: a page ending on such a row had a
+cursor no row could follow. Rows missing the timestamp are backfilled
+(broken links from last_detected, otherwise the table's oldest timestamp,
+so they stay at the end of the newest-first lists) before the columns are
+made NOT NULL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+SORT_KEYS = [
+    ('meta_tags', 'created_at', []),
+    ('competitor_analysis', 'created_at', []),
+    ('broken_links', 'first_detected', ['last_detected']),
+]
+
+
+def upgrade():
+    for table, column, fallbacks in SORT_KEYS:
+        sources = ', '.join([*fallbacks, f"(SELECT min({column}) FROM {table})", 'CURRENT_TIMESTAMP'])
+        op.execute(f"UPDATE {table} SET {column} = coalesce({sources}) WHERE {column} IS NULL")
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table, column, _ in reversed(SORT_KEYS):
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from typing import Dict, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+class PoolStats:
+    """Counters for one engine's connection pool.
+
+    Checkout wait is the time a caller spent inside the pool getting a
+    connection: near zero while idle connections are available, and growing
+    once requests queue behind a saturated pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.pool = None
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.slow_checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def record_checkout(self, wait: float, overflowed: bool, slow_threshold: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            if overflowed:
+                self.overflow_events += 1
+            if wait >= slow_threshold:
+                self.slow_checkouts += 1
+
+    def record_timeout(self, wait: float):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def snapshot(self) -> Dict:
+        pool = self.pool
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+                'wait_seconds_avg': round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                'slow_checkouts': self.slow_checkouts,
+                'overflow_events': self.overflow_events,
+                'timeouts': self.timeouts,
+            }
+        if pool is not None:
+            stats.update({
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+            })
+        return stats
+
+_POOL_STATS: Dict[str, PoolStats] = {}
+
+def pool_stats(name: str) -> PoolStats:
+    if name not in _POOL_STATS:
+        _POOL_STATS[name] = PoolStats(name)
+    return _POOL_STATS[name]
+
+def get_pool_stats() -> Dict[str, Dict]:
+    return {name: stats.snapshot() for name, stats in _POOL_STATS.items()}
+
+def instrumented_pool(base: Type[QueuePool], name: str, slow_checkout_seconds: float) -> Type[QueuePool]:
+    """Subclass ``base`` so every checkout is timed into ``pool_stats(name)``.
+
+    A subclass rather than pool events, since events only fire once a
+    connection has been handed out and cannot see the time spent waiting.
+    ``Pool.recreate()`` keeps the class, so stats survive ``dispose()``.
+    """
+    stats = pool_stats(name)
+
+    class InstrumentedPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            stats.pool = self
+
+        def _do_get(self):
+            overflow_before = self._overflow
+            start = time.perf_counter()
+            try:
+                record = super()._do_get()
+            except exc.TimeoutError:
+                stats.record_timeout(time.perf_counter() - start)
+                logger.warning(
+                    "Connection pool %s exhausted: %d checked out, overflow %d",
+                    name, self.checkedout(), self.overflow()
+                )
+                raise
+
+            wait = time.perf_counter() - start
+            # _overflow counts up from -pool_size as connections are opened,
+            # so only a new connection beyond pool_size is an overflow.
+            overflowed = self._overflow > overflow_before and self._overflow > 0
+            stats.record_checkout(wait, overflowed, slow_checkout_seconds)
+            if wait >= slow_checkout_seconds:
+                logger.warning("Waited %.3fs for a connection from pool %s", wait, name)
+            return record
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
@@ -0,0 +1,72 @@
+import logging
+import time
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.integrations.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when the standby has
+# replayed everything it received (an idle primary would otherwise look
+# like growing lag) or the server is not a standby at all.
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+def _recent_write_key(user_id) -> str:
+    return f"replica:recent_write:{user_id}"
+
+async def mark_recent_write(user_id):
+    """Pin ``user_id``'s reads to the primary for DB_READ_AFTER_WRITE_SECONDS."""
+    try:
+        await get_async_redis().set(_recent_write_key(user_id), 1, ex=settings.DB_READ_AFTER_WRITE_SECONDS)
+    except Exception:
+        logger.warning("Could not record a recent write for user %s", user_id, exc_info=True)
+
+async def has_recent_write(user_id) -> bool:
+    try:
+        return bool(await get_async_redis().exists(_recent_write_key(user_id)))
+    except Exception:
+        # Without the marker we cannot rule out a read-after-write.
+        return True
+
+class ReplicaLagGuard:
+    """Measures replication lag at most every ``check_interval`` seconds.
+
+    The replica counts as fresh while its lag is within ``max_lag``; a failed
+    measurement counts as stale, so reads fall back to the primary.
+    """
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, check_interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._checked_at = float('-inf')
+
+    async def measure(self) -> Optional[float]:
+        if self.engine.dialect.name != 'postgresql':
+            return 0.0
+        try:
+            async with self.engine.connect() as conn:
+                return float(await conn.scalar(LAG_QUERY))
+        except Exception:
+            logger.warning("Could not measure replica lag", exc_info=True)
+            return None
+
+    async def is_fresh(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            # Claim the check before awaiting so concurrent requests reuse the
+            # previous reading instead of all querying the replica at once.
+            self._checked_at = now
+            self.lag = await self.measure()
+            if self.lag is not None and self.lag > self.max_lag:
+                logger.warning("Replica lag %.1fs exceeds %.1fs; reading from primary", self.lag, self.max_lag)
+        return self.lag is not None and self.lag <= self.max_lag
@@ -1,13 +1,147 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import uuid
+from typing import Awaitable, Callable, Dict, List
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.config import settings
+from app.database.pool import instrumented_pool
+from app.metrics import instrument_engine
+from app.database.replica import ReplicaLagGuard, mark_recent_write
 
-engine = create_engine(settings.DATABASE_URL)
+# Sync drivers mapped to their asyncio counterparts, so DATABASE_URL stays the
+# single connection setting for both engines.
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == 'postgresql' and settings.DB_PGBOUNCER:
+        # Transaction pooling hands each transaction to a different server
+        # connection, where asyncpg's cached prepared statements do not exist.
+        parsed = parsed.update_query_dict({'prepared_statement_cache_size': '0'})
+    return parsed.render_as_string(hide_password=False)
+
+def engine_options(url: str, name: str, async_driver: bool) -> Dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:'):
+        return {}
+
+    base_pool = AsyncAdaptedQueuePool if async_driver else QueuePool
+    options = {
+        'poolclass': instrumented_pool(base_pool, name, settings.DB_POOL_SLOW_CHECKOUT_MS / 1000),
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+    }
+    if parsed.get_backend_name() != 'postgresql':
+        return options
+
+    connect_args = {}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer rejects unknown startup parameters, so the statement
+        # timeout has to come from the role instead
+        # (ALTER ROLE ... SET statement_timeout).
+        if async_driver:
+            connect_args['statement_cache_size'] = 0
+            connect_args['prepared_statement_name_func'] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        if async_driver:
+            connect_args['server_settings'] = {'statement_timeout': str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        else:
+            connect_args['options'] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    options['connect_args'] = connect_args
+    return options
+
+# Sync engine: Celery tasks and scripts.
+engine = create_engine(
+    settings.DATABASE_URL,
+    **engine_options(settings.DATABASE_URL, 'primary', async_driver=False)
+)
+instrument_engine(engine, 'primary')
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class PrimarySyncSession(Session):
+    pass
+
+# Awaited with the session's info dict after every PrimarySession commit.
+# Sync session events on a request's session leave their I/O (cache
+# invalidation) here instead of blocking the event loop on it.
+after_commit_hooks: List[Callable[[Dict], Awaitable]] = []
+
+@event.listens_for(PrimarySyncSession, 'after_flush')
+def _flag_write(session, flush_context):
+    session.info['wrote'] = True
+
+class PrimarySession(AsyncSession):
+    """Primary session that pins the requesting user's reads to the primary
+    for a while after they commit a write, so they read their own writes
+    even while the replica lags. ``get_current_user`` sets ``info['user_id']``.
+    """
+    sync_session_class = PrimarySyncSession
+
+    async def commit(self):
+        await super().commit()
+        wrote = self.info.pop('wrote', False)
+        if wrote and read_async_engine is not None and self.info.get('user_id'):
+            await mark_recent_write(self.info['user_id'])
+        for hook in after_commit_hooks:
+            await hook(self.info)
+
+# Async engine: request handlers, so a slow query only suspends its own
+# request instead of blocking the event loop. Objects stay usable after
+# commit, since an expired attribute cannot be lazily reloaded without await.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **engine_options(settings.DATABASE_URL, 'primary_async', async_driver=True)
+)
+instrument_engine(async_engine.sync_engine, 'primary_async')
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=PrimarySession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Optional read replica for reporting endpoints and exports. Without
+# DATABASE_REPLICA_URL every read goes to the primary.
+read_async_engine = None
+ReadSessionLocal = None
+replica_guard = None
+if settings.DATABASE_REPLICA_URL:
+    read_async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_REPLICA_URL),
+        **engine_options(settings.DATABASE_REPLICA_URL, 'replica_async', async_driver=True)
+    )
+    instrument_engine(read_async_engine.sync_engine, 'replica_async')
+    ReadSessionLocal = async_sessionmaker(
+        read_async_engine,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    replica_guard = ReplicaLagGuard(
+        read_async_engine,
+        settings.DB_REPLICA_MAX_LAG_SECONDS,
+        settings.DB_REPLICA_LAG_CHECK_SECONDS
+    )
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
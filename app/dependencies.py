@@ -1,17 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-from app.database.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.database import session as db_session
+from app.database.replica import has_recent_write
+from app.database.session import get_async_db
+from app.services.user_cache import user_cache, user_fields, materialize
 from app.config import settings
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+async def authenticate_token(token: str, db: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -25,11 +26,50 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    fields = await user_cache.get(user_id)
+    if fields is not None:
+        return materialize(fields)
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise credentials_exception
+    await user_cache.set(user_id, user_fields(user))
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user = await authenticate_token(token, db)
+    db.info['user_id'] = str(user.id)
+    return user
+
+async def get_read_sessionmaker(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+) -> async_sessionmaker:
+    """Session factory for read-only endpoints.
+
+    The replica when one is configured, its lag is within
+    DB_REPLICA_MAX_LAG_SECONDS and the user has not written recently;
+    the primary otherwise.
+    """
+    # End the auth lookup's transaction so the request does not hold a
+    # primary connection while it reads from the replica.
+    await db.commit()
+    
+    if db_session.ReadSessionLocal is None:
+        return db_session.AsyncSessionLocal
+    if await has_recent_write(current_user.id):
+        return db_session.AsyncSessionLocal
+    if not await db_session.replica_guard.is_fresh():
+        return db_session.AsyncSessionLocal
+    return db_session.ReadSessionLocal
+
+async def get_read_db(sessions: async_sessionmaker = Depends(get_read_sessionmaker)):
+    async with sessions() as db:
+        yield db
+
 async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
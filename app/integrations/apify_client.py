@@ -1,6 +1,7 @@
-import httpx
 from typing import Dict, List
 from app.config import settings
+from app.integrations.http_client import get_http_client
+from app.metrics import track_integration_call
 
 class ApifyClient:
     def __init__(self):
@@ -9,13 +10,16 @@ class ApifyClient:
         self.headers = {"Authorization": f"Bearer {self.api_token}"}
     
     async def crawl_website(self, domain: str) -> List[Dict]:
-        async with httpx.AsyncClient() as client:
+        client = get_http_client()
+        with track_integration_call("apify", "crawl_website") as call:
             response = await client.post(
                 f"{self.api_url}/acts/apify~website-content-crawler/runs",
                 headers=self.headers,
                 json={"startUrls": [{"url": f"https://{domain}"}]}
             )
-            return []
+            if response.is_error:
+                call.fail()
+        return []
     
     async def scrape_url(self, url: str) -> Dict:
         return {
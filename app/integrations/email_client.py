@@ -2,6 +2,7 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.config import settings
+from app.metrics import track_integration_call
 
 class EmailClient:
     def __init__(self):
@@ -24,10 +25,11 @@ class EmailClient:
             
             msg.attach(MIMEText(body, 'html'))
             
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            with track_integration_call("smtp", "send_email"):
+                with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+                    server.starttls()
+                    server.login(self.smtp_user, self.smtp_password)
+                    server.send_message(msg)
             
             return True
         except Exception as e:
@@ -1,17 +1,35 @@
-import google.generativeai as genai
+from functools import lru_cache
 from app.config import settings
+from app.metrics import track_integration_call
 from typing import List, Dict
 
+@lru_cache(maxsize=None)
+def get_genai():
+    # google.generativeai pulls in grpc and protobuf; import and configure it
+    # on first use so processes that never call Gemini don't pay for it.
+    import google.generativeai as genai
+    
+    if settings.GEMINI_API_KEY:
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+    return genai
+
+@lru_cache(maxsize=None)
+def get_generative_model(model_name: str = 'gemini-pro'):
+    return get_genai().GenerativeModel(model_name)
+
 class GeminiClient:
-    def __init__(self):
-        if settings.GEMINI_API_KEY:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(self, model_name: str = 'gemini-pro'):
+        self.model_name = model_name
+    
+    @property
+    def model(self):
+        return get_generative_model(self.model_name)
     
     async def generate_content(self, prompt: str) -> str:
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            with track_integration_call("gemini", "generate_content"):
+                response = self.model.generate_content(prompt)
+                return response.text
         except Exception as e:
             return f"Error: {str(e)}"
     
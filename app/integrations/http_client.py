@@ -0,0 +1,32 @@
+import asyncio
+import weakref
+import httpx
+
+HTTP_TIMEOUT = 30.0
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+    weakref.WeakKeyDictionary()
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared ``httpx.AsyncClient`` for the running event loop.
+
+    Connection pools are bound to the loop they were created on, so one client
+    is kept per loop: the uvicorn loop in the API and the persistent runtime
+    loop in Celery workers.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=HTTP_LIMITS,
+            follow_redirects=True
+        )
+        _clients[loop] = client
+    return client
+
+async def close_http_client():
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,23 @@
+import asyncio
+import weakref
+from functools import lru_cache
+import redis
+import redis.asyncio as aioredis
+from app.config import settings
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = \
+    weakref.WeakKeyDictionary()
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+def get_async_redis() -> aioredis.Redis:
+    # Like the shared HTTP client, async connection pools belong to the loop
+    # that created them.
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(settings.REDIS_URL)
+        _async_clients[loop] = client
+    return client
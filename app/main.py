@@ -1,7 +1,29 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, projects, meta, links, competitor, serp
+from fastapi.responses import ORJSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from app.routers import auth, projects, meta, links, competitor, serp, jobs
 from app.config import settings
+from app.database.pool import get_pool_stats
+from app.dependencies import get_current_admin
+from app.metrics import latest_metrics
+from app.services.job_service import JobQueueUnavailable, JobSubmissionConflict
+from app.services.password_hasher import password_hasher
+from app.services.response_cache import response_cache
+from app.services.user_cache import user_cache
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.utils.pagination import InvalidCursor
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Drops users other processes changed from this process's cache.
+    invalidation_listener = asyncio.create_task(user_cache.listen())
+    yield
+    invalidation_listener.cancel()
 
 app = FastAPI(
     title="SEO Automation Suite API",
@@ -26,7 +48,9 @@ Most endpoints require authentication using JWT Bearer tokens.
 
 ### Rate Limits
 
-API requests are rate-limited to ensure fair usage and system stability.
+API requests are rate-limited per user (per client IP when unauthenticated) over a
+sliding window, with tighter limits on expensive endpoints such as `/competitor/analyze`.
+Requests over the limit get `429` with a `Retry-After` header.
 
 ### Support
 
@@ -42,9 +66,15 @@ For issues or questions, contact your system administrator.
     },
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Innermost first: compression sees the final body, CORS headers are
+# added to 429 responses too, and request timing covers everything.
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -52,6 +82,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return ORJSONResponse(status_code=400, content={"detail": "Invalid pagination cursor"})
+
+@app.exception_handler(JobQueueUnavailable)
+async def job_queue_unavailable_handler(request: Request, exc: JobQueueUnavailable):
+    return ORJSONResponse(status_code=503, content={"detail": "Job queue unavailable"})
+
+@app.exception_handler(JobSubmissionConflict)
+async def job_submission_conflict_handler(request: Request, exc: JobSubmissionConflict):
+    return ORJSONResponse(
+        status_code=409,
+        content={"detail": "An identical job is being submitted concurrently, retry shortly"},
+        headers={"Retry-After": "1"}
+    )
 
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(projects.router, prefix="/projects", tags=["Projects"])
@@ -59,6 +106,7 @@ app.include_router(meta.router, prefix="/meta", tags=["Meta Tags"])
 app.include_router(links.router, prefix="/links", tags=["Broken Links"])
 app.include_router(competitor.router, prefix="/competitor", tags=["Competitor Analysis"])
 app.include_router(serp.router, prefix="/serp", tags=["SERP Comparator"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
 @app.get("/")
 async def root():
@@ -67,3 +115,30 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_stats(current_user = Depends(get_current_admin)):
+    """Connection pool saturation for this API process, per engine."""
+    return {"pools": get_pool_stats()}
+
+@app.get("/health/user-cache", tags=["Health"])
+async def user_cache_stats(current_user = Depends(get_current_admin)):
+    """Authenticated user cache hit ratio and size for this API process."""
+    return user_cache.stats()
+
+@app.get("/health/password-hasher", tags=["Health"])
+async def password_hasher_stats(current_user = Depends(get_current_admin)):
+    """Password hashing pool occupancy and overload rejections for this API process."""
+    return password_hasher.stats()
+
+@app.get("/health/response-cache", tags=["Health"])
+async def response_cache_stats(current_user = Depends(get_current_admin)):
+    """Share of polled responses answered with 304 or a cached body in this API process."""
+    return response_cache.stats()
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus exposition. Unauthenticated, so deny it at the proxy and
+        scrape the API processes directly."""
+        return Response(latest_metrics(), headers={"Content-Type": CONTENT_TYPE_LATEST})
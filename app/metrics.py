@@ -0,0 +1,148 @@
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Buckets span fast lookups to long external calls and task runs.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TASK_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600, 7200, 14400)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time from request start to the last response byte, by route template',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+INTEGRATION_CALL_DURATION = Histogram(
+    'integration_call_duration_seconds',
+    'Latency of calls to external services',
+    ['integration', 'operation'],
+    buckets=LATENCY_BUCKETS
+)
+INTEGRATION_CALL_ERRORS = Counter(
+    'integration_call_errors_total',
+    'Failed calls to external services',
+    ['integration', 'operation']
+)
+CELERY_TASK_DURATION = Histogram(
+    'celery_task_duration_seconds',
+    'Task run time on the worker',
+    ['task', 'state'],
+    buckets=TASK_BUCKETS
+)
+CELERY_TASK_QUEUE_WAIT = Histogram(
+    'celery_task_queue_wait_seconds',
+    'Time between publishing a task and a worker starting it',
+    ['task', 'queue'],
+    buckets=TASK_BUCKETS
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds',
+    'Statement execution time, by engine and statement type',
+    ['engine', 'operation'],
+    buckets=LATENCY_BUCKETS
+)
+
+class IntegrationCall:
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        """Count the call as an error even though it did not raise."""
+        self.failed = True
+
+@contextmanager
+def track_integration_call(integration: str, operation: str):
+    """Time one call to an external service and count it as an error when it
+    raises or when the caller marks it failed."""
+    call = IntegrationCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.failed = True
+        raise
+    finally:
+        INTEGRATION_CALL_DURATION.labels(integration, operation).observe(time.perf_counter() - start)
+        if call.failed:
+            INTEGRATION_CALL_ERRORS.labels(integration, operation).inc()
+
+def _statement_operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
+def instrument_engine(engine: Engine, name: str):
+    """Time every statement ``engine`` executes. Pass ``sync_engine`` for
+    async engines; the events fire on the underlying DBAPI calls."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _observe(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_start'].pop()
+        DB_QUERY_DURATION.labels(name, _statement_operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, 'handle_error')
+    def _discard_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_start'):
+            conn.info['query_start'].pop()
+
+class StatsCollector:
+    """Publishes the counters the /health endpoints already keep (connection
+    pools, user cache, response cache, password hashing pool) as metrics, read
+    at scrape time."""
+
+    def describe(self):
+        # Without describe, registering calls collect, which would import the
+        # services while app.database.session is still loading.
+        return []
+
+    def collect(self):
+        from app.database.pool import get_pool_stats
+        from app.services.password_hasher import password_hasher
+        from app.services.response_cache import response_cache
+        from app.services.user_cache import user_cache
+        
+        pool_gauges = {
+            'pool_size': GaugeMetricFamily('db_pool_size', 'Configured pool size', labels=['engine']),
+            'checked_out': GaugeMetricFamily('db_pool_checked_out', 'Connections in use', labels=['engine']),
+            'overflow': GaugeMetricFamily('db_pool_overflow', 'Connections open beyond pool_size', labels=['engine']),
+        }
+        pool_counters = {
+            'checkouts': CounterMetricFamily('db_pool_checkouts', 'Connection checkouts', labels=['engine']),
+            'wait_seconds_total': CounterMetricFamily('db_pool_checkout_wait_seconds', 'Time spent waiting for a connection', labels=['engine']),
+            'timeouts': CounterMetricFamily('db_pool_timeouts', 'Checkouts that timed out', labels=['engine']),
+        }
+        for engine, stats in get_pool_stats().items():
+            for key, family in {**pool_gauges, **pool_counters}.items():
+                if key in stats:
+                    family.add_metric([engine], stats[key])
+        yield from pool_gauges.values()
+        yield from pool_counters.values()
+        
+        for prefix, stats in (('user_cache', user_cache.stats()), ('response_cache', response_cache.stats())):
+            yield GaugeMetricFamily(f'{prefix}_size', 'Entries held by this process', value=stats['size'])
+            for key in ('hits', 'misses', 'evictions', 'invalidations', 'redis_hits', 'not_modified'):
+                if key in stats:
+                    yield CounterMetricFamily(f'{prefix}_{key}', f'{prefix} {key.replace("_", " ")}', value=stats[key])
+        
+        hasher = password_hasher.stats()
+        yield GaugeMetricFamily('password_hash_in_flight', 'Hash operations running or queued', value=hasher['in_flight'])
+        yield CounterMetricFamily('password_hash_rejected', 'Hash operations rejected under overload', value=hasher['rejected'])
+
+REGISTRY.register(StatsCollector())
+
+def latest_metrics() -> bytes:
+    """Exposition for this process, or for every process sharing
+    PROMETHEUS_MULTIPROC_DIR when it is set (uvicorn --workers, prefork)."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,52 @@
+import time
+from typing import Dict
+from app.metrics import HTTP_REQUEST_DURATION
+
+class MetricsMiddleware:
+    """Per-route request latency, labelled by the route's path template so that
+    /projects/{project_id} is one series rather than one per project.
+
+    Timing ends when the last body chunk is sent, so streaming responses count
+    their full duration.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Dict = {}
+
+    def _route_template(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # No route matched: one series for every 404 instead of one per path.
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    template = route.path
+                    break
+            else:
+                template = "unmatched"
+            self._templates[endpoint] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], self._route_template(scope), str(status)
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,267 @@
+import ipaddress
+import logging
+import math
+import re
+import time
+from typing import Dict, List, Tuple
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+from app.config import settings
+from app.integrations.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Checks every limit against its sliding-window estimate and only counts the
+# request when all of them pass, so one EVAL covers the user-wide and the
+# route limit. KEYS come in (current window, previous window) pairs; ARGV is
+# the previous window's weight, the key TTL, then one limit per pair.
+_HIT_SCRIPT = """
+local weight = tonumber(ARGV[1])
+local allowed = 1
+local counts = {}
+for i = 1, #KEYS, 2 do
+    local current = tonumber(redis.call('GET', KEYS[i]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i + 1]) or '0')
+    if previous * weight + current + 1 > tonumber(ARGV[2 + (i + 1) / 2]) then
+        allowed = 0
+    end
+    counts[#counts + 1] = current
+    counts[#counts + 1] = previous
+end
+if allowed == 1 then
+    for i = 1, #KEYS, 2 do
+        redis.call('INCR', KEYS[i])
+        redis.call('EXPIRE', KEYS[i], ARGV[2])
+        counts[i] = counts[i] + 1
+    end
+end
+table.insert(counts, 1, allowed)
+return counts
+"""
+
+class RateLimit:
+    """One counter checked against ``limit`` requests per sliding window.
+
+    The window is approximated from two fixed windows: the current count plus
+    the previous window's count weighted by how much of it still overlaps.
+    That keeps state at two integers per key instead of a timestamp per
+    request.
+    """
+
+    def __init__(self, key: str, limit: int):
+        self.key = key
+        self.limit = limit
+
+    def estimate(self, current: int, previous: int, weight: float) -> float:
+        return previous * weight + current
+
+    def retry_after(self, current: int, previous: int, elapsed: float, window: int) -> int:
+        """Seconds until one more request fits under the limit."""
+        if current + 1 > self.limit:
+            # Wait for the next window, where this window's count decays.
+            wait = window - elapsed
+            if current:
+                wait += window * max(0.0, 1 - (self.limit - 1) / current)
+        elif previous:
+            wait = window * (1 - (self.limit - 1 - current) / previous) - elapsed
+        else:
+            wait = 0
+        # Float noise (40.000000001) must not add a whole second.
+        return max(1, math.ceil(round(wait, 6)))
+
+class MemoryBackend:
+    """Counters for a single API process. Each check runs without awaiting,
+    so it is atomic with respect to other requests on the event loop."""
+
+    def __init__(self):
+        self._counters: Dict[str, Tuple[int, int, int]] = {}
+        self._swept_window = 0
+
+    def _sweep(self, window_index: int):
+        # Counters untouched for two windows no longer affect any estimate.
+        if window_index == self._swept_window:
+            return
+        self._swept_window = window_index
+        self._counters = {
+            key: counter for key, counter in self._counters.items()
+            if counter[0] >= window_index - 1
+        }
+
+    def _counts(self, key: str, window_index: int) -> Tuple[int, int]:
+        index, current, previous = self._counters.get(key, (window_index, 0, 0))
+        if index == window_index:
+            return current, previous
+        if index == window_index - 1:
+            return 0, current
+        return 0, 0
+
+    async def hit(self, limits: List[RateLimit], window_index: int, weight: float, window: int) -> Tuple[bool, List[Tuple[int, int]]]:
+        self._sweep(window_index)
+        counts = [self._counts(limit.key, window_index) for limit in limits]
+        allowed = all(
+            limit.estimate(current, previous, weight) + 1 <= limit.limit
+            for limit, (current, previous) in zip(limits, counts)
+        )
+        if allowed:
+            counts = [(current + 1, previous) for current, previous in counts]
+            for limit, (current, previous) in zip(limits, counts):
+                self._counters[limit.key] = (window_index, current, previous)
+        return allowed, counts
+
+    def clear(self):
+        self._counters.clear()
+
+class RedisBackend:
+    """Counters shared by every API process, one round trip per request."""
+
+    async def hit(self, limits: List[RateLimit], window_index: int, weight: float, window: int) -> Tuple[bool, List[Tuple[int, int]]]:
+        keys = []
+        for limit in limits:
+            keys.append(f"ratelimit:{limit.key}:{window_index}")
+            keys.append(f"ratelimit:{limit.key}:{window_index - 1}")
+        result = await get_async_redis().eval(
+            _HIT_SCRIPT,
+            len(keys),
+            *keys,
+            repr(weight),
+            window * 2,
+            *(limit.limit for limit in limits)
+        )
+        counts = [(int(result[i]), int(result[i + 1])) for i in range(1, len(result), 2)]
+        return bool(result[0]), counts
+
+def _compile_routes(routes: Dict[str, int]) -> List[Tuple[str, re.Pattern, str, int]]:
+    compiled = []
+    for rule, limit in routes.items():
+        method, path = rule.split(" ", 1)
+        path_regex, _, _ = compile_path(path.strip())
+        compiled.append((method.upper(), path_regex, rule, limit))
+    return compiled
+
+class RateLimitMiddleware:
+    """Per-user and per-route sliding-window rate limits.
+
+    Requests are counted per user when they carry a valid bearer token and per
+    client IP otherwise, taken from X-Forwarded-For or X-Real-IP when the
+    peer is one of RATE_LIMIT_TRUSTED_PROXIES. Every request counts against
+    the user-wide limit;
+    routes listed in RATE_LIMIT_ROUTES also count against their own, tighter
+    limit. Rejected requests get 429 with Retry-After and are not counted.
+    """
+
+    def __init__(self, app, backend=None):
+        self.app = app
+        self.backend = backend or (RedisBackend() if settings.RATE_LIMIT_BACKEND == "redis" else MemoryBackend())
+        self.window = settings.RATE_LIMIT_WINDOW_SECONDS
+        self.routes = _compile_routes(settings.RATE_LIMIT_ROUTES)
+        self.exempt_paths = settings.RATE_LIMIT_EXEMPT_PATHS
+        self.trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES]
+
+    def _is_exempt(self, path: str) -> bool:
+        return any(path == exempt or path.startswith(exempt + "/") for exempt in self.exempt_paths)
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _client_ip(self, scope) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self._is_trusted(peer):
+            return peer
+        
+        headers = dict(scope.get("headers", ()))
+        forwarded_for = headers.get(b"x-forwarded-for")
+        if forwarded_for:
+            # Each proxy appends the address it got the request from, so the
+            # first untrusted one from the right is the client; anything to
+            # its left was sent by the client and could be forged.
+            addresses = [address.strip() for address in forwarded_for.decode("latin-1").split(",")]
+            for address in reversed(addresses):
+                if address and not self._is_trusted(address):
+                    return address
+            return addresses[0] or peer
+        real_ip = headers.get(b"x-real-ip")
+        if real_ip:
+            return real_ip.decode("latin-1").strip()
+        return peer
+
+    def _identity(self, scope) -> Tuple[str, bool]:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer":
+                    break
+                try:
+                    user_id = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+                except JWTError:
+                    break
+                if user_id:
+                    return f"user:{user_id}", True
+                break
+        return f"ip:{self._client_ip(scope)}", False
+
+    def _limits(self, scope) -> List[RateLimit]:
+        identity, authenticated = self._identity(scope)
+        # The braces keep one identity's keys in the same Redis Cluster slot.
+        limits = [RateLimit(
+            f"{{{identity}}}",
+            settings.RATE_LIMIT_AUTHENTICATED if authenticated else settings.RATE_LIMIT_ANONYMOUS
+        )]
+        for method, path_regex, rule, limit in self.routes:
+            if scope["method"] == method and path_regex.match(scope["path"]):
+                limits.append(RateLimit(f"{{{identity}}}:{rule}", limit))
+                break
+        return limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or self._is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        
+        limits = self._limits(scope)
+        now = time.time()
+        window_index, elapsed = divmod(now, self.window)
+        window_index = int(window_index)
+        weight = 1 - elapsed / self.window
+        try:
+            allowed, counts = await self.backend.hit(limits, window_index, weight, self.window)
+        except Exception:
+            # Availability beats enforcement when the counter store is down.
+            logger.warning("Rate limit backend unavailable, allowing request", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+        
+        # Report whichever limit is closest to running out.
+        remaining, binding = min(
+            (max(0, math.floor(limit.limit - limit.estimate(current, previous, weight))), limit.limit)
+            for limit, (current, previous) in zip(limits, counts)
+        )
+        headers = {
+            "X-RateLimit-Limit": str(binding),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int((window_index + 1) * self.window)),
+        }
+        
+        if not allowed:
+            headers["Retry-After"] = str(max(
+                limit.retry_after(current, previous, elapsed, self.window)
+                for limit, (current, previous) in zip(limits, counts)
+                if limit.estimate(current, previous, weight) + 1 > limit.limit
+            ))
+            response = JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"}, headers=headers)
+            await response(scope, receive, send)
+            return
+        
+        raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *raw_headers]}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
@@ -1,15 +1,22 @@
 from app.models.user import User
 from app.models.project import Project
-from app.models.meta import MetaTag
+from app.models.meta import MetaTag, MetaBulkJob
 from app.models.links import BrokenLink
 from app.models.competitor import CompetitorAnalysis
-from app.models.serp import SerpHistory
+from app.models.serp import SerpHistory, SerpRankDaily, SerpRankWeekly
+from app.models.job import Job
+from app.models.schedule import Schedule
 
 __all__ = [
     'User',
     'Project',
     'MetaTag',
+    'MetaBulkJob',
     'BrokenLink',
     'CompetitorAnalysis',
-    'SerpHistory'
+    'SerpHistory',
+    'SerpRankDaily',
+    'SerpRankWeekly',
+    'Job',
+    'Schedule'
 ]
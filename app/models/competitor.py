@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import uuid
 from app.database.base import Base
@@ -12,6 +13,11 @@ class CompetitorAnalysis(Base):
     target_url = Column(String, nullable=False)
     competitor_urls = Column(JSONB)
     similarity_score = Column(Float)
-    keyword_gap = Column(JSONB)
-    topic_clusters = Column(JSONB)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Report payload, loaded only by the report endpoint via undefer_group.
+    keyword_gap = deferred(Column(JSONB), group="report", raiseload=True)
+    topic_clusters = deferred(Column(JSONB), group="report", raiseload=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_competitor_analysis_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
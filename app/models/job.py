@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+from app.database.base import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    job_type = Column(String, nullable=False)
+    idempotency_key = Column(String, index=True)
+    status = Column(String, nullable=False, default="queued")
+    progress = Column(Integer, nullable=False, default=0)
+    result = Column(JSONB)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
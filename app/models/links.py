@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -12,5 +12,14 @@ class BrokenLink(Base):
     source_url = Column(String, nullable=False)
     broken_url = Column(String, nullable=False)
     status_code = Column(Integer)
-    first_detected = Column(DateTime, default=datetime.utcnow)
+    first_detected = Column(DateTime, nullable=False, default=datetime.utcnow)
     last_detected = Column(DateTime, default=datetime.utcnow)
+    # "active" while the latest scan still finds the link, "resolved" once a
+    # complete scan no longer does.
+    status = Column(String, nullable=False, default="active")
+    resolved_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_broken_links_project_id_first_detected_id", "project_id", "first_detected", "id"),
+        UniqueConstraint("project_id", "source_url", "broken_url", name="uq_broken_links_project_id_source_url_broken_url"),
+    )
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import uuid
 from app.database.base import Base
@@ -10,7 +11,30 @@ class MetaTag(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
     url = Column(String)
-    input_content = Column(Text)
+    # Full page text: never loaded unless a query asks for it with undefer(),
+    # and raiseload turns an accidental lazy load into an error instead of a
+    # hidden query per row.
+    input_content = deferred(Column(Text), raiseload=True)
     variants = Column(JSONB)
     scores = Column(JSONB)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_meta_tags_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
+
+class MetaBulkJob(Base):
+    __tablename__ = "meta_bulk_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    sitemap_url = Column(String)
+    # Up to BULK_META_MAX_URLS entries; only the worker reads it.
+    urls = deferred(Column(JSONB), raiseload=True)
+    status = Column(String, nullable=False, default="queued")
+    cursor = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
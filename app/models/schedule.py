@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+from app.database.base import Base
+
+class Schedule(Base):
+    __tablename__ = "schedules"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
+    task_type = Column(String, nullable=False)
+    cron_expression = Column(String, nullable=False)
+    params = Column(JSONB, nullable=False, default=dict)
+    enabled = Column(Boolean, nullable=False, default=True)
+    jitter_seconds = Column(Integer, nullable=False, default=0)
+    next_run_at = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # The scheduler tick only ever reads the due head of this index.
+    __table_args__ = (
+        Index("ix_schedules_enabled_next_run_at", "enabled", "next_run_at"),
+    )
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Date, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
 from app.database.base import Base
 
 class SerpHistory(Base):
+    """Raw rank observations, range-partitioned by month on PostgreSQL.
+
+    Partitions are created ahead of time and dropped after
+    SERP_RAW_RETENTION_DAYS by ``maintain_serp_history_task``; longer ranges
+    are served from the daily and weekly rollups below.
+    """
     __tablename__ = "serp_history"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -12,4 +18,44 @@ class SerpHistory(Base):
     keyword = Column(String, nullable=False)
     domain = Column(String, nullable=False)
     rank = Column(Integer)
-    detected_at = Column(DateTime, default=datetime.utcnow)
+    # Part of the primary key: a partitioned table's unique constraints must
+    # include the partition column.
+    detected_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    
+    # Reads go newest-first by (detected_at, id): a project's history, or one
+    # keyword per project or across all.
+    __table_args__ = (
+        Index("ix_serp_history_project_id_detected_at_id", "project_id", detected_at.desc(), id.desc()),
+        Index("ix_serp_history_project_id_keyword_detected_at_id", "project_id", "keyword", detected_at.desc(), id.desc()),
+        Index("ix_serp_history_keyword_detected_at_id", "keyword", detected_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (detected_at)"},
+    )
+
+class SerpRankDaily(Base):
+    __tablename__ = "serp_rank_daily"
+    
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), primary_key=True)
+    keyword = Column(String, primary_key=True)
+    domain = Column(String, primary_key=True)
+    bucket = Column(Date, primary_key=True)
+    best_rank = Column(Integer, nullable=False)
+    worst_rank = Column(Integer, nullable=False)
+    rank_sum = Column(Integer, nullable=False)
+    samples = Column(Integer, nullable=False)
+    last_rank = Column(Integer, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
+
+class SerpRankWeekly(Base):
+    __tablename__ = "serp_rank_weekly"
+    
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), primary_key=True)
+    keyword = Column(String, primary_key=True)
+    domain = Column(String, primary_key=True)
+    # Monday of the ISO week
+    bucket = Column(Date, primary_key=True)
+    best_rank = Column(Integer, nullable=False)
+    worst_rank = Column(Integer, nullable=False)
+    rank_sum = Column(Integer, nullable=False)
+    samples = Column(Integer, nullable=False)
+    last_rank = Column(Integer, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
@@ -1,8 +1,9 @@
 from typing import List, Dict
-from sklearn.cluster import KMeans
-import numpy as np
 
 def cluster_topics(embeddings: List[List[float]], n_clusters: int = 5) -> List[Dict]:
+    import numpy as np
+    from sklearn.cluster import KMeans
+    
     if len(embeddings) < n_clusters:
         n_clusters = len(embeddings)
     
@@ -1,12 +1,11 @@
 from typing import List
-import google.generativeai as genai
 from app.config import settings
+from app.integrations.gemini_client import get_genai
 
 async def generate_embeddings(text: str) -> List[float]:
     try:
         if settings.GEMINI_API_KEY:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            result = genai.embed_content(
+            result = get_genai().embed_content(
                 model="models/embedding-001",
                 content=text
             )
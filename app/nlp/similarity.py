@@ -1,7 +1,8 @@
 from typing import List
-import numpy as np
 
 def compute_similarity(embedding1: List[float], embedding2: List[float]) -> float:
+    import numpy as np
+    
     vec1 = np.array(embedding1)
     vec2 = np.array(embedding2)
     
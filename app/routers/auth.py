@@ -1,17 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.database.session import get_db
+from app.database.session import get_async_db
 from app.models.user import User
 from app.dependencies import get_current_user
 from app.config import settings
+from app.services.password_hasher import password_hasher, PasswordHasherBusy
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent authentication requests, retry shortly",
+        headers={"Retry-After": "1"}
+    )
 
 class RegisterRequest(BaseModel):
     email: EmailStr
@@ -58,7 +65,7 @@ class TokenResponse(BaseModel):
     description="Create a new user account with email and password",
     response_description="User created successfully"
 )
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account:
     
@@ -68,19 +75,23 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     
     Returns the created user's ID, email, and role.
     """
-    existing_user = db.query(User).filter(User.email == request.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == request.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = pwd_context.hash(request.password)
+    try:
+        hashed_password = await password_hasher.hash(request.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    
     user = User(
         email=request.email,
         password_hash=hashed_password,
         role="manager"
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return {
         "user_id": str(user.id),
@@ -93,7 +104,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     summary="User login",
     description="Authenticate user and receive JWT access token"
 )
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate with email and password:
     
@@ -102,9 +113,19 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
     
     Returns a JWT access token for authenticated requests.
     """
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not pwd_context.verify(request.password, user.password_hash):
+    user = await db.scalar(select(User).where(User.email == request.email))
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(request.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = jwt.encode(
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer_group
+from app.config import settings
+from app.database.session import get_async_db
 from app.models.competitor import CompetitorAnalysis
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db, get_read_sessionmaker
+from app.services.job_service import JobService
+from app.services.response_cache import response_cache, competitor_scope
+from app.utils.pagination import paginate, keyset
+from app.utils.streaming import ndjson_response
 from app.workers.tasks.competitor_tasks import analyze_competitor_task
 from pydantic import BaseModel
-from typing import List
+from typing import Any, List, Literal, Optional
+from datetime import datetime
 from uuid import UUID
 
 router = APIRouter()
@@ -27,73 +35,118 @@ class CompetitorAnalyzeRequest(BaseModel):
             }
         }
 
+class CompetitorAnalysisItem(BaseModel):
+    id: UUID
+    target_url: str
+    competitor_urls: Optional[List[Any]]
+    similarity_score: Optional[float]
+    created_at: Optional[datetime]
+
+class CompetitorAnalysisListResponse(BaseModel):
+    analyses: List[CompetitorAnalysisItem]
+    next_cursor: Optional[str]
+
 @router.post("/analyze",
     summary="Analyze competitors",
     description="Perform AI-powered competitor content analysis and identify keyword gaps"
 )
 async def analyze_competitor(
     request: CompetitorAnalyzeRequest,
-    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    background_tasks.add_task(
-        analyze_competitor_task,
+    service = JobService(db)
+    job, created = await service.get_or_create_job(
         request.project_id,
-        request.competitor_urls,
-        request.target_url
+        current_user.id,
+        "competitor_analysis",
+        params={"target_url": request.target_url, "competitor_urls": request.competitor_urls}
     )
+    if created:
+        await service.dispatch(
+            job,
+            analyze_competitor_task,
+            args=(request.project_id, request.competitor_urls, request.target_url),
+            kwargs={"job_id": str(job.id)}
+        )
     
     return {
         "message": "Competitor analysis started",
-        "status": "processing"
+        "job_id": str(job.id),
+        "status": job.status,
+        "deduplicated": not created
     }
 
-@router.get("/{project_id}")
+@router.get("/{project_id}", response_model=CompetitorAnalysisListResponse)
 async def get_competitor_analyses(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_read_db),
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
     current_user = Depends(get_current_user)
 ):
-    analyses = db.query(CompetitorAnalysis).filter(
-        CompetitorAnalysis.project_id == project_id
-    ).all()
+    """
+    Competitor analyses for a project, newest first. Keyword gaps and topic
+    clusters are returned by `/competitor/report/{analysis_id}`.
     
-    return {"analyses": analyses}
+    Pass `next_cursor` from a page as `cursor` to fetch the next one.
+    `format=ndjson` streams every remaining row, one JSON object per line.
+    """
+    query = select(
+        CompetitorAnalysis.id,
+        CompetitorAnalysis.target_url,
+        CompetitorAnalysis.competitor_urls,
+        CompetitorAnalysis.similarity_score,
+        CompetitorAnalysis.created_at
+    ).where(CompetitorAnalysis.project_id == project_id)
+    order = [CompetitorAnalysis.created_at, CompetitorAnalysis.id]
+    
+    if format == "ndjson":
+        return ndjson_response(keyset(query, order, cursor), sessions=sessions)
+    
+    analyses, next_cursor = await paginate(db, query, order, cursor, limit)
+    return {"analyses": analyses, "next_cursor": next_cursor}
 
 @router.get("/report/{analysis_id}")
 async def get_analysis_report(
     analysis_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    analysis = db.query(CompetitorAnalysis).filter(
-        CompetitorAnalysis.id == analysis_id
-    ).first()
-    
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Analysis not found")
+    """
+    Keyword gaps and topic clusters for one analysis. Returns an `ETag`; send
+    it back as `If-None-Match` to get `304 Not Modified` while it is unchanged.
+    """
+    async def load():
+        analysis = await db.get(CompetitorAnalysis, analysis_id, options=[undefer_group("report")])
+        
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        
+        return {
+            "analysis_id": str(analysis.id),
+            "similarity_score": analysis.similarity_score,
+            "keyword_gap": analysis.keyword_gap,
+            "topic_clusters": analysis.topic_clusters
+        }
     
-    return {
-        "analysis_id": str(analysis.id),
-        "similarity_score": analysis.similarity_score,
-        "keyword_gap": analysis.keyword_gap,
-        "topic_clusters": analysis.topic_clusters
-    }
+    return await response_cache.respond(request, current_user.id, [competitor_scope(analysis_id)], load, db=db)
 
 @router.delete("/report/{analysis_id}")
 async def delete_analysis(
     analysis_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    analysis = db.query(CompetitorAnalysis).filter(
-        CompetitorAnalysis.id == analysis_id
-    ).first()
+    analysis = await db.get(CompetitorAnalysis, analysis_id)
     
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    db.delete(analysis)
-    db.commit()
+    await db.delete(analysis)
+    await db.commit()
     
     return {"message": "Analysis deleted successfully"}
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_async_db
+from app.dependencies import get_current_user, authenticate_token
+from app.models.user import User
+from app.services.job_service import JobService, job_response, JOB_TERMINAL_STATES, MAX_WAIT_SECONDS
+from typing import Optional
+from uuid import UUID
+
+router = APIRouter()
+
+@router.get("/{job_id}",
+    summary="Get job status",
+    description="Get the state and progress of a background job, optionally long-polling for a change"
+)
+async def get_job(
+    job_id: UUID,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    last_status: Optional[str] = None,
+    last_progress: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a job's current state:
+    
+    - **wait**: Seconds to hold the request open until the job changes (max 30)
+    - **last_status** / **last_progress**: The state the client already has;
+      the request returns as soon as the job differs from it or finishes
+    """
+    service = JobService(db)
+    job = await service.get_job(job_id, owner_id=current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    job = await service.wait_for_change(job, last_status, last_progress, wait)
+    return job_response(job)
+
+@router.websocket("/{job_id}/ws")
+async def job_updates(
+    websocket: WebSocket,
+    job_id: UUID,
+    token: str = Query(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Push job updates until the job completes or fails. Authenticate with the
+    access token in the `token` query parameter.
+    """
+    try:
+        user = await authenticate_token(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    service = JobService(db)
+    job = await service.get_job(job_id, owner_id=user.id)
+    if not job:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    try:
+        await websocket.send_json(job_response(job))
+        while job.status not in JOB_TERMINAL_STATES:
+            previous = (job.status, job.progress)
+            job = await service.wait_for_change(job, job.status, job.progress, MAX_WAIT_SECONDS)
+            if (job.status, job.progress) != previous:
+                await websocket.send_json(job_response(job))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database.session import get_async_db
 from app.models.links import BrokenLink
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db, get_read_sessionmaker
+from app.services.job_service import JobService, MAX_WAIT_SECONDS
+from app.utils.pagination import paginate, keyset
+from app.utils.streaming import ndjson_response, export_response
 from app.workers.tasks.link_tasks import scan_broken_links_task
 from pydantic import BaseModel
-from uuid import UUID, uuid4
+from typing import List, Literal, Optional
+from datetime import datetime
+from uuid import UUID
 
 router = APIRouter()
 
@@ -21,61 +28,152 @@ class LinkScanRequest(BaseModel):
             }
         }
 
+class BrokenLinkItem(BaseModel):
+    id: UUID
+    source_url: str
+    broken_url: str
+    status_code: Optional[int]
+    status: str
+    first_detected: Optional[datetime]
+    last_detected: Optional[datetime]
+    resolved_at: Optional[datetime]
+
+class BrokenLinkListResponse(BaseModel):
+    project_id: str
+    broken_links: List[BrokenLinkItem]
+    next_cursor: Optional[str]
+
 @router.post("/scan",
     summary="Scan for broken links",
     description="Start a background scan to detect broken links on a domain"
 )
 async def scan_links(
     request: LinkScanRequest,
-    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    scan_id = str(uuid4())
-    background_tasks.add_task(
-        scan_broken_links_task,
-        scan_id,
+    service = JobService(db)
+    job, created = await service.get_or_create_job(
         request.project_id,
-        request.domain
+        current_user.id,
+        "link_scan",
+        params={"domain": request.domain.lower()}
     )
+    if created:
+        await service.dispatch(
+            job,
+            scan_broken_links_task,
+            args=(str(job.id), request.project_id, request.domain)
+        )
     
     return {
-        "scan_id": scan_id,
-        "status": "queued"
+        "scan_id": str(job.id),
+        "status": job.status,
+        "deduplicated": not created
     }
 
 @router.get("/scan/{scan_id}")
-async def get_scan_status(scan_id: str):
+async def get_scan_status(
+    scan_id: UUID,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    last_status: Optional[str] = None,
+    last_progress: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    service = JobService(db)
+    job = await service.get_job(scan_id, owner_id=current_user.id, job_type="link_scan")
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    
+    job = await service.wait_for_change(job, last_status, last_progress, wait)
     return {
-        "scan_id": scan_id,
-        "status": "completed",
-        "progress": 100
+        "scan_id": str(job.id),
+        "status": job.status,
+        "progress": job.progress,
+        "summary": job.result,
+        "error": job.error
     }
 
-@router.get("/{project_id}")
+@router.get("/{project_id}", response_model=BrokenLinkListResponse)
 async def get_broken_links(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    status: Optional[Literal["active", "resolved"]] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_read_db),
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
     current_user = Depends(get_current_user)
 ):
-    broken_links = db.query(BrokenLink).filter(
-        BrokenLink.project_id == project_id
-    ).all()
+    """
+    Broken links for a project, newest first by when each was first
+    detected.
+    
+    - **status**: Only `active` links (still found by the latest scan) or
+      `resolved` ones
     
+    Pass `next_cursor` from a page as `cursor` to fetch the next one.
+    `format=ndjson` streams every remaining row, one JSON object per line.
+    """
+    query = select(
+        BrokenLink.id,
+        BrokenLink.source_url,
+        BrokenLink.broken_url,
+        BrokenLink.status_code,
+        BrokenLink.status,
+        BrokenLink.first_detected,
+        BrokenLink.last_detected,
+        BrokenLink.resolved_at
+    ).where(BrokenLink.project_id == project_id)
+    if status:
+        query = query.where(BrokenLink.status == status)
+    order = [BrokenLink.first_detected, BrokenLink.id]
+    
+    if format == "ndjson":
+        return ndjson_response(keyset(query, order, cursor), sessions=sessions)
+    
+    broken_links, next_cursor = await paginate(db, query, order, cursor, limit)
     return {
         "project_id": str(project_id),
-        "broken_links": [
-            {
-                "source_url": link.source_url,
-                "broken_url": link.broken_url,
-                "status_code": link.status_code
-            }
-            for link in broken_links
-        ]
+        "broken_links": broken_links,
+        "next_cursor": next_cursor
     }
 
 @router.get("/{project_id}/export")
 async def export_broken_links(
     project_id: UUID,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
     current_user = Depends(get_current_user)
 ):
-    return {"message": "Export functionality", "format": "csv"}
+    """
+    Download every broken link for a project as CSV or NDJSON.
+    
+    Rows are streamed from the database as they are read, so the download
+    starts immediately regardless of size. `gzip=true` compresses on the fly.
+    """
+    columns = [
+        BrokenLink.source_url,
+        BrokenLink.broken_url,
+        BrokenLink.status_code,
+        BrokenLink.status,
+        BrokenLink.first_detected,
+        BrokenLink.last_detected,
+        BrokenLink.resolved_at
+    ]
+    query = keyset(
+        select(*columns).where(BrokenLink.project_id == project_id),
+        [BrokenLink.first_detected, BrokenLink.id]
+    )
+    
+    return export_response(
+        query,
+        [column.key for column in columns],
+        f"broken-links-{project_id}",
+        format=format,
+        gzip=gzip,
+        sessions=sessions
+    )
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database.session import get_db
-from app.models.meta import MetaTag
-from app.dependencies import get_current_user
-from app.workers.tasks.meta_tasks import generate_meta_tags_task
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer
+from app.database.session import get_async_db, AsyncSessionLocal
+from app.models.meta import MetaTag, MetaBulkJob
+from app.dependencies import get_current_user, get_read_db, get_read_sessionmaker
+from app.config import settings
+from app.integrations.apify_client import ApifyClient
+from app.services.meta_generator import MetaGeneratorService
+from app.services.job_service import JobService
+from app.utils.pagination import paginate, keyset
+from app.utils.scoring import score_meta_tag
+from app.utils.streaming import ndjson_response, export_response
+from app.workers.celery_app import PRIORITY_BULK
+from app.workers.tasks.meta_tasks import generate_meta_tags_task, generate_bulk_meta_task
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Literal, Optional, List
+from datetime import datetime, timedelta
 from uuid import UUID
 
 router = APIRouter()
@@ -24,48 +37,326 @@ class MetaGenerateRequest(BaseModel):
             }
         }
 
+class MetaStreamRequest(MetaGenerateRequest):
+    keywords: List[str] = []
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "project_id": "123e4567-e89b-12d3-a456-426614174000",
+                "url": "https://example.com/page",
+                "keywords": ["seo tools", "meta tags"]
+            }
+        }
+
+class MetaBulkRequest(BaseModel):
+    project_id: str
+    sitemap_url: Optional[str] = None
+    urls: Optional[List[str]] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "project_id": "123e4567-e89b-12d3-a456-426614174000",
+                "sitemap_url": "https://example.com/sitemap.xml"
+            }
+        }
+
+class MetaTagItem(BaseModel):
+    id: UUID
+    url: Optional[str]
+    variants: Optional[Any]
+    scores: Optional[Any]
+    created_at: Optional[datetime]
+
+class MetaTagListResponse(BaseModel):
+    meta_tags: List[MetaTagItem]
+    next_cursor: Optional[str]
+
+def _bulk_job_response(job: MetaBulkJob) -> dict:
+    return {
+        "job_id": str(job.id),
+        "project_id": str(job.project_id),
+        "status": job.status,
+        "processed": job.processed,
+        "failed": job.failed,
+        "cursor": job.cursor,
+        "error": job.error,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None
+    }
+
 @router.post("/generate",
     summary="Generate meta tags",
     description="Generate AI-powered meta tags for a URL or content using Gemini"
 )
 async def generate_meta(
     request: MetaGenerateRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    background_tasks.add_task(
-        generate_meta_tags_task,
+    service = JobService(db)
+    job, created = await service.get_or_create_job(
         request.project_id,
-        request.url,
-        request.content
+        current_user.id,
+        "meta_generate",
+        params={"url": request.url, "content": request.content}
     )
+    if created:
+        await service.dispatch(
+            job,
+            generate_meta_tags_task,
+            args=(request.project_id, request.url, request.content),
+            kwargs={"job_id": str(job.id)}
+        )
     
     return {
         "message": "Meta tag generation started",
-        "status": "processing"
+        "job_id": str(job.id),
+        "status": job.status,
+        "deduplicated": not created
     }
 
-@router.get("/{project_id}")
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/generate/stream",
+    summary="Stream generated meta tags",
+    description="Stream meta tag variants and their scores over Server-Sent Events as Gemini produces them"
+)
+async def stream_meta(
+    request: MetaStreamRequest,
+    current_user = Depends(get_current_user)
+):
+    """
+    Generate meta tags and stream them as Server-Sent Events:
+    
+    - `variant` events carry one variant with its `score_meta_tag` scores
+    - a final `done` event carries the ID of the persisted meta tag record
+    - an `error` event is sent instead if generation fails
+    """
+    if not request.url and not request.content:
+        raise HTTPException(status_code=400, detail="Either url or content is required")
+    
+    async def event_stream():
+        service = MetaGeneratorService()
+        variants = []
+        scores = {}
+        
+        try:
+            content = request.content
+            if not content:
+                scraped = await ApifyClient().scrape_url(request.url)
+                content = scraped.get('text', '')
+            
+            async for variant in service.stream_meta_variants(content, request.url):
+                variants.append(variant)
+                key = f"variant_{len(variants)}"
+                scores[key] = score_meta_tag(
+                    variant['title'],
+                    variant['description'],
+                    request.keywords
+                )
+                yield _sse_event("variant", {
+                    "variant_id": key,
+                    "title": variant['title'],
+                    "description": variant['description'],
+                    "scores": scores[key]
+                })
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        
+        if not variants:
+            yield _sse_event("error", {"detail": "No meta tag variants were generated"})
+            return
+        
+        # The request-scoped session may already be released once the
+        # response starts streaming, so persist with a session of our own.
+        async with AsyncSessionLocal() as db:
+            meta_tag = MetaTag(
+                project_id=request.project_id,
+                url=request.url,
+                input_content=content,
+                variants=variants,
+                scores=scores
+            )
+            db.add(meta_tag)
+            await db.commit()
+            meta_id = str(meta_tag.id)
+        
+        yield _sse_event("done", {"meta_id": meta_id, "variant_count": len(variants)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.post("/bulk",
+    summary="Bulk generate meta tags",
+    description="Generate meta tags for every URL in a sitemap (or sitemap index) or an explicit URL list"
+)
+async def generate_bulk_meta(
+    request: MetaBulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Start a bulk meta tag generation job:
+    
+    - **sitemap_url**: Sitemap or sitemap index to stream URLs from
+    - **urls**: Explicit list of page URLs (used in addition to the sitemap)
+    
+    Returns a job ID whose progress can be polled at `/meta/bulk/{job_id}`.
+    """
+    if not request.sitemap_url and not request.urls:
+        raise HTTPException(status_code=400, detail="Either sitemap_url or urls is required")
+    if request.urls and len(request.urls) > settings.BULK_META_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_META_MAX_URLS} URLs can be submitted per job"
+        )
+    
+    job = MetaBulkJob(
+        project_id=request.project_id,
+        sitemap_url=request.sitemap_url,
+        urls=request.urls,
+        status="queued"
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    
+    await JobService(db).dispatch(job, generate_bulk_meta_task, args=(str(job.id),), priority=PRIORITY_BULK)
+    
+    return _bulk_job_response(job)
+
+@router.get("/bulk/{job_id}")
+async def get_bulk_meta_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    job = await db.get(MetaBulkJob, job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    
+    return _bulk_job_response(job)
+
+@router.post("/bulk/{job_id}/resume")
+async def resume_bulk_meta_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    job = await db.get(MetaBulkJob, job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk job not found")
+    if job.status == "completed":
+        raise HTTPException(status_code=400, detail="Bulk job already completed")
+    # Every batch commit bumps updated_at, so a queued or running job that
+    # has not committed for a while lost its message or its worker and can
+    # be taken over. Claiming it is one conditional UPDATE, so concurrent
+    # resumes enqueue it once.
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=settings.BULK_META_STALE_SECONDS)
+    claimed = await db.execute(update(MetaBulkJob).where(
+        MetaBulkJob.id == job.id,
+        or_(
+            MetaBulkJob.status == "failed",
+            and_(
+                MetaBulkJob.status.in_(("queued", "running")),
+                or_(MetaBulkJob.updated_at.is_(None), MetaBulkJob.updated_at < stale_before)
+            )
+        )
+    ).values(status="queued", updated_at=now))
+    if claimed.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Bulk job is already queued or running")
+    await db.commit()
+    await db.refresh(job)
+    
+    await JobService(db).dispatch(job, generate_bulk_meta_task, args=(str(job.id),), priority=PRIORITY_BULK)
+    
+    return _bulk_job_response(job)
+
+@router.get("/{project_id}", response_model=MetaTagListResponse)
 async def get_meta_tags(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_read_db),
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
+    current_user = Depends(get_current_user)
+):
+    """
+    Generated meta tags for a project, newest first. The source content is
+    left out; fetch a single record for it.
+    
+    Pass `next_cursor` from a page as `cursor` to fetch the next one.
+    `format=ndjson` streams every remaining row, one JSON object per line.
+    """
+    query = select(
+        MetaTag.id,
+        MetaTag.url,
+        MetaTag.variants,
+        MetaTag.scores,
+        MetaTag.created_at
+    ).where(MetaTag.project_id == project_id)
+    order = [MetaTag.created_at, MetaTag.id]
+    
+    if format == "ndjson":
+        return ndjson_response(keyset(query, order, cursor), sessions=sessions)
+    
+    meta_tags, next_cursor = await paginate(db, query, order, cursor, limit)
+    return {"meta_tags": meta_tags, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/export")
+async def export_meta_tags(
+    project_id: UUID,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
     current_user = Depends(get_current_user)
 ):
-    meta_tags = db.query(MetaTag).filter(MetaTag.project_id == project_id).all()
-    return {"meta_tags": meta_tags}
+    """
+    Download every generated meta tag for a project as CSV or NDJSON.
+    
+    In CSV, `variants` and `scores` are JSON-encoded cells. `gzip=true`
+    compresses on the fly.
+    """
+    columns = [MetaTag.id, MetaTag.url, MetaTag.variants, MetaTag.scores, MetaTag.created_at]
+    query = keyset(
+        select(*columns).where(MetaTag.project_id == project_id),
+        [MetaTag.created_at, MetaTag.id]
+    )
+    
+    return export_response(
+        query,
+        [column.key for column in columns],
+        f"meta-tags-{project_id}",
+        format=format,
+        gzip=gzip,
+        sessions=sessions
+    )
 
 @router.get("/{project_id}/{meta_id}")
 async def get_meta_tag(
     project_id: UUID,
     meta_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    meta_tag = db.query(MetaTag).filter(
+    meta_tag = await db.scalar(select(MetaTag).options(undefer(MetaTag.input_content)).where(
         MetaTag.id == meta_id,
         MetaTag.project_id == project_id
-    ).first()
+    ))
     
     if not meta_tag:
         raise HTTPException(status_code=404, detail="Meta tag not found")
@@ -76,18 +367,18 @@ async def get_meta_tag(
 async def delete_meta_tag(
     project_id: UUID,
     meta_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    meta_tag = db.query(MetaTag).filter(
+    meta_tag = await db.scalar(select(MetaTag).where(
         MetaTag.id == meta_id,
         MetaTag.project_id == project_id
-    ).first()
+    ))
     
     if not meta_tag:
         raise HTTPException(status_code=404, detail="Meta tag not found")
     
-    db.delete(meta_tag)
-    db.commit()
+    await db.delete(meta_tag)
+    await db.commit()
     
     return {"message": "Meta tag deleted successfully"}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_async_db
 from app.models.project import Project
 from app.models.user import User
 from app.dependencies import get_current_user
+from app.services.response_cache import response_cache, project_scope
 from pydantic import BaseModel
 from typing import List
 from uuid import UUID
@@ -45,7 +47,7 @@ class ProjectResponse(BaseModel):
 )
 async def create_project(
     request: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     project = Project(
@@ -54,8 +56,8 @@ async def create_project(
         owner_id=current_user.id
     )
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return {
         "project_id": str(project.id),
@@ -70,10 +72,12 @@ async def create_project(
     description="Get all projects owned by the authenticated user"
 )
 async def get_projects(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    projects = db.query(Project).filter(Project.owner_id == current_user.id).all()
+    projects = (await db.scalars(
+        select(Project).where(Project.owner_id == current_user.id)
+    )).all()
     return [
         {
             "project_id": str(p.id),
@@ -87,61 +91,69 @@ async def get_projects(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.owner_id == current_user.id
-    ).first()
-    
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    """
+    Returns an `ETag`; send it back as `If-None-Match` to get `304 Not Modified`
+    while the project is unchanged.
+    """
+    async def load():
+        project = await db.scalar(select(Project).where(
+            Project.id == project_id,
+            Project.owner_id == current_user.id
+        ))
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        return {
+            "project_id": str(project.id),
+            "name": project.name,
+            "domain": project.domain,
+            "created_at": project.created_at.isoformat()
+        }
     
-    return {
-        "project_id": str(project.id),
-        "name": project.name,
-        "domain": project.domain,
-        "created_at": project.created_at.isoformat()
-    }
+    return await response_cache.respond(request, current_user.id, [project_scope(project_id)], load)
 
 @router.put("/{project_id}")
 async def update_project(
     project_id: UUID,
     request: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.owner_id == current_user.id
-    ).first()
+    ))
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     project.name = request.name
     project.domain = request.domain
-    db.commit()
+    await db.commit()
     
     return {"message": "Project updated successfully"}
 
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.owner_id == current_user.id
-    ).first()
+    ))
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     
     return {"message": "Project deleted successfully"}
 
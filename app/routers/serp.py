@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database.session import get_async_db
 from app.models.serp import SerpHistory
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db, get_read_sessionmaker
+from app.services.job_service import JobService, MAX_WAIT_SECONDS
+from app.services.response_cache import response_cache, serp_scopes
+from app.services.serp_service import SerpService
+from app.utils.pagination import paginate, keyset
+from app.utils.streaming import ndjson_response, export_response
 from app.workers.tasks.serp_tasks import compare_serp_task
 from pydantic import BaseModel
-from typing import List
-from uuid import UUID, uuid4
+from typing import List, Literal, Optional
+from datetime import datetime
+from uuid import UUID
 
 router = APIRouter()
 
@@ -24,58 +32,232 @@ class SerpCompareRequest(BaseModel):
             }
         }
 
+class SerpDataItem(BaseModel):
+    id: UUID
+    keyword: str
+    domain: str
+    rank: Optional[int]
+    detected_at: datetime
+
+class SerpDataListResponse(BaseModel):
+    serp_data: List[SerpDataItem]
+    next_cursor: Optional[str]
+
+class KeywordHistoryItem(BaseModel):
+    id: UUID
+    project_id: UUID
+    domain: str
+    rank: Optional[int]
+    detected_at: datetime
+
+class KeywordHistoryListResponse(BaseModel):
+    keyword: str
+    history: List[KeywordHistoryItem]
+    next_cursor: Optional[str]
+
 @router.post("/compare",
     summary="Compare SERP rankings",
     description="Track and compare search engine result page rankings for keywords"
 )
 async def compare_serp(
     request: SerpCompareRequest,
-    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    comparison_id = str(uuid4())
-    background_tasks.add_task(
-        compare_serp_task,
-        comparison_id,
+    service = JobService(db)
+    job, created = await service.get_or_create_job(
         request.project_id,
-        request.keywords,
-        request.location
+        current_user.id,
+        "serp_compare",
+        params={
+            "keywords": [k.lower() for k in request.keywords],
+            "location": request.location.lower()
+        }
     )
+    if created:
+        await service.dispatch(
+            job,
+            compare_serp_task,
+            args=(str(job.id), request.project_id, request.keywords, request.location)
+        )
     
     return {
-        "comparison_id": comparison_id,
-        "status": "processing"
+        "comparison_id": str(job.id),
+        "status": job.status,
+        "deduplicated": not created
     }
 
-@router.get("/{project_id}")
+@router.get("/{project_id}", response_model=SerpDataListResponse)
 async def get_serp_data(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_read_db),
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
+    current_user = Depends(get_current_user)
+):
+    """
+    Recorded rankings for a project, newest first.
+    
+    Pass `next_cursor` from a page as `cursor` to fetch the next one.
+    `format=ndjson` streams every remaining row, one JSON object per line.
+    JSON pages carry an `ETag` that stays valid until new rankings are recorded.
+    """
+    query = select(
+        SerpHistory.id,
+        SerpHistory.keyword,
+        SerpHistory.domain,
+        SerpHistory.rank,
+        SerpHistory.detected_at
+    ).where(SerpHistory.project_id == project_id)
+    order = [SerpHistory.detected_at, SerpHistory.id]
+    
+    if format == "ndjson":
+        return ndjson_response(keyset(query, order, cursor), sessions=sessions)
+    
+    async def load():
+        serp_data, next_cursor = await paginate(db, query, order, cursor, limit)
+        return {"serp_data": serp_data, "next_cursor": next_cursor}
+    
+    return await response_cache.respond(
+        request, current_user.id, serp_scopes(project_id), load, db=db, response_model=SerpDataListResponse
+    )
+
+@router.get("/{project_id}/export")
+async def export_serp_history(
+    project_id: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
+    current_user = Depends(get_current_user)
+):
+    """
+    Download recorded rankings for a project as CSV or NDJSON.
+    
+    - **start** / **end**: Optional range; bounding it lets PostgreSQL skip
+      partitions outside the range
+    - **gzip**: Compress on the fly
+    """
+    columns = [SerpHistory.keyword, SerpHistory.domain, SerpHistory.rank, SerpHistory.detected_at]
+    query = select(*columns).where(SerpHistory.project_id == project_id)
+    if start:
+        query = query.where(SerpHistory.detected_at >= start)
+    if end:
+        query = query.where(SerpHistory.detected_at <= end)
+    
+    return export_response(
+        keyset(query, [SerpHistory.detected_at, SerpHistory.id]),
+        [column.key for column in columns],
+        f"serp-history-{project_id}",
+        format=format,
+        gzip=gzip,
+        sessions=sessions
+    )
+
+@router.get("/{project_id}/rank-history",
+    summary="Rank history",
+    description="Rank series per keyword and domain, read from raw rows or daily/weekly rollups"
+)
+async def get_rank_history(
+    project_id: UUID,
+    request: Request,
+    keywords: List[str] = Query(...),
+    domain: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Literal["auto", "raw", "daily", "weekly"] = "auto",
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user)
 ):
-    serp_data = db.query(SerpHistory).filter(
-        SerpHistory.project_id == project_id
-    ).all()
+    """
+    Rank history for one or more keywords over a date range.
+    
+    - **keywords**: Repeat the parameter for each keyword
+    - **domain**: Only return this domain's series
+    - **start** / **end**: Range bounds, defaulting to the last 30 days
+    - **granularity**: `auto` picks raw observations for short recent ranges,
+      daily rollups up to SERP_DAILY_MAX_RANGE_DAYS and weekly rollups beyond
+    
+    Responses carry an `ETag` that stays valid until new rankings are recorded.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
     
-    return {"serp_data": serp_data}
+    async def load():
+        return await SerpService().get_rank_history(
+            db,
+            project_id,
+            keywords,
+            domain=domain,
+            start=start,
+            end=end,
+            granularity=granularity
+        )
+    
+    # Without explicit bounds the range moves with the clock.
+    variant = "" if start and end else datetime.utcnow().date().isoformat()
+    return await response_cache.respond(request, current_user.id, serp_scopes(project_id), load, db=db, variant=variant)
 
-@router.get("/history/{keyword}")
+@router.get("/history/{keyword}", response_model=KeywordHistoryListResponse)
 async def get_keyword_history(
     keyword: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    project_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_read_db),
+    sessions: async_sessionmaker = Depends(get_read_sessionmaker),
     current_user = Depends(get_current_user)
 ):
-    history = db.query(SerpHistory).filter(
-        SerpHistory.keyword == keyword
-    ).order_by(SerpHistory.detected_at.desc()).all()
+    query = select(
+        SerpHistory.id,
+        SerpHistory.project_id,
+        SerpHistory.domain,
+        SerpHistory.rank,
+        SerpHistory.detected_at
+    ).where(SerpHistory.keyword == keyword)
+    if project_id is not None:
+        query = query.where(SerpHistory.project_id == project_id)
+    order = [SerpHistory.detected_at, SerpHistory.id]
+    
+    if format == "ndjson":
+        return ndjson_response(keyset(query, order, cursor), sessions=sessions)
     
-    return {"keyword": keyword, "history": history}
+    async def load():
+        history, next_cursor = await paginate(db, query, order, cursor, limit)
+        return {"keyword": keyword, "history": history, "next_cursor": next_cursor}
+    
+    return await response_cache.respond(
+        request, current_user.id, serp_scopes(project_id), load, db=db, response_model=KeywordHistoryListResponse
+    )
 
 @router.get("/compare/{comparison_id}")
-async def get_comparison(comparison_id: str):
+async def get_comparison(
+    comparison_id: UUID,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    last_status: Optional[str] = None,
+    last_progress: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    service = JobService(db)
+    job = await service.get_job(comparison_id, owner_id=current_user.id, job_type="serp_compare")
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Comparison not found")
+    
+    job = await service.wait_for_change(job, last_status, last_progress, wait)
     return {
-        "comparison_id": comparison_id,
-        "status": "completed"
+        "comparison_id": str(job.id),
+        "status": job.status,
+        "progress": job.progress,
+        "results": job.result,
+        "error": job.error
     }
 
 @router.delete("/{comparison_id}")
@@ -1,25 +1,64 @@
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
+from app.config import settings
 from app.integrations.apify_client import ApifyClient
+from app.integrations.http_client import get_http_client
 
 class BrokenLinkService:
     def __init__(self):
         self.apify_client = ApifyClient()
     
     async def scan_domain(self, domain: str) -> List[Dict]:
-        crawl_results = await self.apify_client.crawl_website(domain)
+        pages = await self.crawl_pages(domain)
+        return await self.find_broken_links(pages)
+    
+    async def crawl_pages(self, domain: str) -> List[Dict]:
+        return await self.apify_client.crawl_website(domain)
+    
+    async def find_broken_links(self, pages: List[Dict]) -> List[Dict]:
+        unchecked = {
+            link['url']
+            for page in pages
+            for link in page.get('links', [])
+            if link.get('status_code') is None
+        }
+        statuses = await self._check_links(unchecked)
         
         broken_links = []
-        for page in crawl_results:
+        for page in pages:
             for link in page.get('links', []):
-                if link.get('status_code', 200) >= 400:
+                status_code = link.get('status_code') or statuses.get(link['url']) or 200
+                if status_code >= 400:
                     broken_links.append({
                         'source_url': page['url'],
                         'broken_url': link['url'],
-                        'status_code': link['status_code']
+                        'status_code': status_code
                     })
         
         return broken_links
     
+    async def _check_links(self, urls) -> Dict[str, int]:
+        semaphore = asyncio.Semaphore(settings.LINK_CHECK_CONCURRENCY)
+        
+        async def check(url: str) -> Optional[int]:
+            async with semaphore:
+                return await self._fetch_status(url)
+        
+        urls = list(urls)
+        results = await asyncio.gather(*(check(url) for url in urls))
+        return {url: status for url, status in zip(urls, results) if status}
+    
+    async def _fetch_status(self, url: str) -> Optional[int]:
+        client = get_http_client()
+        try:
+            response = await client.head(url)
+            if response.status_code == 405:
+                response = await client.get(url)
+            return response.status_code
+        except Exception:
+            # Unreachable hosts are reported like a gateway failure.
+            return 599
+    
     async def check_redirect_chains(self, url: str) -> Dict:
         return {
             'url': url,
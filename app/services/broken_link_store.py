@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.links import BrokenLink
+
+def persist_scan(
+    db: Session,
+    project_id: str,
+    broken_links: List[Dict],
+    detected_at: Optional[datetime] = None,
+    resolve_missing: bool = True,
+    batch_size: Optional[int] = None
+) -> Dict:
+    """Upsert a scan's broken links and resolve the ones it no longer found.
+
+    New links are inserted with first_detected = last_detected = detected_at;
+    known links keep first_detected and get a fresh last_detected and status
+    code. Each batch is one INSERT ... ON CONFLICT DO UPDATE, so a scan costs
+    len(broken_links) / batch_size statements rather than a query per link.
+    Pass ``resolve_missing=False`` for partial scans, where a link that was
+    not seen may simply not have been checked.
+    """
+    detected_at = detected_at or datetime.utcnow()
+    batch_size = batch_size or settings.LINK_UPSERT_BATCH_SIZE
+    
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    rows = {
+        (link['source_url'], link['broken_url']): {
+            'project_id': project_id,
+            'source_url': link['source_url'],
+            'broken_url': link['broken_url'],
+            'status_code': link.get('status_code'),
+            'first_detected': detected_at,
+            'last_detected': detected_at,
+            'status': 'active',
+            'resolved_at': None
+        }
+        for link in broken_links
+    }
+    rows = list(rows.values())
+    
+    dialect_insert = pg_insert if db.get_bind().dialect.name == 'postgresql' else sqlite_insert
+    for start in range(0, len(rows), batch_size):
+        stmt = dialect_insert(BrokenLink).values(rows[start:start + batch_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['project_id', 'source_url', 'broken_url'],
+            set_={
+                'status_code': stmt.excluded.status_code,
+                'last_detected': stmt.excluded.last_detected,
+                'status': 'active',
+                'resolved_at': None
+            }
+        )
+        db.execute(stmt)
+    
+    resolved = 0
+    if resolve_missing:
+        # Every link this scan found now has last_detected = detected_at.
+        result = db.execute(
+            update(BrokenLink)
+            .where(
+                BrokenLink.project_id == project_id,
+                BrokenLink.status == 'active',
+                BrokenLink.last_detected < detected_at
+            )
+            .values(status='resolved', resolved_at=detected_at)
+        )
+        resolved = result.rowcount
+    
+    return {'upserted': len(rows), 'resolved': resolved}
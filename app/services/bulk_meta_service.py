@@ -0,0 +1,207 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import undefer
+from sqlalchemy.orm.attributes import set_committed_value
+from app.config import settings
+from app.database.session import SessionLocal
+from app.integrations.apify_client import ApifyClient
+from app.models.meta import MetaTag, MetaBulkJob
+from app.services.meta_generator import MetaGeneratorService
+from app.services.sitemap_service import SitemapService
+from app.utils.scoring import score_meta_tag
+from app.utils.scraper_utils import extract_text_from_html
+
+logger = logging.getLogger(__name__)
+
+class JobSuperseded(Exception):
+    """Another run resumed the job from this run's cursor."""
+
+class BulkMetaService:
+    """Runs a bulk meta generation job as a bounded streaming pipeline.
+
+    URLs flow from the sitemap (or the job's URL list) into a queue of at most
+    ``concurrency`` in-flight page tasks. Results are drained in input order and
+    committed together with the job cursor every ``batch_size`` URLs, so a
+    restarted job resumes exactly where the last commit left off.
+
+    The sync session's I/O runs in a thread, since the pipeline shares the
+    worker's event loop with other tasks.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.concurrency = concurrency or settings.BULK_META_CONCURRENCY
+        self.batch_size = batch_size or settings.BULK_META_BATCH_SIZE
+        self.apify_client = ApifyClient()
+        self.meta_generator = MetaGeneratorService()
+        self.sitemap_service = SitemapService()
+
+    async def run(self, job_id: str) -> Dict:
+        # The job row is the only long-lived object in this session; keeping it
+        # loaded across batch commits avoids re-selecting it (and its URL list)
+        # after every batch.
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            job = await asyncio.to_thread(self._start, db, job_id)
+            if job.status == "completed":
+                return self._summary(job)
+
+            try:
+                await self._run_pipeline(db, job)
+            except JobSuperseded:
+                logger.warning("Bulk meta job %s was resumed elsewhere; stopping this run", job_id)
+                await asyncio.to_thread(db.rollback)
+                return self._summary(job)
+            except (Exception, asyncio.CancelledError) as e:
+                await asyncio.to_thread(self._finish, db, job, "failed", str(e) or type(e).__name__)
+                raise
+
+            await asyncio.to_thread(self._finish, db, job, "completed")
+            return self._summary(job)
+        finally:
+            await asyncio.to_thread(db.close)
+
+    def _start(self, db, job_id: str) -> MetaBulkJob:
+        job = db.query(MetaBulkJob).options(undefer(MetaBulkJob.urls)).filter(MetaBulkJob.id == job_id).first()
+        if job is None:
+            raise ValueError(f"Bulk meta job {job_id} not found")
+        if job.status != "completed":
+            job.status = "running"
+            job.error = None
+            db.commit()
+        return job
+
+    def _finish(self, db, job: MetaBulkJob, status: str, error: Optional[str] = None):
+        db.rollback()
+        job.status = status
+        job.error = error
+        db.commit()
+
+    async def _run_pipeline(self, db, job: MetaBulkJob):
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        producer = asyncio.create_task(
+            self._produce(self._iter_job_urls(job), job.cursor, pending)
+        )
+        batch: List[MetaTag] = []
+        handled = 0
+        failed = 0
+
+        try:
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+
+                meta_tag = await task
+                handled += 1
+                if meta_tag is None:
+                    failed += 1
+                else:
+                    meta_tag.project_id = job.project_id
+                    batch.append(meta_tag)
+
+                if handled >= self.batch_size:
+                    await asyncio.to_thread(self._commit_batch, db, job, batch, handled, failed)
+                    batch, handled, failed = [], 0, 0
+
+            await producer
+            await asyncio.to_thread(self._commit_batch, db, job, batch, handled, failed)
+        except BaseException:
+            producer.cancel()
+            while not pending.empty():
+                task = pending.get_nowait()
+                if task is not None:
+                    task.cancel()
+            raise
+
+    async def _produce(self, urls: AsyncIterator[str], start: int, pending: asyncio.Queue):
+        position = 0
+        try:
+            async for url in urls:
+                position += 1
+                if position <= start:
+                    continue
+                if position > settings.BULK_META_MAX_URLS:
+                    break
+                await pending.put(asyncio.create_task(self._process_url(url)))
+        finally:
+            await pending.put(None)
+
+    async def _iter_job_urls(self, job: MetaBulkJob) -> AsyncIterator[str]:
+        if job.sitemap_url:
+            async for url in self.sitemap_service.iter_urls(job.sitemap_url):
+                yield url
+        for url in job.urls or []:
+            yield url
+
+    async def _process_url(self, url: str) -> Optional[MetaTag]:
+        try:
+            scraped = await self.apify_client.scrape_url(url)
+            content = scraped.get('text') or extract_text_from_html(scraped.get('html', ''))
+            keywords = self._extract_keywords(scraped)
+
+            result = await self.meta_generator.generate_meta_tags(content, url)
+            scores = {
+                f"variant_{idx}": score_meta_tag(
+                    variant['title'],
+                    variant['description'],
+                    keywords
+                )
+                for idx, variant in enumerate(result['variants'], 1)
+            }
+
+            return MetaTag(
+                url=url,
+                input_content=content,
+                variants=result['variants'],
+                scores=scores
+            )
+        except Exception as e:
+            logger.warning("Bulk meta generation failed for %s: %s", url, e)
+            return None
+
+    def _extract_keywords(self, scraped: Dict) -> List[str]:
+        raw = scraped.get('metadata', {}).get('keywords') or ''
+        if isinstance(raw, list):
+            return raw
+        return [kw.strip() for kw in raw.split(',') if kw.strip()]
+
+    def _commit_batch(self, db, job: MetaBulkJob, batch: List[MetaTag], handled: int, failed: int):
+        if not handled:
+            return
+        db.add_all(batch)
+        # Only advance from the cursor this run last committed. A run presumed
+        # dead and resumed elsewhere stops here instead of writing its batch
+        # twice. The commit also bumps updated_at, the job's heartbeat.
+        result = db.execute(
+            update(MetaBulkJob)
+            .where(MetaBulkJob.id == job.id, MetaBulkJob.cursor == job.cursor)
+            .values(
+                cursor=MetaBulkJob.cursor + handled,
+                processed=MetaBulkJob.processed + handled - failed,
+                failed=MetaBulkJob.failed + failed,
+                updated_at=datetime.utcnow()
+            )
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            raise JobSuperseded()
+        db.commit()
+        set_committed_value(job, 'cursor', job.cursor + handled)
+        set_committed_value(job, 'processed', job.processed + handled - failed)
+        set_committed_value(job, 'failed', job.failed + failed)
+
+    def _summary(self, job: MetaBulkJob) -> Dict:
+        return {
+            'job_id': str(job.id),
+            'project_id': str(job.project_id),
+            'status': job.status,
+            'processed': job.processed,
+            'failed': job.failed
+        }
@@ -0,0 +1,70 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.integrations.redis_client import get_async_redis
+
+# Atomically swap the key's holder, but only if it still points at the job the
+# caller inspected; a concurrent submitter that got there first wins.
+_REPLACE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+def normalize_params(value: Any) -> Any:
+    """Canonical form of submission parameters for duplicate detection.
+
+    Strings are trimmed, dict keys sorted, and lists of scalars are treated as
+    sets (keyword and URL lists are order-insensitive).
+    """
+    if isinstance(value, dict):
+        return {str(k): normalize_params(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        items = [normalize_params(v) for v in value]
+        if all(isinstance(v, (str, int, float)) for v in items):
+            return sorted(set(items), key=str)
+        return items
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+def idempotency_key(job_type: str, project_id, owner_id, params: Dict) -> str:
+    # The owner is part of the key because job reads are authorized by owner;
+    # another user must never be handed a job id they cannot read.
+    canonical = json.dumps(
+        [job_type, str(project_id), str(owner_id), normalize_params(params)],
+        separators=(',', ':'),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def _redis_key(key: str) -> str:
+    return f"idempotency:{key}"
+
+async def claim(key: str, job_id: str) -> Optional[str]:
+    """Claim ``key`` for ``job_id``. Returns None on success, else the holder."""
+    client = get_async_redis()
+    redis_key = _redis_key(key)
+    if await client.set(redis_key, job_id, nx=True, ex=settings.IDEMPOTENCY_KEY_TTL_SECONDS):
+        return None
+    holder = await client.get(redis_key)
+    if holder is None:
+        # Expired between the two calls; try once more.
+        if await client.set(redis_key, job_id, nx=True, ex=settings.IDEMPOTENCY_KEY_TTL_SECONDS):
+            return None
+        holder = await client.get(redis_key)
+    return holder.decode() if holder else None
+
+async def replace(key: str, expected_holder: str, job_id: str) -> bool:
+    result = await get_async_redis().eval(
+        _REPLACE_SCRIPT,
+        1,
+        _redis_key(key),
+        expected_holder,
+        job_id,
+        settings.IDEMPOTENCY_KEY_TTL_SECONDS
+    )
+    return bool(result)
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database.session import SessionLocal
+from app.integrations.redis_client import get_redis, get_async_redis
+from app.models.job import Job
+from app.services import idempotency
+
+logger = logging.getLogger(__name__)
+
+JOB_TERMINAL_STATES = ('completed', 'failed')
+MAX_WAIT_SECONDS = 30
+
+class JobQueueUnavailable(Exception):
+    """The broker did not accept a job; the job row is already marked failed."""
+
+class JobSubmissionConflict(Exception):
+    """Concurrent identical submissions kept replacing each other's job."""
+
+def _channel(job_id) -> str:
+    return f"job-updates:{job_id}"
+
+def job_response(job: Job) -> Dict:
+    return {
+        "job_id": str(job.id),
+        "project_id": str(job.project_id),
+        "job_type": job.job_type,
+        "status": job.status,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None
+    }
+
+def update_job(job_id: str, **fields):
+    """Update a job row by primary key and notify anyone waiting on it.
+
+    Used from Celery tasks, which have no request-scoped session.
+    """
+    fields['updated_at'] = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        db.query(Job).filter(Job.id == job_id).update(fields, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+    get_redis().publish(_channel(job_id), json.dumps({
+        'status': fields.get('status'),
+        'progress': fields.get('progress')
+    }))
+
+@contextmanager
+def track_job(job_id: Optional[str]):
+    """Mark a job running for the duration of a task body, failed if it raises.
+
+    Completion is left to the caller, since fan-out tasks finish their job from
+    a chord callback rather than from the task that started it.
+    """
+    if job_id:
+        update_job(job_id, status='running')
+    try:
+        yield
+    except Exception as e:
+        if job_id:
+            update_job(job_id, status='failed', error=str(e))
+        raise
+
+class JobService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job(
+        self,
+        project_id,
+        owner_id,
+        job_type: str,
+        job_id: Optional[uuid.UUID] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Job:
+        job = Job(
+            id=job_id or uuid.uuid4(),
+            project_id=project_id,
+            owner_id=owner_id,
+            job_type=job_type,
+            idempotency_key=idempotency_key,
+            status="queued"
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get_or_create_job(
+        self,
+        project_id,
+        owner_id,
+        job_type: str,
+        params: Dict
+    ) -> Tuple[Job, bool]:
+        """Create a job unless an identical one is in flight or just finished.
+
+        The (type, project, owner, normalized params) key is claimed
+        atomically in Redis. A duplicate attaches to the holder while it is
+        queued or running, and reuses its result for
+        IDEMPOTENCY_REUSE_WINDOW_SECONDS after completion. Returns ``(job, created)``; only a created job
+        needs dispatching. Without Redis, jobs are created undeduplicated.
+        """
+        key = idempotency.idempotency_key(job_type, project_id, owner_id, params)
+        job_id = uuid.uuid4()
+
+        try:
+            existing = await self._claim(key, job_id)
+        except RedisError:
+            logger.warning("Idempotency store unavailable, creating %s job without deduplication", job_type, exc_info=True)
+            existing = None
+        if existing is not None:
+            return existing, False
+        return await self.create_job(project_id, owner_id, job_type, job_id, key), True
+
+    async def _claim(self, key: str, job_id: uuid.UUID) -> Optional[Job]:
+        """Claim ``key`` for ``job_id`` and return None, or return the
+        reusable job already holding it."""
+        for attempt in range(3):
+            holder = await idempotency.claim(key, str(job_id))
+            if holder is None:
+                return None
+
+            existing = await self.db.get(Job, uuid.UUID(holder))
+            if existing is None and attempt < 2:
+                # The winning request may not have committed its row yet.
+                await asyncio.sleep(0.05)
+                continue
+
+            if existing is not None and self._reusable(existing):
+                return existing
+
+            if await idempotency.replace(key, holder, str(job_id)):
+                return None
+
+        # Creating a job now would be the very duplicate the key prevents.
+        raise JobSubmissionConflict(key)
+
+    def _reusable(self, job: Job) -> bool:
+        if job.status in ("queued", "running"):
+            return True
+        if job.status == "completed" and job.updated_at:
+            window = timedelta(seconds=settings.IDEMPOTENCY_REUSE_WINDOW_SECONDS)
+            return datetime.utcnow() - job.updated_at <= window
+        return False
+
+    async def dispatch(self, job, task, args=(), kwargs=None, **options):
+        # The Celery task id doubles as the job id, so broker-side state and
+        # the job row can always be matched up. ``job`` is any row with
+        # status and error columns (Job, MetaBulkJob).
+        try:
+            task.apply_async(args=args, kwargs=kwargs or {}, task_id=str(job.id), **options)
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"Could not enqueue job: {e}"
+            await self.db.commit()
+            raise JobQueueUnavailable(str(e)) from e
+        return job
+
+    async def get_job(self, job_id, owner_id=None, job_type: Optional[str] = None) -> Optional[Job]:
+        job = await self.db.get(Job, job_id)
+        if job is None:
+            return None
+        if owner_id is not None and job.owner_id != owner_id:
+            return None
+        if job_type is not None and job.job_type != job_type:
+            return None
+        return job
+
+    async def wait_for_change(
+        self,
+        job: Job,
+        last_status: Optional[str],
+        last_progress: Optional[int],
+        timeout: float
+    ) -> Job:
+        """Long-poll: return once the job differs from what the client last saw.
+
+        Waiting happens on a Redis pub/sub channel, so an idle poll costs no
+        database queries. Each re-read ends its transaction straight away so
+        no pooled connection is held while waiting.
+        """
+        timeout = min(timeout, MAX_WAIT_SECONDS)
+
+        def changed(current: Job) -> bool:
+            return (
+                current.status in JOB_TERMINAL_STATES
+                or (last_status is not None and current.status != last_status)
+                or (last_progress is not None and current.progress != last_progress)
+            )
+
+        if timeout <= 0 or changed(job):
+            return job
+
+        pubsub = get_async_redis().pubsub()
+        await pubsub.subscribe(_channel(job.id))
+        try:
+            # Re-read after subscribing so an update landing in between is
+            # not missed.
+            job = await self._reload(job)
+
+            deadline = time.monotonic() + timeout
+            while not changed(job):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=remaining
+                )
+                if message is not None:
+                    job = await self._reload(job)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+        return job
+
+    async def _reload(self, job: Job) -> Job:
+        job_id = job.id
+        if job in self.db:
+            self.db.expunge(job)
+        fresh = await self.db.get(Job, job_id)
+        self.db.expunge(fresh)
+        await self.db.rollback()
+        return fresh
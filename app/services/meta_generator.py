@@ -1,12 +1,11 @@
-from typing import Dict, List, Optional
-import google.generativeai as genai
-from app.config import settings
-
-genai.configure(api_key=settings.GEMINI_API_KEY)
+import json
+from typing import AsyncIterator, Dict, List, Optional
+from app.integrations.gemini_client import get_generative_model
 
 class MetaGeneratorService:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-pro')
+    @property
+    def model(self):
+        return get_generative_model('gemini-pro')
     
     async def generate_meta_tags(self, content: str, url: Optional[str] = None) -> Dict:
         prompt = f"""
@@ -22,7 +21,7 @@ class MetaGeneratorService:
         Format as JSON with variants array.
         """
         
-        response = self.model.generate_content(prompt)
+        response = await self.model.generate_content_async(prompt)
         
         variants = [
             {
@@ -49,3 +48,56 @@ class MetaGeneratorService:
             "variants": variants,
             "scores": scores
         }
+    
+    async def stream_meta_variants(
+        self,
+        content: str,
+        url: Optional[str] = None,
+        num_variants: int = 3
+    ) -> AsyncIterator[Dict]:
+        prompt = f"""
+        Generate {num_variants} SEO-optimized meta tag variants for the following content.
+        
+        Content: {content[:2000]}
+        URL: {url or 'N/A'}
+        
+        For each variant, provide:
+        1. Title (50-60 characters)
+        2. Description (150-160 characters)
+        
+        Output exactly one JSON object per line with "title" and "description"
+        keys. Do not wrap the output in an array or code fence.
+        """
+        
+        response = await self.model.generate_content_async(prompt, stream=True)
+        
+        # Variants are newline-delimited JSON, so each one can be emitted as
+        # soon as its line is complete rather than after the full response.
+        buffer = ""
+        emitted = 0
+        async for chunk in response:
+            buffer += chunk.text
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                variant = self._parse_variant(line)
+                if variant:
+                    emitted += 1
+                    yield variant
+                    if emitted >= num_variants:
+                        return
+        
+        variant = self._parse_variant(buffer)
+        if variant and emitted < num_variants:
+            yield variant
+    
+    def _parse_variant(self, line: str) -> Optional[Dict]:
+        line = line.strip().strip(",")
+        if not line.startswith("{"):
+            return None
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        if not data.get("title") or not data.get("description"):
+            return None
+        return {"title": data["title"], "description": data["description"]}
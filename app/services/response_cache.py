@@ -0,0 +1,271 @@
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import session as db_session
+from app.integrations.redis_client import get_async_redis, get_redis
+from app.models.competitor import CompetitorAnalysis
+from app.models.project import Project
+
+logger = logging.getLogger(__name__)
+
+# Every response can be revalidated, but never by a shared cache: the
+# handlers filter by the requesting user.
+CACHE_CONTROL = "private, no-cache"
+
+def _version_key(scope: str) -> str:
+    return f"response_version:{scope}"
+
+def project_scope(project_id) -> str:
+    return f"project:{project_id}"
+
+def competitor_scope(analysis_id) -> str:
+    return f"competitor:{analysis_id}"
+
+# Retention prunes every project at once; unfiltered keyword history reads
+# every project's rankings.
+SERP_RETENTION_SCOPE = "serp:retention"
+SERP_ALL_PROJECTS_SCOPE = "serp:all-projects"
+
+def serp_scopes(project_id=None) -> List[str]:
+    """Scopes a SERP read depends on: its project's rankings, or every
+    project's when unfiltered, and retention."""
+    if project_id is None:
+        return [SERP_ALL_PROJECTS_SCOPE, SERP_RETENTION_SCOPE]
+    return [f"serp:{project_id}", SERP_RETENTION_SCOPE]
+
+def serp_write_scopes(project_id) -> List[str]:
+    """Scopes replaced when ``project_id``'s rankings change. Other
+    projects' reads keep their ETags."""
+    return [f"serp:{project_id}", SERP_ALL_PROJECTS_SCOPE]
+
+def mark_changed(session: Session, *scopes: str):
+    """Invalidate ``scopes`` once ``session`` commits. For writes the session
+    events cannot see, such as Core inserts."""
+    session.info.setdefault('changed_scopes', set()).update(scopes)
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+class ResponseCache:
+    """Version-stamped response cache for endpoints that dashboards poll.
+
+    Each cached endpoint depends on one or more scopes, such as a project.
+    Every scope has an opaque version token in Redis that is replaced when a
+    commit touches the scope, from any API process or worker. A response's
+    strong ETag is derived from the versions of its scopes and the request,
+    so revalidation needs one Redis round trip and no database query.
+    Bodies are kept in a per-process LRU keyed by request and served while
+    their versions are current.
+    """
+
+    def __init__(self, max_entries: int, max_body_bytes: int, ttl_seconds: float, version_ttl_seconds: int, enabled: bool):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version_ttl_seconds = version_ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def versions(self, scopes: List[str]) -> List[str]:
+        """Current version tokens of ``scopes``. Scopes without one get a
+        fresh token, so ETags issued before it was replaced never match."""
+        client = get_async_redis()
+        keys = [_version_key(scope) for scope in scopes]
+        tokens = await client.mget(keys)
+        for i, token in enumerate(tokens):
+            if token is None:
+                # Tokens start with their creation time, which is after the
+                # last write to the scope.
+                await client.set(keys[i], f"{time.time():.3f}:{uuid.uuid4().hex}", nx=True, ex=self.version_ttl_seconds)
+                tokens[i] = await client.get(keys[i])
+        return [token.decode() if isinstance(token, bytes) else token for token in tokens]
+
+    def _get_local(self, key: str, version: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, expires_at, body = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def _set_local(self, key: str, version: str, body: bytes):
+        if len(body) > self.max_body_bytes:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def respond(
+        self,
+        request: Request,
+        user_id,
+        scopes: List[str],
+        compute: Callable[[], Awaitable],
+        db: Optional[AsyncSession] = None,
+        variant: str = "",
+        response_model: Optional[type] = None
+    ) -> Response:
+        """Answer ``request`` with 304, a cached body or ``compute()``.
+        
+        ``compute`` runs the handler's queries and returns the content; it
+        may raise HTTPException as usual, and errors are never cached.
+        ``variant`` distinguishes responses that also depend on something
+        other than the request and the scopes, such as the current date.
+        """
+        async def render() -> Response:
+            content = await compute()
+            if response_model is not None:
+                return Response(response_model.model_validate(content).model_dump_json(), media_type="application/json")
+            return ORJSONResponse(jsonable_encoder(content))
+        
+        if not self.enabled:
+            return await render()
+        
+        try:
+            tokens = await self.versions(scopes)
+        except Exception:
+            logger.warning("Response cache versions unavailable", exc_info=True)
+            return await render()
+        
+        version = ".".join(tokens)
+        key = f"{user_id}:{request.url.path}?{request.url.query}#{variant}"
+        etag = '"' + hashlib.sha256(f"{key}#{version}".encode()).hexdigest()[:40] + '"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        
+        if _matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        
+        body = self._get_local(key, version)
+        if body is not None:
+            self.hits += 1
+            return Response(body, media_type="application/json", headers=headers)
+        
+        self.misses += 1
+        response = await render()
+        if db is not None and db_session.read_async_engine is not None and db.bind is db_session.read_async_engine:
+            # The replica may not show a write made shortly before the
+            # version was replaced yet; only tie its result to the version
+            # once the version is older than the lag the replica is allowed.
+            newest = max(float(token.split(":", 1)[0]) for token in tokens)
+            if time.time() - newest < settings.DB_REPLICA_MAX_LAG_SECONDS:
+                return response
+        self._set_local(key, version, response.body)
+        response.headers.update(headers)
+        return response
+
+    def invalidate(self, scopes: List[str]):
+        """Replace the version of ``scopes``. Blocking, for workers and
+        scripts; request handlers go through invalidate_async."""
+        with self._lock:
+            self.invalidations += 1
+        if not self.enabled:
+            return
+        try:
+            get_redis().delete(*[_version_key(scope) for scope in scopes])
+        except Exception:
+            logger.warning("Could not invalidate response cache scopes %s", scopes, exc_info=True)
+
+    async def invalidate_async(self, scopes: List[str]):
+        with self._lock:
+            self.invalidations += 1
+        if not self.enabled:
+            return
+        try:
+            await get_async_redis().delete(*[_version_key(scope) for scope in scopes])
+        except Exception:
+            logger.warning("Could not invalidate response cache scopes %s", scopes, exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._entries)
+        requests = self.not_modified + self.hits + self.misses
+        return {
+            'size': size,
+            'max_entries': self.max_entries,
+            'not_modified': self.not_modified,
+            'hits': self.hits,
+            'misses': self.misses,
+            'served_without_database': round((self.not_modified + self.hits) / requests, 4) if requests else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    max_body_bytes=settings.RESPONSE_CACHE_MAX_BODY_BYTES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    version_ttl_seconds=settings.RESPONSE_CACHE_VERSION_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
+
+SCOPES_BY_MODEL: Dict[type, Callable] = {
+    Project: lambda obj: [project_scope(obj.id)],
+    CompetitorAnalysis: lambda obj: [competitor_scope(obj.id)],
+}
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_scopes(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        scopes = SCOPES_BY_MODEL.get(type(obj))
+        if scopes is not None and obj.id is not None:
+            session.info.setdefault('changed_scopes', set()).update(scopes(obj))
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_scopes(session):
+    scopes = session.info.pop('changed_scopes', None)
+    if not scopes:
+        return
+    if isinstance(session, db_session.PrimarySyncSession):
+        # A request handler's session: PrimarySession.commit awaits the
+        # invalidation instead of blocking the loop here.
+        session.info.setdefault('invalidate_scopes', set()).update(scopes)
+    else:
+        response_cache.invalidate(sorted(scopes))
+
+async def _flush_invalidated_scopes(info: Dict):
+    scopes = info.pop('invalidate_scopes', None)
+    if scopes:
+        await response_cache.invalidate_async(sorted(scopes))
+
+db_session.after_commit_hooks.append(_flush_invalidated_scopes)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_scopes(session):
+    session.info.pop('changed_scopes', None)
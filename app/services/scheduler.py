@@ -1,44 +1,172 @@
-from typing import Dict
-from datetime import datetime
+import hashlib
+import uuid
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from croniter import croniter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.schedule import Schedule
+
+SCHEDULABLE_TASK_TYPES = ('meta_generate', 'link_scan', 'competitor_analysis', 'serp_compare')
+
+def _jitter_seconds(schedule_id, cron_expression: str) -> int:
+    """Stable per-schedule offset, so thousands of "0 0 * * *" schedules do
+    not all fire in the same tick. Never more than half the cron period."""
+    itr = croniter(cron_expression, datetime(2000, 1, 1))
+    first = itr.get_next(datetime)
+    period = (itr.get_next(datetime) - first).total_seconds()
+    spread = min(settings.SCHEDULER_MAX_JITTER_SECONDS, int(period // 2))
+    if spread <= 0:
+        return 0
+    digest = hashlib.sha256(str(schedule_id).encode()).hexdigest()
+    return int(digest[:8], 16) % spread
+
+def _next_run(schedule: Schedule, after: datetime) -> datetime:
+    jitter = timedelta(seconds=schedule.jitter_seconds)
+    return croniter(schedule.cron_expression, after - jitter).get_next(datetime) + jitter
+
+def schedule_response(schedule: Schedule) -> Dict:
+    return {
+        'schedule_id': str(schedule.id),
+        'project_id': str(schedule.project_id),
+        'task_type': schedule.task_type,
+        'cron_expression': schedule.cron_expression,
+        'params': schedule.params,
+        'enabled': schedule.enabled,
+        'next_run_at': schedule.next_run_at.isoformat() if schedule.next_run_at else None,
+        'last_run_at': schedule.last_run_at.isoformat() if schedule.last_run_at else None,
+        'created_at': schedule.created_at.isoformat() if schedule.created_at else None
+    }
 
 class SchedulerService:
-    def __init__(self):
-        self.schedules = {}
+    """Cron schedules stored in the ``schedules`` table.
+
+    Due schedules are found through the (enabled, next_run_at) index, so a
+    tick costs O(log n) plus the number of schedules actually due.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
     
-    def create_schedule(
+    async def create_schedule(
         self,
         project_id: str,
         task_type: str,
-        cron_expression: str
+        cron_expression: str,
+        params: Optional[Dict] = None
     ) -> Dict:
-        schedule_id = f"schedule_{len(self.schedules) + 1}"
+        if task_type not in SCHEDULABLE_TASK_TYPES:
+            raise ValueError(f"Unsupported task type: {task_type}")
+        if not croniter.is_valid(cron_expression):
+            raise ValueError(f"Invalid cron expression: {cron_expression}")
         
-        schedule = {
-            'schedule_id': schedule_id,
-            'project_id': project_id,
-            'task_type': task_type,
-            'cron_expression': cron_expression,
-            'enabled': True,
-            'created_at': datetime.utcnow().isoformat()
-        }
+        schedule_id = uuid.uuid4()
+        schedule = Schedule(
+            id=schedule_id,
+            project_id=project_id,
+            task_type=task_type,
+            cron_expression=cron_expression,
+            params=params or {},
+            enabled=True,
+            jitter_seconds=_jitter_seconds(schedule_id, cron_expression)
+        )
+        schedule.next_run_at = _next_run(schedule, datetime.utcnow())
+        self.db.add(schedule)
+        await self.db.commit()
+        await self.db.refresh(schedule)
+        return schedule_response(schedule)
+    
+    async def get_schedules(self, project_id: str) -> list:
+        schedules = (await self.db.scalars(select(Schedule).where(
+            Schedule.project_id == project_id
+        ).order_by(Schedule.created_at))).all()
+        return [schedule_response(s) for s in schedules]
+    
+    async def update_schedule(self, schedule_id: str, enabled: bool) -> Dict:
+        schedule = await self.db.get(Schedule, schedule_id)
+        if schedule is None:
+            return None
         
-        self.schedules[schedule_id] = schedule
-        return schedule
+        if enabled and not schedule.enabled:
+            # Resume from now rather than replaying the time spent disabled.
+            schedule.next_run_at = _next_run(schedule, datetime.utcnow())
+        schedule.enabled = enabled
+        await self.db.commit()
+        await self.db.refresh(schedule)
+        return schedule_response(schedule)
     
-    def get_schedules(self, project_id: str) -> list:
-        return [
-            s for s in self.schedules.values()
-            if s['project_id'] == project_id
-        ]
+    async def delete_schedule(self, schedule_id: str) -> bool:
+        schedule = await self.db.get(Schedule, schedule_id)
+        if schedule is None:
+            return False
+        await self.db.delete(schedule)
+        await self.db.commit()
+        return True
     
-    def update_schedule(self, schedule_id: str, enabled: bool) -> Dict:
-        if schedule_id in self.schedules:
-            self.schedules[schedule_id]['enabled'] = enabled
-            return self.schedules[schedule_id]
-        return None
+    async def claim_due(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Advance up to SCHEDULER_BATCH_SIZE due schedules and return them.
+
+        Rows are locked with FOR UPDATE SKIP LOCKED and committed before
+        anything is dispatched, so overlapping ticks never claim the same
+        schedule twice. Each returned entry carries ``run_times``, the fire
+        times to dispatch under the catch-up policy (possibly none); the
+        caller rewinds the schedule to any it fails to dispatch.
+        """
+        now = now or datetime.utcnow()
+        due = (await self.db.scalars(select(Schedule).where(
+            Schedule.enabled.is_(True),
+            Schedule.next_run_at <= now
+        ).order_by(
+            Schedule.next_run_at
+        ).limit(
+            settings.SCHEDULER_BATCH_SIZE
+        ).with_for_update(skip_locked=True))).all()
+        
+        claimed = []
+        for schedule in due:
+            run_times = self._advance(schedule, now)
+            claimed.append({
+                'schedule_id': str(schedule.id),
+                'project_id': str(schedule.project_id),
+                'task_type': schedule.task_type,
+                'params': schedule.params or {},
+                'run_times': [t.isoformat() for t in run_times]
+            })
+        
+        await self.db.commit()
+        return claimed
     
-    def delete_schedule(self, schedule_id: str) -> bool:
-        if schedule_id in self.schedules:
-            del self.schedules[schedule_id]
-            return True
-        return False
+    async def rewind(self, schedule_id: str, run_time: datetime):
+        """Move a claimed schedule back to ``run_time``, an occurrence that
+        could not be dispatched, so the next tick claims it again.
+
+        Occurrences before it already have their jobs, and replays are
+        deduplicated by fire time. A schedule disabled or moved earlier in
+        the meantime is left alone.
+        """
+        await self.db.execute(update(Schedule).where(
+            Schedule.id == uuid.UUID(schedule_id),
+            Schedule.enabled.is_(True),
+            Schedule.next_run_at > run_time
+        ).values(next_run_at=run_time))
+        await self.db.commit()
+    
+    def _advance(self, schedule: Schedule, now: datetime) -> List[datetime]:
+        policy = settings.SCHEDULER_CATCHUP_POLICY
+        run_times = []
+        
+        if policy == 'all':
+            while schedule.next_run_at <= now and len(run_times) < settings.SCHEDULER_MAX_CATCHUP_RUNS:
+                run_times.append(schedule.next_run_at)
+                schedule.next_run_at = _next_run(schedule, schedule.next_run_at)
+        else:
+            # A run later than two ticks means the scheduler was not running.
+            missed = now - schedule.next_run_at > timedelta(seconds=2 * settings.SCHEDULER_TICK_SECONDS)
+            if policy != 'skip' or not missed:
+                run_times.append(schedule.next_run_at)
+            schedule.next_run_at = _next_run(schedule, now)
+        
+        if run_times:
+            schedule.last_run_at = now
+        return run_times
@@ -0,0 +1,181 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import case, delete, insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.serp import SerpHistory, SerpRankDaily, SerpRankWeekly
+from app.services.response_cache import SERP_RETENTION_SCOPE, mark_changed, serp_write_scopes
+
+PARTITION_NAME = re.compile(r"^serp_history_y(\d{4})m(\d{2})$")
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+def week_start(value: date) -> date:
+    return value - timedelta(days=value.weekday())
+
+def partition_name(month: date) -> str:
+    return f"serp_history_y{month:%Y}m{month:%m}"
+
+def choose_granularity(start: datetime, end: datetime, now: Optional[datetime] = None) -> str:
+    """Finest granularity that still has data for the whole range and keeps
+    the number of points per series bounded."""
+    now = now or datetime.utcnow()
+    span = end - start
+    if span <= timedelta(days=settings.SERP_RAW_MAX_RANGE_DAYS) and \
+            start >= now - timedelta(days=settings.SERP_RAW_RETENTION_DAYS):
+        return 'raw'
+    if span <= timedelta(days=settings.SERP_DAILY_MAX_RANGE_DAYS) and \
+            start >= now - timedelta(days=settings.SERP_DAILY_RETENTION_DAYS):
+        return 'daily'
+    return 'weekly'
+
+def record_rankings(db: Session, project_id: str, results: List[Dict], detected_at: Optional[datetime] = None) -> int:
+    """Store one SERP snapshot and fold it into the daily and weekly rollups.
+
+    Rollups are upserted in the same transaction as the raw rows, so they are
+    always current without a batch job re-scanning history.
+    """
+    detected_at = detected_at or datetime.utcnow()
+    raw_rows = []
+    best = {}
+    for result in results:
+        for ranking in result.get('rankings', []):
+            domain = ranking.get('domain')
+            if not domain:
+                continue
+            raw_rows.append({
+                'project_id': project_id,
+                'keyword': result['keyword'],
+                'domain': domain,
+                'rank': ranking['position'],
+                'detected_at': detected_at
+            })
+            # A domain can hold several positions in one SERP; rollups track
+            # its best one per snapshot.
+            key = (result['keyword'], domain)
+            best[key] = min(best.get(key, ranking['position']), ranking['position'])
+
+    if not raw_rows:
+        return 0
+
+    ensure_partition_for(db, detected_at.date())
+    db.execute(insert(SerpHistory), raw_rows)
+    mark_changed(db, *serp_write_scopes(project_id))
+    samples = [
+        {'keyword': keyword, 'domain': domain, 'rank': rank}
+        for (keyword, domain), rank in best.items()
+    ]
+    _upsert_rollup(db, SerpRankDaily, project_id, detected_at.date(), detected_at, samples)
+    _upsert_rollup(db, SerpRankWeekly, project_id, week_start(detected_at.date()), detected_at, samples)
+    return len(raw_rows)
+
+def _upsert_rollup(db: Session, model, project_id, bucket: date, seen_at: datetime, samples: List[Dict]):
+    dialect_insert = pg_insert if db.get_bind().dialect.name == 'postgresql' else sqlite_insert
+    stmt = dialect_insert(model).values([
+        {
+            'project_id': project_id,
+            'keyword': sample['keyword'],
+            'domain': sample['domain'],
+            'bucket': bucket,
+            'best_rank': sample['rank'],
+            'worst_rank': sample['rank'],
+            'rank_sum': sample['rank'],
+            'samples': 1,
+            'last_rank': sample['rank'],
+            'last_seen_at': seen_at
+        }
+        for sample in samples
+    ])
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['project_id', 'keyword', 'domain', 'bucket'],
+        set_={
+            'best_rank': case((excluded.best_rank < model.best_rank, excluded.best_rank), else_=model.best_rank),
+            'worst_rank': case((excluded.worst_rank > model.worst_rank, excluded.worst_rank), else_=model.worst_rank),
+            'rank_sum': model.rank_sum + excluded.rank_sum,
+            'samples': model.samples + excluded.samples,
+            'last_rank': case((excluded.last_seen_at >= model.last_seen_at, excluded.last_rank), else_=model.last_rank),
+            'last_seen_at': case((excluded.last_seen_at >= model.last_seen_at, excluded.last_seen_at), else_=model.last_seen_at)
+        }
+    )
+    db.execute(stmt)
+
+def ensure_partitions(db: Session, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Create the current month's partition and ``months_ahead`` after it."""
+    if db.get_bind().dialect.name != 'postgresql':
+        return []
+
+    created = []
+    month = month_start(today or datetime.utcnow().date())
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF serp_history "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+        ))
+        created.append(name)
+        month = next_month(month)
+    return created
+
+def ensure_partition_for(db: Session, day: date):
+    """Create the partition holding ``day`` if maintenance has not yet, so
+    inserts never fail for want of one. The common case costs one catalog
+    lookup."""
+    if db.get_bind().dialect.name != 'postgresql':
+        return
+
+    name = partition_name(month_start(day))
+    if db.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar() is not None:
+        return
+    try:
+        # A concurrent writer may create it first; IF NOT EXISTS does not
+        # cover that race, so a failure here is left to the insert to judge.
+        with db.begin_nested():
+            ensure_partitions(db, 0, day)
+    except DBAPIError:
+        pass
+
+def drop_expired_partitions(db: Session, retention_days: int, today: Optional[date] = None) -> List[str]:
+    """Drop raw partitions whose whole month is older than the retention.
+
+    Dropping a partition is a metadata operation, unlike a bulk DELETE that
+    leaves dead tuples and index bloat behind.
+    """
+    if db.get_bind().dialect.name != 'postgresql':
+        return []
+
+    cutoff = (today or datetime.utcnow().date()) - timedelta(days=retention_days)
+    partitions = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'serp_history'::regclass"
+    )).scalars().all()
+
+    dropped = []
+    for name in partitions:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if next_month(month) <= cutoff:
+            db.execute(text(f"ALTER TABLE serp_history DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    if dropped:
+        mark_changed(db, SERP_RETENTION_SCOPE)
+    return dropped
+
+def prune_daily_rollups(db: Session, retention_days: int, today: Optional[date] = None) -> int:
+    cutoff = (today or datetime.utcnow().date()) - timedelta(days=retention_days)
+    result = db.execute(delete(SerpRankDaily).where(SerpRankDaily.bucket < cutoff))
+    if result.rowcount:
+        mark_changed(db, SERP_RETENTION_SCOPE)
+    return result.rowcount
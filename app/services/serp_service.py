@@ -1,5 +1,12 @@
-from typing import List, Dict
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.integrations.apify_client import ApifyClient
+from app.models.serp import SerpHistory, SerpRankDaily, SerpRankWeekly
+from app.services.serp_history import choose_granularity, week_start
+
+ROLLUPS = {'daily': SerpRankDaily, 'weekly': SerpRankWeekly}
 
 class SerpService:
     def __init__(self):
@@ -31,8 +38,86 @@ class SerpService:
         
         return {'results': results}
     
-    async def get_rank_history(self, keyword: str, domain: str) -> List[Dict]:
-        return [
-            {'date': '2024-01-01', 'rank': 5},
-            {'date': '2024-01-15', 'rank': 3}
-        ]
+    async def get_rank_history(
+        self,
+        db: AsyncSession,
+        project_id,
+        keywords: List[str],
+        domain: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        granularity: str = 'auto'
+    ) -> Dict:
+        end = end or datetime.utcnow()
+        start = start or end - timedelta(days=30)
+        if granularity == 'auto':
+            granularity = choose_granularity(start, end)
+        
+        if granularity == 'raw':
+            query = select(
+                SerpHistory.keyword,
+                SerpHistory.domain,
+                SerpHistory.rank,
+                SerpHistory.detected_at
+            ).where(
+                SerpHistory.project_id == project_id,
+                SerpHistory.keyword.in_(keywords),
+                SerpHistory.detected_at >= start,
+                SerpHistory.detected_at <= end
+            ).order_by(SerpHistory.detected_at)
+            if domain:
+                query = query.where(SerpHistory.domain == domain)
+            
+            rows = (await db.execute(query)).all()
+            points = [
+                (row.keyword, row.domain, {'date': row.detected_at.isoformat(), 'rank': row.rank})
+                for row in rows
+            ]
+        else:
+            model = ROLLUPS[granularity]
+            # Weekly buckets are keyed by their Monday; keep the week that
+            # contains ``start``.
+            first_bucket = week_start(start.date()) if model is SerpRankWeekly else start.date()
+            query = select(
+                model.keyword,
+                model.domain,
+                model.bucket,
+                model.best_rank,
+                model.worst_rank,
+                model.rank_sum,
+                model.samples,
+                model.last_rank
+            ).where(
+                model.project_id == project_id,
+                model.keyword.in_(keywords),
+                model.bucket >= first_bucket,
+                model.bucket <= end.date()
+            ).order_by(model.bucket)
+            if domain:
+                query = query.where(model.domain == domain)
+            
+            rows = (await db.execute(query)).all()
+            points = [
+                (row.keyword, row.domain, {
+                    'date': row.bucket.isoformat(),
+                    'rank': row.last_rank,
+                    'best_rank': row.best_rank,
+                    'worst_rank': row.worst_rank,
+                    'avg_rank': round(row.rank_sum / row.samples, 2)
+                })
+                for row in rows
+            ]
+        
+        series = {}
+        for keyword, series_domain, point in points:
+            series.setdefault((keyword, series_domain), []).append(point)
+        
+        return {
+            'granularity': granularity,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': [
+                {'keyword': keyword, 'domain': series_domain, 'points': series_points}
+                for (keyword, series_domain), series_points in series.items()
+            ]
+        }
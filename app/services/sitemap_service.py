@@ -0,0 +1,85 @@
+import zlib
+import xml.etree.ElementTree as ET
+from typing import AsyncIterator, Optional
+import httpx
+from app.integrations.http_client import get_http_client
+
+MAX_INDEX_DEPTH = 3
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+class SitemapService:
+    """Streams page URLs out of a sitemap without loading it into memory.
+
+    Sitemap indexes are followed recursively (up to ``MAX_INDEX_DEPTH``) and
+    gzipped sitemaps are decompressed on the fly. Parsed elements are dropped
+    from the tree as soon as their ``<loc>`` has been read, so memory stays flat
+    regardless of how many URLs the sitemap lists.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.client = client
+
+    async def iter_urls(self, sitemap_url: str) -> AsyncIterator[str]:
+        client = self.client or get_http_client()
+        async for url in self._iter_sitemap(client, sitemap_url, 0):
+            yield url
+
+    async def _iter_sitemap(
+        self,
+        client: httpx.AsyncClient,
+        sitemap_url: str,
+        depth: int
+    ) -> AsyncIterator[str]:
+        child_sitemaps = []
+
+        async for kind, loc in self._iter_entries(client, sitemap_url):
+            if kind == 'url':
+                yield loc
+            elif depth < MAX_INDEX_DEPTH:
+                # Only child sitemap locations are buffered (at most 50k per the
+                # protocol), so the parent response can be released before the
+                # children are fetched.
+                child_sitemaps.append(loc)
+
+        for child_url in child_sitemaps:
+            async for url in self._iter_sitemap(client, child_url, depth + 1):
+                yield url
+
+    async def _iter_entries(self, client: httpx.AsyncClient, sitemap_url: str):
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        decompressor = None
+        root = None
+
+        async with client.stream('GET', sitemap_url) as response:
+            response.raise_for_status()
+            gzipped = sitemap_url.endswith('.gz') or \
+                response.headers.get('content-type', '').endswith('gzip')
+            if gzipped:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+            async for chunk in response.aiter_bytes():
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                parser.feed(chunk)
+
+                for event, elem in parser.read_events():
+                    if event == 'start':
+                        if root is None:
+                            root = elem
+                        continue
+
+                    name = _local_name(elem.tag)
+                    if name not in ('url', 'sitemap'):
+                        continue
+
+                    loc = next(
+                        (child.text for child in elem if _local_name(child.tag) == 'loc'),
+                        None
+                    )
+                    root.clear()
+                    if loc and loc.strip():
+                        yield name, loc.strip()
+
+            parser.close()
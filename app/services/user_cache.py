@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database.session import PrimarySyncSession, after_commit_hooks
+from app.integrations.redis_client import get_async_redis, get_redis
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Changes to these columns invalidate the cached record.
+SENSITIVE_FIELDS = ('email', 'role', 'password_hash')
+
+# Every process drops the published user ids from its local tier.
+INVALIDATION_CHANNEL = "user_cache:invalidations"
+
+def _redis_key(user_id: str) -> str:
+    return f"user_cache:{user_id}"
+
+def user_fields(user: User) -> Dict:
+    return {
+        'id': str(user.id),
+        'email': user.email,
+        'role': user.role,
+        'created_at': user.created_at.isoformat() if user.created_at else None
+    }
+
+def materialize(fields: Dict) -> User:
+    """A transient User built from cached fields, one per request so callers
+    never share an instance. It is not attached to any session."""
+    return User(
+        id=UUID(fields['id']),
+        email=fields['email'],
+        role=fields['role'],
+        created_at=datetime.fromisoformat(fields['created_at']) if fields['created_at'] else None
+    )
+
+class UserCache:
+    """In-process LRU of user records with a TTL, optionally backed by Redis.
+
+    The local tier answers most lookups with no I/O at all. The Redis tier
+    lets a process with a cold local tier skip the database when another
+    process already loaded the user. Invalidations are published so every
+    API process drops its local entry; ``ttl_seconds`` only bounds staleness
+    when a process misses the message.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, redis_ttl_seconds: int, use_redis: bool):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get_local(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, fields = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return fields
+
+    def _set_local(self, user_id: str, fields: Dict):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, fields)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get(self, user_id: str) -> Optional[Dict]:
+        fields = self._get_local(user_id)
+        if fields is not None:
+            self.hits += 1
+            return fields
+        
+        if self.use_redis:
+            try:
+                raw = await get_async_redis().get(_redis_key(user_id))
+            except Exception:
+                logger.warning("User cache Redis tier unavailable", exc_info=True)
+                raw = None
+            if raw is not None:
+                fields = json.loads(raw)
+                self._set_local(user_id, fields)
+                self.redis_hits += 1
+                return fields
+        
+        self.misses += 1
+        return None
+
+    async def set(self, user_id: str, fields: Dict):
+        self._set_local(user_id, fields)
+        if self.use_redis:
+            try:
+                await get_async_redis().set(_redis_key(user_id), json.dumps(fields), ex=self.redis_ttl_seconds)
+            except Exception:
+                logger.warning("User cache Redis tier unavailable", exc_info=True)
+
+    def _drop_local(self, user_ids: List[str]):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+            self.invalidations += len(user_ids)
+
+    def invalidate(self, user_ids: List[str]):
+        """Drop ``user_ids`` from every tier and every process. Blocking, for
+        workers and scripts; request handlers go through invalidate_async."""
+        self._drop_local(user_ids)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            if self.use_redis:
+                pipe.delete(*[_redis_key(user_id) for user_id in user_ids])
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(user_ids))
+            pipe.execute()
+        except Exception:
+            logger.warning("Could not invalidate users %s in Redis", user_ids, exc_info=True)
+
+    async def invalidate_async(self, user_ids: List[str]):
+        self._drop_local(user_ids)
+        try:
+            pipe = get_async_redis().pipeline(transaction=False)
+            if self.use_redis:
+                pipe.delete(*[_redis_key(user_id) for user_id in user_ids])
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(user_ids))
+            await pipe.execute()
+        except Exception:
+            logger.warning("Could not invalidate users %s in Redis", user_ids, exc_info=True)
+
+    async def listen(self):
+        """Apply invalidations published by other processes until cancelled.
+        Messages sent while disconnected are lost, so the local tier is
+        cleared on every (re)subscribe."""
+        while True:
+            pubsub = get_async_redis().pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                self.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        with self._lock:
+                            for user_id in json.loads(message['data']):
+                                self._entries.pop(user_id, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("User cache invalidation listener disconnected", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    redis_ttl_seconds=settings.USER_CACHE_REDIS_TTL_SECONDS,
+    use_redis=settings.USER_CACHE_REDIS
+)
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_users(session, flush_context, instances):
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in SENSITIVE_FIELDS):
+            session.info.setdefault('changed_users', set()).add(str(obj.id))
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            session.info.setdefault('changed_users', set()).add(str(obj.id))
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    user_ids = session.info.pop('changed_users', None)
+    if not user_ids:
+        return
+    if isinstance(session, PrimarySyncSession):
+        # A request handler's session: PrimarySession.commit awaits the
+        # invalidation instead of blocking the loop here.
+        session.info.setdefault('invalidate_users', set()).update(user_ids)
+    else:
+        user_cache.invalidate(sorted(user_ids))
+
+async def _flush_invalidated_users(info: Dict):
+    user_ids = info.pop('invalidate_users', None)
+    if user_ids:
+        await user_cache.invalidate_async(sorted(user_ids))
+
+after_commit_hooks.append(_flush_invalidated_users)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_users', None)
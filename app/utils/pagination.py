@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+class InvalidCursor(ValueError):
+    pass
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), default=json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, columns: Sequence) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor(cursor)
+    
+    try:
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (TypeError, ValueError):
+        raise InvalidCursor(cursor)
+
+def _coerce(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+def keyset(query: Select, columns: Sequence, cursor: Optional[str] = None) -> Select:
+    """Order ``query`` newest first by ``columns`` and resume after ``cursor``.
+
+    The last column must be unique (the primary key) so the order is total
+    and no row is skipped or repeated between pages. Unlike OFFSET, the
+    database seeks straight to the cursor position however deep the page.
+    """
+    query = query.order_by(*[column.desc() for column in columns])
+    if cursor:
+        query = query.where(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    return query
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Dict], Optional[str]]:
+    """Fetch one page of ``query``; returns its rows and the next cursor."""
+    rows = (await db.execute(keyset(query, columns, cursor).limit(limit + 1))).mappings().all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][column.key] for column in columns])
+    
+    return [dict(row) for row in rows], next_cursor
@@ -1,9 +1,13 @@
-from bs4 import BeautifulSoup
 from typing import Dict, List
 import re
 
+def _soup(html: str):
+    from bs4 import BeautifulSoup
+    
+    return BeautifulSoup(html, 'html.parser')
+
 def extract_text_from_html(html: str) -> str:
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = _soup(html)
     
     for script in soup(["script", "style"]):
         script.decompose()
@@ -16,7 +20,7 @@ def extract_text_from_html(html: str) -> str:
     return text
 
 def extract_headings(html: str) -> List[Dict]:
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = _soup(html)
     headings = []
     
     for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
@@ -29,7 +33,7 @@ def extract_headings(html: str) -> List[Dict]:
     return headings
 
 def extract_meta_tags(html: str) -> Dict:
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = _soup(html)
     
     meta_tags = {
         'title': '',
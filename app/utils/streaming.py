@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import zlib
+import orjson
+from typing import AsyncIterator, Dict, List
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import settings
+from app.database.session import AsyncSessionLocal
+from app.utils.pagination import json_default
+
+MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+async def stream_rows(
+    query: Select,
+    yield_per: int = None,
+    sessions: async_sessionmaker = None
+) -> AsyncIterator[Dict]:
+    """Iterate ``query`` through a server-side cursor, ``yield_per`` rows at a time.
+
+    Streaming responses outlive the request-scoped session, so the rows are
+    read with a session of our own from ``sessions`` (the primary by default).
+    """
+    yield_per = yield_per or settings.STREAM_YIELD_PER
+    sessions = sessions or AsyncSessionLocal
+    async with sessions() as db:
+        result = await db.stream(query.execution_options(yield_per=yield_per))
+        async for row in result.mappings():
+            yield dict(row)
+
+async def ndjson_lines(rows: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    async for row in rows:
+        yield orjson.dumps(row, default=json_default) + b"\n"
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=json_default)
+    if isinstance(value, (str, int, float)):
+        return value
+    return json_default(value)
+
+async def csv_lines(rows: AsyncIterator[Dict], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+    async for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow([_csv_value(row[column]) for column in columns])
+        yield buffer.getvalue().encode()
+
+async def batched(chunks: AsyncIterator[bytes], size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Coalesce small chunks so each write to the socket carries ~``size`` bytes."""
+    pending = []
+    pending_size = 0
+    first = True
+    async for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        # The first chunk goes out on its own so the download starts at once.
+        if first or pending_size >= size:
+            yield b"".join(pending)
+            pending, pending_size, first = [], 0, False
+    if pending:
+        yield b"".join(pending)
+
+async def gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        # Sync-flush each batch so compressed bytes keep flowing instead of
+        # sitting in the compressor's window.
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def ndjson_response(query: Select, sessions: async_sessionmaker = None) -> StreamingResponse:
+    rows = stream_rows(query, sessions=sessions)
+    return StreamingResponse(batched(ndjson_lines(rows)), media_type=MEDIA_TYPES['ndjson'])
+
+def export_response(
+    query: Select,
+    columns: List[str],
+    filename: str,
+    format: str = 'csv',
+    gzip: bool = False,
+    sessions: async_sessionmaker = None
+) -> StreamingResponse:
+    """Stream every row of ``query`` as a CSV or NDJSON file download."""
+    rows = stream_rows(query, sessions=sessions)
+    body = batched(csv_lines(rows, columns) if format == 'csv' else ndjson_lines(rows))
+    
+    filename = f"{filename}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        body = gzipped(body)
+        filename += ".gz"
+        media_type = 'application/gzip'
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
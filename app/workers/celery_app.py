@@ -1,5 +1,13 @@
+from fnmatch import fnmatch
 from celery import Celery
+from celery.schedules import crontab
+from kombu import Queue
 from app.config import settings
+from app.workers.serialization import register_serializers, SERIALIZER_NAME
+# Connects the task timing signals in publishers and workers alike.
+import app.workers.metrics  # noqa: F401
+
+register_serializers()
 
 celery_app = Celery(
     'seo_automation',
@@ -9,14 +17,125 @@ celery_app = Celery(
         'app.workers.tasks.meta_tasks',
         'app.workers.tasks.link_tasks',
         'app.workers.tasks.competitor_tasks',
-        'app.workers.tasks.serp_tasks'
+        'app.workers.tasks.serp_tasks',
+        'app.workers.tasks.schedule_tasks'
     ]
 )
 
+QUEUE_CRAWL = 'crawl'
+QUEUE_LLM = 'llm'
+QUEUE_SERP = 'serp'
+QUEUE_ANALYTICS = 'analytics'
+
+# Priorities follow the Redis transport convention: 0 is served first, 9 last.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 9
+
+# Per-queue delivery policy. Long-running queues prefetch a single message and
+# acknowledge only after the task finishes, so a lost worker hands its job to
+# another node and one worker never hoards a backlog it cannot start.
+QUEUE_POLICIES = {
+    QUEUE_CRAWL: {'acks_late': True, 'prefetch_multiplier': 1},
+    QUEUE_LLM: {'acks_late': True, 'prefetch_multiplier': 1},
+    QUEUE_SERP: {'acks_late': False, 'prefetch_multiplier': 4},
+    QUEUE_ANALYTICS: {'acks_late': True, 'prefetch_multiplier': 1},
+}
+
+TASK_ROUTES = {
+    'app.workers.tasks.link_tasks.*': {'queue': QUEUE_CRAWL},
+    'app.workers.tasks.meta_tasks.*': {'queue': QUEUE_LLM},
+    'app.workers.tasks.serp_tasks.*': {'queue': QUEUE_SERP},
+    'app.workers.tasks.competitor_tasks.*': {'queue': QUEUE_ANALYTICS},
+    'app.workers.tasks.schedule_tasks.*': {'queue': QUEUE_ANALYTICS},
+}
+
+# (soft, hard) limits in seconds. The soft limit raises SoftTimeLimitExceeded
+# inside the task so it can clean up; the hard limit kills the process
+# (prefork only).
+TASK_TIME_LIMITS = {
+    'app.workers.tasks.link_tasks.scan_broken_links_task': (2 * 3600, 2 * 3600 + 300),
+    'app.workers.tasks.link_tasks.check_links_chunk_task': (15 * 60, 20 * 60),
+    'app.workers.tasks.link_tasks.merge_link_scan_task': (5 * 60, 10 * 60),
+    'app.workers.tasks.meta_tasks.generate_meta_tags_task': (120, 180),
+    'app.workers.tasks.meta_tasks.generate_bulk_meta_task': (12 * 3600, 12 * 3600 + 300),
+    'app.workers.tasks.serp_tasks.compare_serp_task': (60, 120),
+    'app.workers.tasks.serp_tasks.compare_serp_chunk_task': (10 * 60, 15 * 60),
+    'app.workers.tasks.serp_tasks.merge_serp_results_task': (60, 120),
+    'app.workers.tasks.serp_tasks.maintain_serp_history_task': (10 * 60, 15 * 60),
+    'app.workers.tasks.competitor_tasks.analyze_competitor_task': (30 * 60, 35 * 60),
+    'app.workers.tasks.schedule_tasks.dispatch_due_schedules_task': (
+        settings.SCHEDULER_TICK_SECONDS * 3,
+        settings.SCHEDULER_TICK_SECONDS * 4
+    ),
+}
+
+# Worker profiles, one per queue. I/O-bound queues run the threads pool so many
+# tasks share the per-process async runtime (app.workers.runtime); CPU-bound
+# analytics runs prefork with one process per core. The threads pool does not
+# enforce TASK_TIME_LIMITS; the runtime applies the soft limit to the
+# coroutines those tasks run. Start a worker with
+# ``python -m app.workers.worker <profile>``.
+WORKER_PROFILES = {
+    'crawl': {'queues': [QUEUE_CRAWL], 'pool': 'threads', 'concurrency': 32},
+    'llm': {'queues': [QUEUE_LLM], 'pool': 'threads', 'concurrency': 16},
+    'serp': {'queues': [QUEUE_SERP], 'pool': 'threads', 'concurrency': 32},
+    'analytics': {'queues': [QUEUE_ANALYTICS], 'pool': 'prefork', 'concurrency': None},
+}
+
+def queue_for_task(task_name: str) -> str:
+    for pattern, route in TASK_ROUTES.items():
+        if fnmatch(task_name, pattern):
+            return route['queue']
+    return QUEUE_ANALYTICS
+
+class QueuePolicyAnnotations:
+    """Applies the routed queue's acks_late policy and the task's time limits."""
+
+    def annotate(self, task):
+        if not task.name.startswith('app.workers.tasks.'):
+            return None
+
+        options = {'acks_late': QUEUE_POLICIES[queue_for_task(task.name)]['acks_late']}
+        if task.name in TASK_TIME_LIMITS:
+            options['soft_time_limit'], options['time_limit'] = TASK_TIME_LIMITS[task.name]
+        return options
+
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer=settings.CELERY_SERIALIZER,
+    result_serializer=settings.CELERY_SERIALIZER,
+    # JSON stays accepted so messages queued before a serializer switch drain.
+    accept_content=[SERIALIZER_NAME, 'json'],
+    result_accept_content=[SERIALIZER_NAME, 'json'],
+    result_expires=settings.CELERY_RESULT_EXPIRES,
     timezone='UTC',
     enable_utc=True,
+    task_queues=[
+        Queue(name, routing_key=name, queue_arguments={'x-max-priority': 10})
+        for name in QUEUE_POLICIES
+    ],
+    task_default_queue=QUEUE_ANALYTICS,
+    task_routes=TASK_ROUTES,
+    task_annotations=[QueuePolicyAnnotations()],
+    task_default_priority=PRIORITY_DEFAULT,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Beat only fires the tick; the schedules themselves live in the database.
+    beat_schedule={
+        'scheduler-tick': {
+            'task': 'app.workers.tasks.schedule_tasks.dispatch_due_schedules_task',
+            'schedule': settings.SCHEDULER_TICK_SECONDS,
+            'options': {'expires': settings.SCHEDULER_TICK_SECONDS},
+        },
+        # Creates upcoming SERP history partitions and enforces retention.
+        'serp-history-maintenance': {
+            'task': 'app.workers.tasks.serp_tasks.maintain_serp_history_task',
+            'schedule': crontab(minute=15, hour=3),
+        },
+    },
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
 )
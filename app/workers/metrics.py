@@ -0,0 +1,60 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from celery.signals import before_task_publish, task_prerun, task_postrun, worker_ready, worker_process_shutdown
+from prometheus_client import CollectorRegistry, REGISTRY, multiprocess, start_http_server
+from app.config import settings
+from app.metrics import CELERY_TASK_DURATION, CELERY_TASK_QUEUE_WAIT
+
+_started: Dict[str, float] = {}
+
+@before_task_publish.connect
+def _stamp_published_at(headers=None, **kwargs):
+    # Message headers become request attributes on the worker.
+    if headers is not None:
+        headers['published_at'] = time.time()
+
+def _ready_at(request) -> Optional[float]:
+    """When the task became runnable: its publish time, or its ETA for
+    countdown tasks, so a scheduled delay is not counted as queue wait."""
+    ready_at = getattr(request, 'published_at', None)
+    if ready_at is None:
+        return None
+    if request.eta:
+        eta = datetime.fromisoformat(request.eta) if isinstance(request.eta, str) else request.eta
+        if eta.tzinfo is None:
+            eta = eta.replace(tzinfo=timezone.utc)
+        ready_at = max(ready_at, eta.timestamp())
+    return ready_at
+
+@task_prerun.connect
+def _start_task_timer(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    ready_at = _ready_at(task.request)
+    if ready_at is not None:
+        queue = (task.request.delivery_info or {}).get('routing_key') or 'unknown'
+        CELERY_TASK_QUEUE_WAIT.labels(task.name, queue).observe(max(0.0, time.time() - ready_at))
+
+@task_postrun.connect
+def _observe_task(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+@worker_ready.connect
+def _start_metrics_server(**kwargs):
+    if not settings.METRICS_WORKER_PORT:
+        return
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Prefork children record into the shared directory; the main
+        # process serves them all.
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(settings.METRICS_WORKER_PORT, registry=registry)
+
+@worker_process_shutdown.connect
+def _mark_process_dead(pid=None, **kwargs):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid or os.getpid())
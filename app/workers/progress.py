@@ -0,0 +1,88 @@
+import json
+from contextlib import contextmanager
+from typing import Dict, Optional
+from app.integrations.redis_client import get_redis
+
+PROGRESS_TTL_SECONDS = 7 * 24 * 3600
+
+def _key(job_id: str) -> str:
+    return f"progress:{job_id}"
+
+# Sets of chunk indexes rather than counters, so a chunk redelivered under
+# acks_late is not counted twice.
+def _done_key(job_id: str) -> str:
+    return f"progress:{job_id}:done"
+
+def _failed_key(job_id: str) -> str:
+    return f"progress:{job_id}:failed"
+
+def start_chunks(job_id: str, total_chunks: int):
+    key = _key(job_id)
+    pipe = get_redis().pipeline()
+    pipe.delete(key, _done_key(job_id), _failed_key(job_id))
+    pipe.hset(key, mapping={
+        'total_chunks': total_chunks,
+        'status': 'processing'
+    })
+    pipe.expire(key, PROGRESS_TTL_SECONDS)
+    pipe.execute()
+
+def complete_chunk(job_id: str, chunk_index: int, failed: bool = False) -> Dict:
+    """Record chunk ``chunk_index`` as done. Idempotent: a re-run replaces
+    the chunk's earlier outcome instead of adding to it."""
+    pipe = get_redis().pipeline()
+    pipe.sadd(_done_key(job_id), chunk_index)
+    if failed:
+        pipe.sadd(_failed_key(job_id), chunk_index)
+    else:
+        pipe.srem(_failed_key(job_id), chunk_index)
+    pipe.expire(_done_key(job_id), PROGRESS_TTL_SECONDS)
+    pipe.expire(_failed_key(job_id), PROGRESS_TTL_SECONDS)
+    pipe.scard(_done_key(job_id))
+    pipe.hget(_key(job_id), 'total_chunks')
+    results = pipe.execute()
+    completed, total = results[-2], int(results[-1] or 0)
+    return {
+        'completed_chunks': completed,
+        'total_chunks': total,
+        'progress': int(completed * 100 / total) if total else 0
+    }
+
+def finish(job_id: str, summary: Dict, status: str = 'completed'):
+    key = _key(job_id)
+    pipe = get_redis().pipeline()
+    pipe.hset(key, mapping={'status': status, 'summary': json.dumps(summary)})
+    pipe.expire(key, PROGRESS_TTL_SECONDS)
+    pipe.expire(_done_key(job_id), PROGRESS_TTL_SECONDS)
+    pipe.expire(_failed_key(job_id), PROGRESS_TTL_SECONDS)
+    pipe.execute()
+
+@contextmanager
+def finish_on_error(job_id: str):
+    """Close the progress record as failed if the block raises, so pollers
+    stop waiting on a merge that will never finish."""
+    try:
+        yield
+    except Exception as e:
+        finish(job_id, {'error': str(e)}, status='failed')
+        raise
+
+def get_progress(job_id: str) -> Optional[Dict]:
+    pipe = get_redis().pipeline()
+    pipe.hgetall(_key(job_id))
+    pipe.scard(_done_key(job_id))
+    pipe.scard(_failed_key(job_id))
+    raw, completed, failed = pipe.execute()
+    if not raw:
+        return None
+    
+    data = {k.decode(): v.decode() for k, v in raw.items()}
+    total = int(data.get('total_chunks', 0))
+    return {
+        'status': data.get('status'),
+        'total_chunks': total,
+        'completed_chunks': completed,
+        'failed_chunks': failed,
+        'progress': int(completed * 100 / total) if total else 0,
+        'summary': json.loads(data['summary']) if 'summary' in data else None
+    }
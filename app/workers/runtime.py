@@ -0,0 +1,123 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Coroutine, Optional
+from celery import current_task
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import task_prerun, worker_process_init, worker_process_shutdown, worker_shutdown
+from app.integrations.http_client import close_http_client
+
+class WorkerRuntime:
+    """One asyncio event loop per worker process, running in a daemon thread.
+
+    Tasks hand their coroutines to this loop instead of spinning up a fresh
+    loop each time, so loop-bound resources such as the shared HTTP client
+    survive between tasks. Under a ``threads`` or ``gevent`` pool, several
+    tasks submit to the same loop at once and their I/O overlaps.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        # A loop thread inherited through fork() is not running in the child,
+        # so the runtime is restarted whenever the pid changes.
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    self._start()
+        return self._loop
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=loop.run_forever,
+            name="worker-async-runtime",
+            daemon=True
+        )
+        thread.start()
+        self._loop = loop
+        self._thread = thread
+        self._pid = os.getpid()
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        deadline = _task_deadline()
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = remaining
+        else:
+            deadline = None
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            if deadline is not None:
+                raise SoftTimeLimitExceeded()
+            raise
+        except BaseException:
+            # Covers Celery's SoftTimeLimitExceeded and worker shutdown, so
+            # the coroutine does not keep running after the task gave up.
+            future.cancel()
+            raise
+
+    def shutdown(self):
+        if self._loop is None or self._pid != os.getpid():
+            return
+
+        asyncio.run_coroutine_threadsafe(close_http_client(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+def _task_deadline() -> Optional[float]:
+    """Monotonic time at which the running task's soft time limit expires.
+
+    The threads pool ignores soft_time_limit and time_limit, so the runtime
+    enforces the soft limit itself: a coroutine still running at the
+    deadline is cancelled and SoftTimeLimitExceeded raised in the task, as
+    the prefork pool would. Synchronous work between coroutines is not
+    interrupted.
+    """
+    if not current_task:
+        return None
+    request = current_task.request
+    started_at = getattr(request, 'runtime_started_at', None)
+    soft_limit = (request.timelimit or (None, None))[1] or current_task.soft_time_limit
+    if started_at is None or not soft_limit:
+        return None
+    return started_at + soft_limit
+
+runtime = WorkerRuntime()
+
+def run_async(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    return runtime.run(coro, timeout)
+
+@task_prerun.connect
+def _stamp_task_start(task=None, **kwargs):
+    task.request.runtime_started_at = time.monotonic()
+
+# Only prefork children fire worker_process_init; under the threads pool the
+# loop starts on first use and the engines were never forked.
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    from app.database.session import engine, async_engine
+
+    # Connections opened by the parent must not be shared across the fork.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    runtime.loop
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    runtime.shutdown()
@@ -0,0 +1,139 @@
+import os
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+from urllib.parse import urlparse
+import msgpack
+import redis
+import zstandard
+from kombu.serialization import register
+from app.config import settings
+
+SERIALIZER_NAME = 'msgpack-zstd'
+CONTENT_TYPE = 'application/x-msgpack-zstd'
+
+# Every payload starts with a one-byte frame marker.
+FRAME_RAW = b'\x00'
+FRAME_ZSTD = b'\x01'
+FRAME_REF = b'\x02'
+
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_UUID = 3
+EXT_DECIMAL = 4
+
+# zstandard contexts must not be shared between threads (threads pool).
+_zstd = threading.local()
+
+def _compressor() -> zstandard.ZstdCompressor:
+    if not hasattr(_zstd, 'compressor'):
+        _zstd.compressor = zstandard.ZstdCompressor(level=3)
+    return _zstd.compressor
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    if not hasattr(_zstd, 'decompressor'):
+        _zstd.decompressor = zstandard.ZstdDecompressor()
+    return _zstd.decompressor
+
+def _default(obj: Any):
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(EXT_UUID, obj.bytes)
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(obj).encode())
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+def _ext_hook(code: int, data: bytes):
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    return msgpack.ExtType(code, data)
+
+class RedisBlobStore:
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def put(self, key: str, blob: bytes, ttl: int):
+        self.client.set(f"blob:{key}", blob, ex=ttl)
+
+    def get(self, key: str) -> bytes:
+        blob = self.client.get(f"blob:{key}")
+        if blob is None:
+            raise KeyError(f"Offloaded payload {key} has expired or does not exist")
+        return blob
+
+class FileBlobStore:
+    """Blob store on a directory shared by the API and workers (e.g. an NFS
+    or volume mount). Expired files are left for an external cleanup job."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def put(self, key: str, blob: bytes, ttl: int):
+        tmp_path = os.path.join(self.path, f".{key}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, os.path.join(self.path, key))
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(os.path.join(self.path, key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(f"Offloaded payload {key} does not exist")
+
+@lru_cache(maxsize=None)
+def get_blob_store():
+    url = settings.CELERY_BLOB_STORE_URL or settings.REDIS_URL
+    if url.startswith('file://'):
+        return FileBlobStore(urlparse(url).path)
+    return RedisBlobStore(url)
+
+def dumps(obj: Any) -> bytes:
+    packed = msgpack.packb(obj, default=_default, use_bin_type=True)
+    if len(packed) < settings.CELERY_COMPRESSION_THRESHOLD:
+        return FRAME_RAW + packed
+
+    compressed = _compressor().compress(packed)
+    if len(compressed) < settings.CELERY_OFFLOAD_THRESHOLD:
+        return FRAME_ZSTD + compressed
+
+    # Pass by reference: the broker (or result backend) only carries the key.
+    key = uuid.uuid4().hex
+    get_blob_store().put(key, compressed, settings.CELERY_BLOB_TTL_SECONDS)
+    return FRAME_REF + key.encode()
+
+def loads(data: bytes) -> Any:
+    if isinstance(data, str):
+        data = data.encode('latin-1')
+
+    frame, body = data[:1], data[1:]
+    if frame == FRAME_REF:
+        body = _decompressor().decompress(get_blob_store().get(body.decode()))
+    elif frame == FRAME_ZSTD:
+        body = _decompressor().decompress(body)
+    elif frame != FRAME_RAW:
+        raise ValueError(f"Unknown {SERIALIZER_NAME} frame marker {frame!r}")
+
+    return msgpack.unpackb(body, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+def register_serializers():
+    register(
+        SERIALIZER_NAME,
+        dumps,
+        loads,
+        content_type=CONTENT_TYPE,
+        content_encoding='binary'
+    )
@@ -1,20 +1,46 @@
+from app.database.session import SessionLocal
+from app.models.competitor import CompetitorAnalysis
 from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.services.job_service import track_job, update_job
 from app.services.competitor_service import CompetitorService
-from typing import List
+from typing import List, Optional
 
 @celery_app.task
 def analyze_competitor_task(
     project_id: str,
     competitor_urls: List[str],
-    target_url: str
+    target_url: str,
+    job_id: Optional[str] = None
 ):
     service = CompetitorService()
     
-    analysis = service.analyze_competitors(target_url, competitor_urls)
+    with track_job(job_id):
+        analysis = run_async(service.analyze_competitors(target_url, competitor_urls))
+        
+        db = SessionLocal()
+        try:
+            record = CompetitorAnalysis(
+                project_id=project_id,
+                target_url=target_url,
+                competitor_urls=competitor_urls,
+                similarity_score=analysis['similarity_score'],
+                keyword_gap=analysis['keyword_gap'],
+                topic_clusters=analysis['topic_clusters']
+            )
+            db.add(record)
+            db.commit()
+            analysis_id = str(record.id)
+        finally:
+            db.close()
+    
+    if job_id:
+        update_job(job_id, status='completed', progress=100, result={'analysis_id': analysis_id})
     
     return {
         'project_id': project_id,
         'target_url': target_url,
+        'analysis_id': analysis_id,
         'analysis': analysis,
         'status': 'completed'
     }
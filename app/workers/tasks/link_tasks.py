@@ -1,15 +1,98 @@
+from collections import Counter
+from typing import Dict, List
+from celery import chord
+from app.config import settings
+from app.database.session import SessionLocal
 from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.workers import progress
+from app.services.job_service import track_job, update_job
 from app.services.broken_link_service import BrokenLinkService
+from app.services.broken_link_store import persist_scan
 
 @celery_app.task
 def scan_broken_links_task(scan_id: str, project_id: str, domain: str):
     service = BrokenLinkService()
     
-    broken_links = service.scan_domain(domain)
+    with track_job(scan_id):
+        pages = run_async(service.crawl_pages(domain))
+        chunk_size = settings.LINK_SCAN_CHUNK_SIZE
+        chunks = [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)] or [[]]
+        
+        progress.start_chunks(scan_id, len(chunks))
+        chord(
+            check_links_chunk_task.s(scan_id, index, chunk) for index, chunk in enumerate(chunks)
+        )(merge_link_scan_task.s(scan_id, project_id).on_error(fail_link_scan_task.s(scan_id)))
+    
+    return {
+        'scan_id': scan_id,
+        'project_id': project_id,
+        'pages': len(pages),
+        'chunks': len(chunks),
+        'status': 'processing'
+    }
+
+@celery_app.task
+def check_links_chunk_task(scan_id: str, chunk_index: int, pages: List[Dict]):
+    service = BrokenLinkService()
+    
+    # A failed chunk is recorded and contributes no links instead of failing
+    # the whole chord, so the merge step still runs for the other chunks.
+    try:
+        broken_links = run_async(service.find_broken_links(pages))
+    except Exception:
+        broken_links = []
+        chunk = progress.complete_chunk(scan_id, chunk_index, failed=True)
+    else:
+        chunk = progress.complete_chunk(scan_id, chunk_index)
+    
+    update_job(scan_id, progress=min(chunk['progress'], 99))
+    return broken_links
+
+@celery_app.task
+def merge_link_scan_task(chunk_results: List[List[Dict]], scan_id: str, project_id: str):
+    seen = set()
+    broken_links = []
+    for chunk in chunk_results:
+        for link in chunk:
+            key = (link['source_url'], link['broken_url'])
+            if key not in seen:
+                seen.add(key)
+                broken_links.append(link)
+    
+    with track_job(scan_id), progress.finish_on_error(scan_id):
+        # Links on pages of a failed chunk were never checked, so only a
+        # complete scan may resolve links it did not find.
+        scan_progress = progress.get_progress(scan_id)
+        complete = scan_progress is not None and scan_progress['failed_chunks'] == 0
+        
+        db = SessionLocal()
+        try:
+            persisted = persist_scan(db, project_id, broken_links, resolve_missing=complete)
+            db.commit()
+        finally:
+            db.close()
+        
+        summary = {
+            'total_broken': len(broken_links),
+            'unique_broken_urls': len({link['broken_url'] for link in broken_links}),
+            'by_status_code': dict(Counter(str(link['status_code']) for link in broken_links)),
+            'resolved': persisted['resolved']
+        }
+        progress.finish(scan_id, summary)
+        update_job(scan_id, status='completed', progress=100, result=summary)
     
     return {
         'scan_id': scan_id,
         'project_id': project_id,
         'broken_links': broken_links,
+        'summary': summary,
         'status': 'completed'
     }
+
+@celery_app.task
+def fail_link_scan_task(request, exc, traceback, scan_id: str):
+    """Chord errback: a chunk died outside its own error handling, so the
+    merge never runs and the scan has to be failed here."""
+    progress.finish(scan_id, {'error': str(exc)}, status='failed')
+    update_job(scan_id, status='failed', error=str(exc))
@@ -1,20 +1,58 @@
-from app.workers.celery_app import celery_app
+from typing import Optional
+from app.database.session import SessionLocal
+from app.models.meta import MetaTag
+from app.workers.celery_app import celery_app, PRIORITY_INTERACTIVE, PRIORITY_BULK
+from app.workers.runtime import run_async
+from app.services.job_service import track_job, update_job
 from app.services.meta_generator import MetaGeneratorService
+from app.services.bulk_meta_service import BulkMetaService
 from app.integrations.apify_client import ApifyClient
 
-@celery_app.task
-def generate_meta_tags_task(project_id: str, url: str, content: str):
-    service = MetaGeneratorService()
-    apify_client = ApifyClient()
+@celery_app.task(priority=PRIORITY_INTERACTIVE)
+def generate_meta_tags_task(project_id: str, url: str, content: str, job_id: Optional[str] = None):
+    with track_job(job_id):
+        content, result = run_async(_generate_meta_tags(url, content))
+        
+        db = SessionLocal()
+        try:
+            meta_tag = MetaTag(
+                project_id=project_id,
+                url=url,
+                input_content=content,
+                variants=result['variants'],
+                scores=result['scores']
+            )
+            db.add(meta_tag)
+            db.commit()
+            meta_id = str(meta_tag.id)
+        finally:
+            db.close()
     
-    if url and not content:
-        scraped = apify_client.scrape_url(url)
-        content = scraped.get('text', '')
-    
-    result = service.generate_meta_tags(content, url)
+    if job_id:
+        update_job(job_id, status='completed', progress=100, result={'meta_id': meta_id})
     
     return {
         'project_id': project_id,
         'url': url,
+        'meta_id': meta_id,
         'result': result
     }
+
+async def _generate_meta_tags(url: str, content: str):
+    service = MetaGeneratorService()
+    apify_client = ApifyClient()
+    
+    if url and not content:
+        scraped = await apify_client.scrape_url(url)
+        content = scraped.get('text', '')
+    
+    result = await service.generate_meta_tags(content, url)
+    return content, result
+
+@celery_app.task(acks_late=True, priority=PRIORITY_BULK)
+def generate_bulk_meta_task(job_id: str):
+    # acks_late means a job interrupted by a worker crash is redelivered and
+    # picks up from the last committed cursor.
+    service = BulkMetaService()
+    
+    return run_async(service.run(job_id))
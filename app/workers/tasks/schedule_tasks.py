@@ -0,0 +1,128 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict
+from redis.exceptions import LockError
+from app.config import settings
+from app.database.session import AsyncSessionLocal
+from app.integrations.redis_client import get_redis
+from app.models.project import Project
+from app.workers.celery_app import celery_app, PRIORITY_BULK
+from app.workers.runtime import run_async
+from app.services.job_service import JobService
+from app.services.scheduler import SchedulerService
+
+logger = logging.getLogger(__name__)
+
+TICK_LOCK_KEY = "scheduler:tick"
+
+def _task_call(task_type: str, job_id: str, project: Project, params: Dict):
+    # Imported lazily: the task modules pull in the scraping and LLM services.
+    if task_type == 'link_scan':
+        from app.workers.tasks.link_tasks import scan_broken_links_task
+        return scan_broken_links_task, (job_id, str(project.id), params.get('domain') or project.domain), {}
+    if task_type == 'serp_compare':
+        from app.workers.tasks.serp_tasks import compare_serp_task
+        return compare_serp_task, (
+            job_id,
+            str(project.id),
+            params.get('keywords', []),
+            params.get('location', 'United States')
+        ), {}
+    if task_type == 'competitor_analysis':
+        from app.workers.tasks.competitor_tasks import analyze_competitor_task
+        return analyze_competitor_task, (
+            str(project.id),
+            params.get('competitor_urls', []),
+            params.get('target_url')
+        ), {'job_id': job_id}
+    if task_type == 'meta_generate':
+        from app.workers.tasks.meta_tasks import generate_meta_tags_task
+        return generate_meta_tags_task, (
+            str(project.id),
+            params.get('url'),
+            params.get('content')
+        ), {'job_id': job_id}
+    raise ValueError(f"Unsupported task type: {task_type}")
+
+async def _dispatch_run(db, run: Dict, run_time: str) -> bool:
+    project = await db.get(Project, run['project_id'])
+    if project is None:
+        return False
+    
+    # Keyed on the fire time, so each occurrence becomes exactly one job even
+    # if two ticks overlap after the tick lock expired.
+    service = JobService(db)
+    job, created = await service.get_or_create_job(
+        project.id,
+        project.owner_id,
+        run['task_type'],
+        params={**run['params'], 'schedule_id': run['schedule_id'], 'scheduled_for': run_time}
+    )
+    if created:
+        task, args, kwargs = _task_call(run['task_type'], str(job.id), project, run['params'])
+        await service.dispatch(job, task, args=args, kwargs=kwargs, priority=PRIORITY_BULK)
+    return created
+
+@celery_app.task
+def dispatch_due_schedules_task():
+    """Scheduler tick, fired by Celery beat every SCHEDULER_TICK_SECONDS.
+
+    A Redis lock keeps one tick running at a time across all beat and worker
+    replicas; row locks in ``claim_due`` back it up if the lock expires early.
+    """
+    lock = get_redis().lock(
+        TICK_LOCK_KEY,
+        timeout=settings.SCHEDULER_TICK_SECONDS * 4,
+        blocking=False
+    )
+    if not lock.acquire():
+        return {'status': 'skipped'}
+    
+    try:
+        claimed, dispatched = run_async(_tick())
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass
+    
+    return {'status': 'completed', 'claimed': claimed, 'dispatched': dispatched}
+
+async def _tick():
+    claimed = 0
+    dispatched = 0
+    deadline = time.monotonic() + settings.SCHEDULER_TICK_SECONDS * 2
+    
+    async with AsyncSessionLocal() as db:
+        service = SchedulerService(db)
+        while time.monotonic() < deadline:
+            batch = await service.claim_due()
+            claimed += len(batch)
+            failed = False
+            
+            for run in batch:
+                for run_time in run['run_times']:
+                    try:
+                        if await _dispatch_run(db, run, run_time):
+                            dispatched += 1
+                    except Exception:
+                        await db.rollback()
+                        logger.exception("Failed to dispatch schedule %s", run['schedule_id'])
+                        failed = True
+                        # The claim already moved the schedule past this
+                        # occurrence and the ones after it; without a rewind
+                        # they would never run.
+                        try:
+                            await service.rewind(run['schedule_id'], datetime.fromisoformat(run_time))
+                        except Exception:
+                            await db.rollback()
+                            logger.exception("Failed to rewind schedule %s to %s", run['schedule_id'], run_time)
+                        break
+            
+            # After a failure, leave the rest (and the rewound schedules) to
+            # the next tick rather than re-claiming them straight away.
+            if failed or len(batch) < settings.SCHEDULER_BATCH_SIZE:
+                break
+    
+    return claimed, dispatched
@@ -1,6 +1,13 @@
+from typing import Dict, List
+from celery import chord
+from app.config import settings
+from app.database.session import SessionLocal
 from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.workers import progress
+from app.services.job_service import track_job, update_job
 from app.services.serp_service import SerpService
-from typing import List
+from app.services import serp_history
 
 @celery_app.task
 def compare_serp_task(
@@ -9,13 +16,89 @@ def compare_serp_task(
     keywords: List[str],
     location: str
 ):
+    chunk_size = settings.SERP_KEYWORD_CHUNK_SIZE
+    chunks = [keywords[i:i + chunk_size] for i in range(0, len(keywords), chunk_size)] or [[]]
+    
+    with track_job(comparison_id):
+        progress.start_chunks(comparison_id, len(chunks))
+        chord(
+            compare_serp_chunk_task.s(comparison_id, index, chunk, location) for index, chunk in enumerate(chunks)
+        )(merge_serp_results_task.s(comparison_id, project_id).on_error(fail_serp_comparison_task.s(comparison_id)))
+    
+    return {
+        'comparison_id': comparison_id,
+        'project_id': project_id,
+        'chunks': len(chunks),
+        'status': 'processing'
+    }
+
+@celery_app.task
+def compare_serp_chunk_task(comparison_id: str, chunk_index: int, keywords: List[str], location: str):
     service = SerpService()
     
-    results = service.compare_serp(keywords, location)
+    try:
+        results = run_async(service.compare_serp(keywords, location))
+    except Exception:
+        results = {'results': [], 'failed_keywords': keywords}
+        chunk = progress.complete_chunk(comparison_id, chunk_index, failed=True)
+    else:
+        chunk = progress.complete_chunk(comparison_id, chunk_index)
+    
+    update_job(comparison_id, progress=min(chunk['progress'], 99))
+    return results
+
+@celery_app.task
+def merge_serp_results_task(chunk_results: List[Dict], comparison_id: str, project_id: str):
+    results = []
+    failed_keywords = []
+    for chunk in chunk_results:
+        results.extend(chunk.get('results', []))
+        failed_keywords.extend(chunk.get('failed_keywords', []))
+    
+    with track_job(comparison_id), progress.finish_on_error(comparison_id):
+        db = SessionLocal()
+        try:
+            recorded = serp_history.record_rankings(db, project_id, results)
+            db.commit()
+        finally:
+            db.close()
+        
+        summary = {
+            'keywords': len(results),
+            'rankings_recorded': recorded,
+            'failed_keywords': failed_keywords
+        }
+        progress.finish(comparison_id, summary)
+        update_job(comparison_id, status='completed', progress=100, result={**summary, 'results': results})
     
     return {
         'comparison_id': comparison_id,
         'project_id': project_id,
-        'results': results,
+        'results': {'results': results},
+        'summary': summary,
         'status': 'completed'
     }
+
+@celery_app.task
+def fail_serp_comparison_task(request, exc, traceback, comparison_id: str):
+    """Chord errback: a chunk died outside its own error handling, so the
+    merge never runs and the comparison has to be failed here."""
+    progress.finish(comparison_id, {'error': str(exc)}, status='failed')
+    update_job(comparison_id, status='failed', error=str(exc))
+
+@celery_app.task
+def maintain_serp_history_task():
+    db = SessionLocal()
+    try:
+        created = serp_history.ensure_partitions(db, settings.SERP_PARTITION_PREMAKE_MONTHS)
+        dropped = serp_history.drop_expired_partitions(db, settings.SERP_RAW_RETENTION_DAYS)
+        pruned = serp_history.prune_daily_rollups(db, settings.SERP_DAILY_RETENTION_DAYS)
+        db.commit()
+    finally:
+        db.close()
+    
+    return {
+        'partitions_ensured': created,
+        'partitions_dropped': dropped,
+        'daily_rollups_pruned': pruned
+    }
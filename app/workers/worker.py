@@ -0,0 +1,29 @@
+import os
+import sys
+from app.workers.celery_app import QUEUE_POLICIES, WORKER_PROFILES
+
+def build_worker_args(profile_name: str) -> list:
+    profile = WORKER_PROFILES[profile_name]
+    prefetch = min(QUEUE_POLICIES[q]['prefetch_multiplier'] for q in profile['queues'])
+    
+    args = [
+        'celery', '-A', 'app.workers.celery_app', 'worker',
+        '--loglevel=info',
+        f"--hostname={profile_name}@%h",
+        f"--queues={','.join(profile['queues'])}",
+        f"--pool={profile['pool']}",
+        f"--prefetch-multiplier={prefetch}",
+    ]
+    
+    concurrency = os.environ.get('WORKER_CONCURRENCY') or profile['concurrency']
+    if concurrency:
+        args.append(f"--concurrency={concurrency}")
+    
+    return args
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or sys.argv[1] not in WORKER_PROFILES:
+        sys.exit(f"usage: python -m app.workers.worker {{{'|'.join(WORKER_PROFILES)}}}")
+    
+    args = build_worker_args(sys.argv[1])
+    os.execvp(args[0], args)
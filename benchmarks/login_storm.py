@@ -0,0 +1,119 @@
+"""Latency of unrelated endpoints during a login storm.
+
+Serves two copies of a login endpoint from one event loop (as a single
+uvicorn worker would): one verifying bcrypt inline, as the auth router used
+to, and one going through ``password_hasher``'s bounded thread pool. A burst
+of concurrent logins runs against each while a steady client polls a cheap
+endpoint. Inline hashing stalls the loop for every login, which shows up in
+the cheap endpoint's p99; the pool keeps it flat and sheds logins beyond its
+queue limit with 503s. No database is needed. Run from the repository root:
+
+    python benchmarks/login_storm.py --logins 200 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('APIFY_API_TOKEN', 'benchmark')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from app.services.password_hasher import pwd_context, password_hasher, PasswordHasherBusy
+
+PASSWORD = "correct horse battery staple"
+
+def build_app(password_hash: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    @app.post("/inline/login")
+    async def inline_login():
+        if not pwd_context.verify(PASSWORD, password_hash):
+            raise HTTPException(status_code=401)
+        return {}
+
+    @app.post("/pooled/login")
+    async def pooled_login():
+        try:
+            valid, _ = await password_hasher.verify_and_update(PASSWORD, password_hash)
+        except PasswordHasherBusy:
+            raise HTTPException(status_code=503, headers={"Retry-After": "1"})
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {}
+
+    return app
+
+async def run(client: httpx.AsyncClient, mode: str, logins: int, concurrency: int, ping_interval: float):
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def login():
+        async with semaphore:
+            response = await client.post(f"/{mode}/login")
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def poll():
+        # Latency counts from when each ping was due, so time spent waiting
+        # for a blocked loop to get around to sending it is included.
+        due = time.perf_counter()
+        while True:
+            (await client.get("/ping")).raise_for_status()
+            latencies.append(time.perf_counter() - due)
+            if done.is_set():
+                break
+            due += ping_interval
+            await asyncio.sleep(max(0, due - time.perf_counter()))
+
+    poller = asyncio.create_task(poll())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await poller
+    return latencies, statuses, elapsed
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+async def main_async(args):
+    app = build_app(pwd_context.hash(PASSWORD))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for mode in ('inline', 'pooled'):
+            latencies, statuses, elapsed = await run(
+                client, mode, args.logins, args.concurrency, args.ping_interval
+            )
+            print(
+                f"{mode:<6} ping requests={len(latencies):5d} "
+                f"p50={statistics.median(latencies) * 1000:8.1f}ms "
+                f"p99={percentile(latencies, 0.99) * 1000:8.1f}ms "
+                f"max={max(latencies) * 1000:8.1f}ms "
+                f"logins={dict(sorted(statuses.items()))} in {elapsed:.1f}s"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--ping-interval', type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"bcrypt rounds={pwd_context.to_dict()['bcrypt__default_rounds']} {password_hasher.stats()}")
+    asyncio.run(main_async(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Serialization cost of a 10k-row list response.
+
+Serves the same 10k SERP rows three ways from one app: as the routers used to
+(plain dicts through FastAPI's ``jsonable_encoder`` and stdlib ``json``), with
+``ORJSONResponse`` alone, and with the list endpoint's Pydantic response model
+plus ``ORJSONResponse`` as the routers do now. Then compresses the payload as
+``CompressionMiddleware`` would. No database is needed. Run from the
+repository root:
+
+    python benchmarks/serialization.py --rows 10000 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('APIFY_API_TOKEN', 'benchmark')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.config import settings
+from app.middleware import compression
+from app.routers.serp import SerpDataListResponse
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    return [
+        {
+            'id': uuid.uuid4(),
+            'keyword': f'keyword {i % 500}',
+            'domain': f'site{i % 37}.example.com',
+            'rank': 1 + i % 100,
+            'detected_at': now - timedelta(minutes=i)
+        }
+        for i in range(count)
+    ]
+
+def build_app(rows) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stdlib", response_class=JSONResponse)
+    async def stdlib():
+        return {"serp_data": rows, "next_cursor": None}
+
+    @app.get("/orjson", response_class=ORJSONResponse)
+    async def orjson_only():
+        return {"serp_data": rows, "next_cursor": None}
+
+    @app.get("/model", response_class=ORJSONResponse, response_model=SerpDataListResponse)
+    async def model():
+        return {"serp_data": rows, "next_cursor": None}
+
+    return app
+
+async def time_requests(client: httpx.AsyncClient, path: str, total: int):
+    latencies = []
+    body = b""
+    for _ in range(total):
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        body = response.content
+    return latencies, body
+
+def time_compression(name: str, compress, body: bytes, total: int):
+    latencies = []
+    for _ in range(total):
+        start = time.perf_counter()
+        compressed = compress(body)
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"{name:<10} bytes={len(compressed):9d} "
+        f"ratio={len(body) / len(compressed):5.1f}x "
+        f"p50={statistics.median(latencies) * 1000:8.1f}ms"
+    )
+
+async def main_async(args):
+    app = build_app(make_rows(args.rows))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        body = b""
+        for path in ("/stdlib", "/orjson", "/model"):
+            await client.get(path)
+            latencies, body = await time_requests(client, path, args.requests)
+            print(
+                f"{path[1:]:<10} bytes={len(body):9d} "
+                f"p50={statistics.median(latencies) * 1000:8.1f}ms "
+                f"max={max(latencies) * 1000:8.1f}ms"
+            )
+
+    def gzip_body(data: bytes) -> bytes:
+        compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    time_compression("gzip", gzip_body, body, args.requests)
+    if compression.brotli is not None:
+        time_compression(
+            "brotli",
+            lambda data: compression.brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY),
+            body,
+            args.requests
+        )
+    else:
+        print("brotli     not installed (pip install brotli)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+if __name__ == '__main__':
+    main()
@@ -109,7 +109,7 @@ else
 fi
 
 # Run database migrations (if alembic is configured)
-if [ -d "alembic" ]; then
+if [ -f "alembic.ini" ]; then
     print_info "Running database migrations..."
     $DOCKER_COMPOSE -f $COMPOSE_FILE exec -T api alembic upgrade head || print_warning "Migration failed or not configured"
 fi
@@ -0,0 +1,73 @@
+import os
+
+# Settings are read at import time; unit tests never reach these services.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("APIFY_API_TOKEN", "test-apify-token")
+os.environ.setdefault("GEMINI_API_KEY", "test-gemini-key")
+
+import sys
+import uuid
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import sqltypes
+
+# The models use PostgreSQL column types; these let the tests create them on
+# SQLite. Production code passes ids as strings, which psycopg and asyncpg
+# accept but SQLAlchemy's SQLite UUID binding does not.
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+_uuid_bind_processor = sqltypes.Uuid.bind_processor
+
+def _bind_uuid_strings(self, dialect):
+    process = _uuid_bind_processor(self, dialect)
+    if process is None:
+        return None
+    return lambda value: process(uuid.UUID(value) if isinstance(value, str) else value)
+
+sqltypes.Uuid.bind_processor = _bind_uuid_strings
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point every loaded app module's Redis clients at one fake server."""
+    from app.integrations import redis_client
+    server = fakeredis.FakeServer()
+    sync_client = fakeredis.FakeRedis(server=server)
+    async_client = fakeredis.aioredis.FakeRedis(server=server)
+    get_redis, get_async_redis = redis_client.get_redis, redis_client.get_async_redis
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("app.") or module is None:
+            continue
+        if getattr(module, "get_redis", None) is get_redis:
+            monkeypatch.setattr(module, "get_redis", lambda: sync_client)
+        if getattr(module, "get_async_redis", None) is get_async_redis:
+            monkeypatch.setattr(module, "get_async_redis", lambda: async_client)
+    return sync_client
+
+@pytest.fixture
+def database(tmp_path, fake_redis):
+    """Sync and async session factories on a fresh SQLite database."""
+    import app.models  # noqa: F401 (registers every table)
+    from app.database.base import Base
+    from app.database.session import PrimarySession
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield (
+        sessionmaker(bind=engine),
+        async_sessionmaker(async_engine, class_=PrimarySession, expire_on_commit=False)
+    )
+    engine.dispose()
+    async_engine.sync_engine.dispose()
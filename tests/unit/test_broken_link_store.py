@@ -0,0 +1,76 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import select
+from app.models.links import BrokenLink
+from app.services.broken_link_store import persist_scan
+
+PROJECT_ID = uuid.uuid4()
+FIRST_SCAN = datetime(2024, 6, 1, 9)
+SECOND_SCAN = datetime(2024, 6, 8, 9)
+THIRD_SCAN = datetime(2024, 6, 15, 9)
+
+def link(broken_url, status_code=404, source_url="https://example.com/"):
+    return {"source_url": source_url, "broken_url": broken_url, "status_code": status_code}
+
+def links_by_url(db):
+    return {row.broken_url: row for row in db.scalars(select(BrokenLink).where(BrokenLink.project_id == PROJECT_ID))}
+
+def test_rescan_updates_known_links_and_resolves_missing_ones(database):
+    sync_session, _ = database
+    with sync_session() as db:
+        persist_scan(db, PROJECT_ID, [link("https://example.com/a"), link("https://example.com/b")], FIRST_SCAN)
+        result = persist_scan(db, PROJECT_ID, [link("https://example.com/a", 410)], SECOND_SCAN)
+        db.commit()
+
+        assert result == {"upserted": 1, "resolved": 1}
+        links = links_by_url(db)
+        a, b = links["https://example.com/a"], links["https://example.com/b"]
+        assert (a.status, a.status_code, a.first_detected, a.last_detected) == ("active", 410, FIRST_SCAN, SECOND_SCAN)
+        assert (b.status, b.resolved_at, b.last_detected) == ("resolved", SECOND_SCAN, FIRST_SCAN)
+
+def test_link_found_again_is_reactivated(database):
+    sync_session, _ = database
+    with sync_session() as db:
+        persist_scan(db, PROJECT_ID, [link("https://example.com/a")], FIRST_SCAN)
+        persist_scan(db, PROJECT_ID, [], SECOND_SCAN)
+        persist_scan(db, PROJECT_ID, [link("https://example.com/a")], THIRD_SCAN)
+        db.commit()
+
+        a = links_by_url(db)["https://example.com/a"]
+        assert (a.status, a.resolved_at, a.first_detected, a.last_detected) == ("active", None, FIRST_SCAN, THIRD_SCAN)
+        assert len(links_by_url(db)) == 1
+
+def test_partial_scan_resolves_nothing(database):
+    sync_session, _ = database
+    with sync_session() as db:
+        persist_scan(db, PROJECT_ID, [link("https://example.com/a"), link("https://example.com/b")], FIRST_SCAN)
+        result = persist_scan(db, PROJECT_ID, [link("https://example.com/a")], SECOND_SCAN, resolve_missing=False)
+        db.commit()
+
+        assert result["resolved"] == 0
+        assert {row.status for row in links_by_url(db).values()} == {"active"}
+
+def test_resolving_is_scoped_to_the_project(database):
+    sync_session, _ = database
+    other_project = uuid.uuid4()
+    with sync_session() as db:
+        persist_scan(db, other_project, [link("https://example.com/a")], FIRST_SCAN)
+        persist_scan(db, PROJECT_ID, [], SECOND_SCAN)
+        db.commit()
+
+        other = db.scalars(select(BrokenLink).where(BrokenLink.project_id == other_project)).one()
+        assert other.status == "active"
+
+def test_duplicates_and_batches_upsert_each_link_once(database):
+    sync_session, _ = database
+    found = [link(f"https://example.com/{i}") for i in range(5)]
+    # The same link reported twice, e.g. by two chunks; the last report wins.
+    found.append(link("https://example.com/0", 500))
+    with sync_session() as db:
+        result = persist_scan(db, PROJECT_ID, found, FIRST_SCAN, batch_size=2)
+        db.commit()
+
+        assert result == {"upserted": 5, "resolved": 0}
+        links = links_by_url(db)
+        assert len(links) == 5
+        assert links["https://example.com/0"].status_code == 500
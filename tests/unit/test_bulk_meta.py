@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.models.meta import MetaBulkJob
+from app.routers import meta
+from app.services.job_service import JobQueueUnavailable
+
+PROJECT_ID = uuid.uuid4()
+
+class FakeTask:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def apply_async(self, args=(), kwargs=None, task_id=None, **options):
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        self.sent.append((task_id, options))
+
+def _add_job(async_session, status, updated_at):
+    async def add():
+        async with async_session() as db:
+            job = MetaBulkJob(project_id=PROJECT_ID, urls=[], status=status, updated_at=updated_at)
+            db.add(job)
+            await db.commit()
+            return job.id
+    return asyncio.run(add())
+
+async def _resume(async_session, job_id):
+    async with async_session() as db:
+        try:
+            return (await meta.resume_bulk_meta_job(job_id, db, None))["status"]
+        except HTTPException as e:
+            return e.status_code
+
+@pytest.mark.parametrize("status, age, expected", [
+    ("failed", timedelta(0), "queued"),
+    ("running", timedelta(hours=1), "queued"),
+    ("queued", timedelta(hours=1), "queued"),
+    ("running", timedelta(0), 409),
+    ("queued", timedelta(0), 409),
+])
+def test_resume_takes_over_only_failed_or_stale_jobs(database, monkeypatch, status, age, expected):
+    _, async_session = database
+    task = FakeTask()
+    monkeypatch.setattr(meta, "generate_bulk_meta_task", task)
+    job_id = _add_job(async_session, status, datetime.utcnow() - age)
+    assert asyncio.run(_resume(async_session, job_id)) == expected
+    assert len(task.sent) == (1 if expected == "queued" else 0)
+
+def test_concurrent_resumes_enqueue_once(database, monkeypatch):
+    _, async_session = database
+    task = FakeTask()
+    monkeypatch.setattr(meta, "generate_bulk_meta_task", task)
+    job_id = _add_job(async_session, "running", datetime.utcnow() - timedelta(hours=1))
+
+    async def scenario():
+        return await asyncio.gather(_resume(async_session, job_id), _resume(async_session, job_id))
+
+    assert sorted(asyncio.run(scenario()), key=str) == [409, "queued"]
+    assert task.sent == [(str(job_id), {"priority": meta.PRIORITY_BULK})]
+
+def test_enqueue_failure_marks_the_job_failed(database, monkeypatch):
+    _, async_session = database
+    monkeypatch.setattr(meta, "generate_bulk_meta_task", FakeTask(fail=True))
+    job_id = _add_job(async_session, "failed", datetime.utcnow())
+
+    async def scenario():
+        with pytest.raises(JobQueueUnavailable):
+            await _resume(async_session, job_id)
+        async with async_session() as db:
+            return (await db.get(MetaBulkJob, job_id)).status
+
+    assert asyncio.run(scenario()) == "failed"
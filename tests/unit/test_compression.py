@@ -0,0 +1,109 @@
+import gzip
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, choose_encoding
+
+BODY = "x" * 2048
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # choose_encoding only checks that the module imported.
+    monkeypatch.setattr(compression, "brotli", object())
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("gzip;q=0.5", "gzip"),
+    ("gzip;q=bogus", None),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+])
+def test_choose_encoding_with_brotli(with_brotli, accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br", None),
+    ("br, gzip", "gzip"),
+    ("*", "gzip"),
+])
+def test_choose_encoding_without_brotli(without_brotli, accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+async def etagged(request):
+    return PlainTextResponse(BODY, headers={"ETag": '"v1"'})
+
+async def weak_etagged(request):
+    return PlainTextResponse(BODY, headers={"ETag": 'W/"v1"'})
+
+async def small(request):
+    return PlainTextResponse("small", headers={"ETag": '"v1"'})
+
+async def not_modified(request):
+    return Response(status_code=304, headers={"ETag": '"v1"'})
+
+async def streamed(request):
+    async def chunks():
+        for _ in range(4):
+            yield BODY
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+async def events(request):
+    async def chunks():
+        yield "data: " + BODY + "\n\n"
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+@pytest.fixture
+def client(without_brotli):
+    app = Starlette(routes=[
+        Route("/etagged", etagged),
+        Route("/weak", weak_etagged),
+        Route("/small", small),
+        Route("/not-modified", not_modified),
+        Route("/streamed", streamed),
+        Route("/events", events),
+    ])
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+def test_compressed_response_weakens_strong_etag(client):
+    response = client.get("/etagged", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(BODY)
+    assert response.text == BODY
+
+def test_weak_etag_is_kept(client):
+    response = client.get("/weak", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["ETag"] == 'W/"v1"'
+
+@pytest.mark.parametrize("path", ["/small", "/not-modified", "/events"])
+def test_passthrough_responses_stay_uncompressed(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    if path != "/events":
+        assert response.headers["ETag"] == '"v1"'
+
+def test_uncompressed_when_client_does_not_accept(client):
+    response = client.get("/etagged", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == '"v1"'
+
+def test_streamed_response_is_one_gzip_stream(client):
+    with client.stream("GET", "/streamed", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).decode() == BODY * 4
@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+import fakeredis
+import pytest
+import redis
+from sqlalchemy import select
+from app.models.job import Job
+from app.services import idempotency
+from app.services.idempotency import idempotency_key, normalize_params
+from app.services.job_service import JobService, JobSubmissionConflict
+
+PROJECT_ID = uuid.UUID("11111111-1111-1111-1111-111111111111")
+OWNER_ID = uuid.UUID("22222222-2222-2222-2222-222222222222")
+
+def test_normalize_params_sorts_keys_and_trims_strings():
+    assert normalize_params({"b": " x ", "a": {"d": 1, "c": "y "}}) == {"a": {"c": "y", "d": 1}, "b": "x"}
+
+def test_normalize_params_treats_scalar_lists_as_sets():
+    assert normalize_params(["b.com", " a.com", "b.com"]) == ["a.com", "b.com"]
+    assert normalize_params((3, 1, 2)) == [1, 2, 3]
+
+def test_normalize_params_keeps_order_of_structured_lists():
+    items = [{"url": "b"}, {"url": "a"}]
+    assert normalize_params(items) == items
+
+def test_equivalent_submissions_share_a_key():
+    first = idempotency_key("serp", PROJECT_ID, OWNER_ID, {"keywords": ["seo", "audit"], "country": "us"})
+    second = idempotency_key("serp", str(PROJECT_ID), OWNER_ID, {"country": " us", "keywords": ["audit", "seo", "seo"]})
+    assert first == second
+
+@pytest.mark.parametrize("change", [
+    {"job_type": "links"},
+    {"project_id": uuid.UUID("33333333-3333-3333-3333-333333333333")},
+    {"owner_id": uuid.UUID("44444444-4444-4444-4444-444444444444")},
+    {"params": {"keywords": ["seo"], "country": "gb"}},
+])
+def test_key_changes_with_each_component(change):
+    base = {"job_type": "serp", "project_id": PROJECT_ID, "owner_id": OWNER_ID, "params": {"keywords": ["seo"], "country": "us"}}
+    assert idempotency_key(**base) != idempotency_key(**{**base, **change})
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(idempotency, "get_async_redis", lambda: client)
+    return client
+
+def test_claim_returns_the_existing_holder(redis_client):
+    async def scenario():
+        assert await idempotency.claim("key", "job-1") is None
+        assert await idempotency.claim("key", "job-2") == "job-1"
+    asyncio.run(scenario())
+
+def test_replace_only_swaps_the_expected_holder(redis_client):
+    async def scenario():
+        await idempotency.claim("key", "job-1")
+        assert not await idempotency.replace("key", "job-0", "job-2")
+        assert await idempotency.replace("key", "job-1", "job-2")
+        assert await idempotency.claim("key", "job-3") == "job-2"
+    asyncio.run(scenario())
+
+def _submit(async_session, params=None):
+    async def submit():
+        async with async_session() as db:
+            job, created = await JobService(db).get_or_create_job(PROJECT_ID, OWNER_ID, "serp", params or {"keywords": ["seo"]})
+            return job.id, created
+    return submit()
+
+def test_duplicate_submission_attaches_to_the_queued_job(database):
+    _, async_session = database
+
+    async def scenario():
+        return await _submit(async_session), await _submit(async_session)
+
+    (first_id, first_created), (second_id, second_created) = asyncio.run(scenario())
+    assert (first_created, second_created) == (True, False)
+    assert first_id == second_id
+
+class UnavailableRedis:
+    async def set(self, *args, **kwargs):
+        raise redis.exceptions.ConnectionError("Redis is down")
+
+def test_submissions_still_create_jobs_without_redis(database, monkeypatch):
+    _, async_session = database
+    monkeypatch.setattr(idempotency, "get_async_redis", lambda: UnavailableRedis())
+
+    async def scenario():
+        return await _submit(async_session), await _submit(async_session)
+
+    (first_id, first_created), (second_id, second_created) = asyncio.run(scenario())
+    assert first_created and second_created
+    assert first_id != second_id
+
+def test_losing_every_replace_raises_instead_of_duplicating(database, monkeypatch):
+    _, async_session = database
+    failed_job_id = uuid.uuid4()
+
+    async def claim(key, job_id):
+        return str(failed_job_id)
+
+    async def replace(key, holder, job_id):
+        return False
+
+    async def scenario():
+        async with async_session() as db:
+            db.add(Job(id=failed_job_id, project_id=PROJECT_ID, owner_id=OWNER_ID, job_type="serp", status="failed"))
+            await db.commit()
+        monkeypatch.setattr(idempotency, "claim", claim)
+        monkeypatch.setattr(idempotency, "replace", replace)
+        with pytest.raises(JobSubmissionConflict):
+            await _submit(async_session)
+        async with async_session() as db:
+            return (await db.scalars(select(Job.id))).all()
+
+    assert asyncio.run(scenario()) == [failed_job_id]
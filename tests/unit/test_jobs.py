@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+import pytest
+from app.models.job import Job
+from app.services import job_service
+from app.services.job_service import JobQueueUnavailable, JobService, job_response, track_job, update_job
+
+PROJECT_ID = uuid.uuid4()
+OWNER_ID = uuid.uuid4()
+
+class FakeTask:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+
+    def apply_async(self, args=(), kwargs=None, task_id=None, **options):
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        self.sent.append((args, task_id, options))
+
+@pytest.fixture
+def sessions(database, monkeypatch):
+    sync_session, async_session = database
+    # Tasks update jobs through the module's own sessionmaker.
+    monkeypatch.setattr(job_service, "SessionLocal", sync_session)
+    return sync_session, async_session
+
+def _create_job(async_session):
+    async def create():
+        async with async_session() as db:
+            return await JobService(db).create_job(PROJECT_ID, OWNER_ID, "link_scan")
+    return asyncio.run(create())
+
+def _status(sync_session, job_id):
+    with sync_session() as db:
+        job = db.get(Job, job_id)
+        return job.status, job.progress, job.error
+
+def test_dispatch_uses_the_job_id_as_task_id(sessions):
+    _, async_session = sessions
+    task = FakeTask()
+
+    async def scenario():
+        async with async_session() as db:
+            service = JobService(db)
+            job = await service.create_job(PROJECT_ID, OWNER_ID, "link_scan")
+            await service.dispatch(job, task, args=("x",), priority=3)
+            return job
+
+    job = asyncio.run(scenario())
+    assert task.sent == [(("x",), str(job.id), {"priority": 3})]
+    assert job_response(job)["status"] == "queued"
+
+def test_failed_dispatch_marks_the_job_failed(sessions):
+    sync_session, async_session = sessions
+
+    async def scenario():
+        async with async_session() as db:
+            service = JobService(db)
+            job = await service.create_job(PROJECT_ID, OWNER_ID, "link_scan")
+            with pytest.raises(JobQueueUnavailable):
+                await service.dispatch(job, FakeTask(fail=True))
+            return job.id
+
+    status, _, error = _status(sync_session, asyncio.run(scenario()))
+    assert status == "failed"
+    assert "broker unavailable" in error
+
+def test_track_job_marks_running_then_failed(sessions):
+    sync_session, async_session = sessions
+    job = _create_job(async_session)
+
+    with pytest.raises(RuntimeError):
+        with track_job(str(job.id)):
+            assert _status(sync_session, job.id)[0] == "running"
+            raise RuntimeError("crawl failed")
+    assert _status(sync_session, job.id) == ("failed", 0, "crawl failed")
+
+def test_track_job_leaves_completion_to_the_caller(sessions):
+    sync_session, async_session = sessions
+    job = _create_job(async_session)
+
+    with track_job(str(job.id)):
+        pass
+    assert _status(sync_session, job.id)[0] == "running"
+
+def test_long_poll_wakes_on_update(sessions):
+    _, async_session = sessions
+    job = _create_job(async_session)
+
+    async def scenario():
+        async with async_session() as db:
+            service = JobService(db)
+            current = await service.get_job(job.id, owner_id=OWNER_ID)
+            waiter = asyncio.create_task(service.wait_for_change(current, "queued", 0, timeout=5))
+            await asyncio.sleep(0.1)
+            await asyncio.to_thread(update_job, str(job.id), status="running", progress=10)
+            return await asyncio.wait_for(waiter, 2)
+
+    changed = asyncio.run(scenario())
+    assert (changed.status, changed.progress) == ("running", 10)
+
+def test_long_poll_returns_unchanged_job_on_timeout(sessions):
+    _, async_session = sessions
+    job = _create_job(async_session)
+
+    async def scenario():
+        async with async_session() as db:
+            service = JobService(db)
+            current = await service.get_job(job.id)
+            return await service.wait_for_change(current, "queued", 0, timeout=0.2)
+
+    assert asyncio.run(scenario()).status == "queued"
+
+def test_get_job_is_scoped_to_owner_and_type(sessions):
+    _, async_session = sessions
+    job = _create_job(async_session)
+
+    async def scenario():
+        async with async_session() as db:
+            service = JobService(db)
+            return (
+                await service.get_job(job.id, owner_id=uuid.uuid4()),
+                await service.get_job(job.id, job_type="serp_comparison"),
+                await service.get_job(job.id, owner_id=OWNER_ID, job_type="link_scan"),
+            )
+
+    other_owner, other_type, found = asyncio.run(scenario())
+    assert other_owner is None and other_type is None
+    assert found.id == job.id
@@ -0,0 +1,79 @@
+import asyncio
+import base64
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.models.competitor import CompetitorAnalysis
+from app.models.links import BrokenLink
+from app.models.meta import MetaTag
+from app.models.serp import SerpHistory
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+COLUMNS = [SerpHistory.detected_at, SerpHistory.id]
+
+def test_cursor_round_trips_typed_values():
+    values = [datetime(2024, 5, 1, 8, 0, 30, 123456), uuid.uuid4()]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, COLUMNS) == values
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    encode_cursor(["2024-05-01T08:00:00"]),
+    encode_cursor(["yesterday", str(uuid.uuid4())]),
+    encode_cursor(["2024-05-01T08:00:00", "not-a-uuid"]),
+    encode_cursor([None, str(uuid.uuid4())]),
+])
+def test_malformed_cursor_raises_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, COLUMNS)
+
+def test_invalid_cursor_is_a_value_error():
+    assert issubclass(InvalidCursor, ValueError)
+
+metadata = MetaData()
+events = Table(
+    "events", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("name", String, nullable=False),
+)
+
+def test_pages_cover_every_row_once_across_timestamp_ties():
+    start = datetime(2024, 1, 1)
+    # Three rows per timestamp, so pages split inside a run of ties.
+    rows = [{"id": i, "created_at": start + timedelta(minutes=i // 3), "name": f"event {i}"} for i in range(20)]
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(events), rows)
+
+        seen = []
+        cursor = None
+        async with AsyncSession(engine) as db:
+            while True:
+                page, cursor = await paginate(db, select(events), [events.c.created_at, events.c.id], cursor, 7)
+                seen.extend(row["id"] for row in page)
+                if cursor is None:
+                    break
+        await engine.dispose()
+        return seen
+
+    expected = [row["id"] for row in sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)]
+    assert asyncio.run(scenario()) == expected
+
+@pytest.mark.parametrize("column", [
+    MetaTag.created_at,
+    CompetitorAnalysis.created_at,
+    BrokenLink.first_detected,
+    SerpHistory.detected_at,
+])
+def test_keyset_sort_columns_are_not_nullable(column):
+    # (NULL, id) < (x, y) is never true, so a NULL sort key would end paging.
+    assert not column.nullable
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from sqlalchemy import select
+from app.config import settings
+from app.models.user import User
+from app.routers import auth
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+PASSWORD = "correct horse"
+
+def rounds(password_hash):
+    return int(password_hash.split("$")[2])
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=2, max_pending=0)
+    yield hasher
+    hasher._get_executor().shutdown()
+
+def test_current_hash_needs_no_update(hasher):
+    async def scenario():
+        return await hasher.verify_and_update(PASSWORD, await hasher.hash(PASSWORD))
+
+    assert asyncio.run(scenario()) == (True, None)
+
+def test_outdated_cost_is_rehashed_on_verify(hasher):
+    valid, new_hash = asyncio.run(hasher.verify_and_update(PASSWORD, bcrypt.using(rounds=4).hash(PASSWORD)))
+    assert valid
+    assert rounds(new_hash) == settings.PASSWORD_BCRYPT_ROUNDS
+    assert bcrypt.verify(PASSWORD, new_hash)
+
+def test_wrong_password_is_never_rehashed(hasher):
+    assert asyncio.run(hasher.verify_and_update("wrong", bcrypt.using(rounds=4).hash(PASSWORD))) == (False, None)
+
+def test_requests_beyond_capacity_are_rejected(hasher):
+    async def scenario():
+        return await asyncio.gather(*[hasher.hash(PASSWORD) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert sum(isinstance(result, PasswordHasherBusy) for result in results) == 1
+    assert hasher.stats()["in_flight"] == 0
+
+def _stored_hash(sync_session):
+    with sync_session() as db:
+        return db.scalar(select(User.password_hash))
+
+def _login(async_session, password):
+    async def login():
+        async with async_session() as db:
+            try:
+                return await auth.login(auth.LoginRequest(email="user@example.com", password=password), db)
+            except HTTPException as e:
+                return e.status_code
+    return asyncio.run(login())
+
+@pytest.fixture
+def legacy_user(database, fake_redis):
+    sync_session, _ = database
+    with sync_session() as db:
+        db.add(User(email="user@example.com", password_hash=bcrypt.using(rounds=4).hash(PASSWORD)))
+        db.commit()
+
+def test_login_upgrades_an_outdated_hash(database, legacy_user):
+    sync_session, async_session = database
+    assert _login(async_session, PASSWORD)["token_type"] == "Bearer"
+    assert rounds(_stored_hash(sync_session)) == settings.PASSWORD_BCRYPT_ROUNDS
+    assert _login(async_session, PASSWORD)["token_type"] == "Bearer"
+
+def test_failed_login_keeps_the_stored_hash(database, legacy_user):
+    sync_session, async_session = database
+    assert _login(async_session, "wrong") == 401
+    assert rounds(_stored_hash(sync_session)) == 4
+
+def test_login_is_refused_while_the_hasher_is_saturated(database, legacy_user, monkeypatch):
+    _, async_session = database
+    monkeypatch.setattr(auth, "password_hasher", PasswordHasher(workers=0, max_pending=0))
+    assert _login(async_session, PASSWORD) == 503
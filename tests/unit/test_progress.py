@@ -0,0 +1,59 @@
+import pytest
+from app.services.broken_link_service import BrokenLinkService
+from app.workers import progress
+from app.workers.tasks import link_tasks
+
+JOB_ID = "job-1"
+
+def test_redelivered_chunk_is_counted_once(fake_redis):
+    progress.start_chunks(JOB_ID, 4)
+    progress.complete_chunk(JOB_ID, 0)
+    assert progress.complete_chunk(JOB_ID, 0) == {"completed_chunks": 1, "total_chunks": 4, "progress": 25}
+    assert progress.complete_chunk(JOB_ID, 1)["progress"] == 50
+
+def test_rerun_replaces_a_chunks_earlier_outcome(fake_redis):
+    progress.start_chunks(JOB_ID, 2)
+    progress.complete_chunk(JOB_ID, 0, failed=True)
+    assert progress.get_progress(JOB_ID)["failed_chunks"] == 1
+    progress.complete_chunk(JOB_ID, 0)
+    state = progress.get_progress(JOB_ID)
+    assert (state["completed_chunks"], state["failed_chunks"], state["status"]) == (1, 0, "processing")
+
+def test_restart_clears_completed_chunks(fake_redis):
+    progress.start_chunks(JOB_ID, 2)
+    progress.complete_chunk(JOB_ID, 0, failed=True)
+    progress.start_chunks(JOB_ID, 3)
+    state = progress.get_progress(JOB_ID)
+    assert (state["total_chunks"], state["completed_chunks"], state["failed_chunks"]) == (3, 0, 0)
+
+def test_finish_on_error_closes_progress_as_failed(fake_redis):
+    progress.start_chunks(JOB_ID, 1)
+    with pytest.raises(RuntimeError):
+        with progress.finish_on_error(JOB_ID):
+            raise RuntimeError("merge failed")
+    state = progress.get_progress(JOB_ID)
+    assert (state["status"], state["summary"]) == ("failed", {"error": "merge failed"})
+
+def test_unknown_job_has_no_progress(fake_redis):
+    assert progress.get_progress("missing") is None
+
+def test_chunk_task_redelivered_after_failure_reports_success(fake_redis, monkeypatch):
+    updates = []
+    monkeypatch.setattr(link_tasks, "update_job", lambda job_id, **fields: updates.append(fields))
+    outcomes = iter([RuntimeError("timeout"), [{"broken_url": "https://example.com/x"}]])
+
+    async def find_broken_links(self, pages):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(BrokenLinkService, "find_broken_links", find_broken_links)
+    progress.start_chunks(JOB_ID, 2)
+
+    assert link_tasks.check_links_chunk_task(JOB_ID, 1, []) == []
+    assert link_tasks.check_links_chunk_task(JOB_ID, 1, []) == [{"broken_url": "https://example.com/x"}]
+
+    state = progress.get_progress(JOB_ID)
+    assert (state["completed_chunks"], state["failed_chunks"]) == (1, 0)
+    assert updates == [{"progress": 50}, {"progress": 50}]
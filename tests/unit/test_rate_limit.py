@@ -0,0 +1,150 @@
+import asyncio
+import itertools
+import types
+import fakeredis
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.config import settings
+from app.middleware import rate_limit
+from app.middleware.rate_limit import MemoryBackend, RateLimit, RateLimitMiddleware, RedisBackend
+
+WINDOW = 60
+
+def allowed_at(limit: RateLimit, current: int, previous: int, elapsed: float) -> bool:
+    """Whether one more request fits ``elapsed`` seconds into the current
+    window, with no other requests arriving meanwhile."""
+    if elapsed >= 2 * WINDOW:
+        return True
+    if elapsed >= WINDOW:
+        current, previous, elapsed = 0, current, elapsed - WINDOW
+    weight = 1 - elapsed / WINDOW
+    return limit.estimate(current, previous, weight) + 1 <= limit.limit + 1e-9
+
+def test_estimate_weights_the_previous_window_by_its_overlap():
+    limit = RateLimit("key", 10)
+    assert limit.estimate(current=3, previous=8, weight=0.25) == 5
+    assert limit.estimate(current=3, previous=8, weight=1) == 11
+
+def test_retry_after_is_the_first_whole_second_a_request_fits():
+    for limit_value, current, previous, elapsed in itertools.product(range(1, 6), range(0, 8), range(0, 12), (0, 7.5, 30, 59.9)):
+        limit = RateLimit("key", limit_value)
+        if allowed_at(limit, current, previous, elapsed):
+            continue
+        wait = limit.retry_after(current, previous, elapsed, WINDOW)
+        assert wait >= 1
+        assert allowed_at(limit, current, previous, elapsed + wait), (limit_value, current, previous, elapsed)
+        assert not allowed_at(limit, current, previous, elapsed + wait - 1), (limit_value, current, previous, elapsed)
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, monkeypatch):
+    if request.param == "memory":
+        return MemoryBackend()
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(rate_limit, "get_async_redis", lambda: client)
+    return RedisBackend()
+
+def test_requests_over_the_limit_are_rejected_and_not_counted(backend):
+    limits = [RateLimit("{user:1}", 3)]
+
+    async def scenario():
+        results = [await backend.hit(limits, 100, 1.0, WINDOW) for _ in range(5)]
+        return [allowed for allowed, _ in results], results[-1][1]
+
+    allowed, counts = asyncio.run(scenario())
+    assert allowed == [True, True, True, False, False]
+    assert counts == [(3, 0)]
+
+def test_previous_window_decays_into_the_next(backend):
+    limits = [RateLimit("{user:1}", 4)]
+
+    async def scenario():
+        for _ in range(4):
+            await backend.hit(limits, 100, 1.0, WINDOW)
+        # Half a window later, the previous four count as two.
+        first = await backend.hit(limits, 101, 0.5, WINDOW)
+        second = await backend.hit(limits, 101, 0.5, WINDOW)
+        third = await backend.hit(limits, 101, 0.5, WINDOW)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first == (True, [(1, 4)])
+    assert second == (True, [(2, 4)])
+    assert third[0] is False
+
+def test_a_request_counts_against_every_limit_or_none(backend):
+    user_limit = RateLimit("{user:1}", 10)
+    route_limit = RateLimit("{user:1}:POST /serp/compare", 1)
+
+    async def scenario():
+        await backend.hit([user_limit, route_limit], 100, 1.0, WINDOW)
+        rejected = await backend.hit([user_limit, route_limit], 100, 1.0, WINDOW)
+        other_route = await backend.hit([user_limit], 100, 1.0, WINDOW)
+        return rejected, other_route
+
+    rejected, other_route = asyncio.run(scenario())
+    assert rejected == (False, [(1, 0), (1, 0)])
+    assert other_route == (True, [(2, 0)])
+
+def test_memory_backend_forgets_idle_counters():
+    backend = MemoryBackend()
+    asyncio.run(backend.hit([RateLimit("{ip:1}", 5)], 100, 1.0, WINDOW))
+    asyncio.run(backend.hit([RateLimit("{ip:2}", 5)], 102, 1.0, WINDOW))
+    assert list(backend._counters) == ["{ip:2}"]
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_WINDOW_SECONDS", WINDOW)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTES", {})
+    monkeypatch.setattr(settings, "RATE_LIMIT_EXEMPT_PATHS", ["/health"])
+    # 15 seconds into a window.
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(time=lambda: 100 * WINDOW + 15))
+
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/items", ok), Route("/health", ok)])
+    return TestClient(RateLimitMiddleware(app, backend=MemoryBackend()))
+
+def test_middleware_rejects_with_retry_after(client):
+    first = client.get("/items")
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert first.headers["X-RateLimit-Reset"] == str(101 * WINDOW)
+
+    assert client.get("/items").status_code == 200
+    rejected = client.get("/items")
+    assert rejected.status_code == 429
+    assert rejected.headers["X-RateLimit-Remaining"] == "0"
+    # This window's two requests decay to one only once the next window is
+    # half over: 45s to the boundary plus 30s.
+    assert rejected.headers["Retry-After"] == "75"
+
+def test_exempt_paths_are_not_counted(client):
+    for _ in range(3):
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+    assert client.get("/items").status_code == 200
+
+@pytest.mark.parametrize("peer, headers, expected", [
+    # Direct clients cannot choose their own address.
+    ("203.0.113.7", {b"x-forwarded-for": b"198.51.100.1"}, "203.0.113.7"),
+    ("172.28.0.5", {}, "172.28.0.5"),
+    ("172.28.0.5", {b"x-real-ip": b"198.51.100.1"}, "198.51.100.1"),
+    ("172.28.0.5", {b"x-forwarded-for": b"198.51.100.1"}, "198.51.100.1"),
+    # Entries left of the first untrusted one were sent by the client.
+    ("172.28.0.5", {b"x-forwarded-for": b"10.9.9.9, 198.51.100.1"}, "198.51.100.1"),
+    ("172.28.0.5", {b"x-forwarded-for": b"198.51.100.1, 172.28.0.9"}, "198.51.100.1"),
+    ("172.28.0.5", {b"x-forwarded-for": b"198.51.100.1", b"x-real-ip": b"10.9.9.9"}, "198.51.100.1"),
+])
+def test_client_ip_honours_forwarded_headers_from_trusted_proxies(monkeypatch, peer, headers, expected):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ["172.28.0.0/16"])
+    middleware = RateLimitMiddleware(None, backend=MemoryBackend())
+    scope = {"client": (peer, 51000), "headers": list(headers.items())}
+    assert middleware._client_ip(scope) == expected
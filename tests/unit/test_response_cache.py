@@ -0,0 +1,92 @@
+import asyncio
+import fakeredis
+import pytest
+from starlette.requests import Request
+from app.services import response_cache as response_cache_module
+from app.services.response_cache import (
+    SERP_ALL_PROJECTS_SCOPE,
+    SERP_RETENTION_SCOPE,
+    ResponseCache,
+    _matches,
+    serp_scopes,
+    serp_write_scopes,
+)
+
+ETAG = '"abc123"'
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    (' * ', True),
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", W/"abc123"', True),
+    ('"other"', False),
+    ('abc123', False),
+    ('"abc1234"', False),
+])
+def test_matches_uses_weak_comparison(if_none_match, expected):
+    assert _matches(if_none_match, ETAG) is expected
+
+def test_serp_writes_only_touch_their_project_and_unfiltered_reads():
+    written = set(serp_write_scopes("a"))
+    assert written & set(serp_scopes("a"))
+    assert written & set(serp_scopes())
+    assert not written & set(serp_scopes("b"))
+
+def test_retention_touches_every_serp_read():
+    for scopes in (serp_scopes("a"), serp_scopes("b"), serp_scopes()):
+        assert SERP_RETENTION_SCOPE in scopes
+    assert SERP_ALL_PROJECTS_SCOPE not in serp_scopes("a")
+
+def _request(path: str, if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers})
+
+@pytest.fixture
+def cache(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(response_cache_module, "get_async_redis", lambda: client)
+    return ResponseCache(max_entries=10, max_body_bytes=1024, ttl_seconds=60, version_ttl_seconds=3600, enabled=True)
+
+def test_revalidation_and_invalidation(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"rankings": [1, 2, 3]}
+
+    async def scenario():
+        first = await cache.respond(_request("/serp/a"), "user", serp_scopes("a"), compute)
+        etag = first.headers["ETag"]
+        revalidated = await cache.respond(_request("/serp/a", etag), "user", serp_scopes("a"), compute)
+        cached = await cache.respond(_request("/serp/a"), "user", serp_scopes("a"), compute)
+
+        await cache.invalidate_async(serp_write_scopes("b"))
+        untouched = await cache.respond(_request("/serp/a", etag), "user", serp_scopes("a"), compute)
+
+        await cache.invalidate_async(serp_write_scopes("a"))
+        changed = await cache.respond(_request("/serp/a", etag), "user", serp_scopes("a"), compute)
+        return first, revalidated, cached, untouched, changed
+
+    first, revalidated, cached, untouched, changed = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert revalidated.status_code == 304
+    assert cached.status_code == 200 and cached.body == first.body
+    assert untouched.status_code == 304
+    assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+    assert len(calls) == 2
+    assert (cache.misses, cache.hits, cache.not_modified) == (2, 1, 2)
+
+def test_etags_differ_per_user(cache):
+    async def compute():
+        return {}
+
+    async def scenario():
+        mine = await cache.respond(_request("/projects"), "user-1", ["project:1"], compute)
+        theirs = await cache.respond(_request("/projects"), "user-2", ["project:1"], compute)
+        return mine, theirs
+
+    mine, theirs = asyncio.run(scenario())
+    assert mine.headers["ETag"] != theirs.headers["ETag"]
@@ -0,0 +1,70 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from app.workers.celery_app import celery_app
+from app.workers.runtime import WorkerRuntime, run_async
+
+@pytest.fixture
+def runtime():
+    runtime = WorkerRuntime()
+    yield runtime
+    runtime.shutdown()
+
+async def current_loop():
+    return asyncio.get_running_loop()
+
+def test_coroutines_share_one_persistent_loop(runtime):
+    first = runtime.run(current_loop())
+    assert runtime.run(current_loop()) is first
+    assert first.is_running()
+
+def test_concurrent_tasks_overlap_on_the_loop(runtime):
+    def task():
+        return runtime.run(asyncio.sleep(0.2, result="done"))
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=task) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started < 0.6
+
+def test_exceptions_reach_the_caller(runtime):
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        runtime.run(fail())
+
+def test_timeout_cancels_the_coroutine(runtime):
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        runtime.run(slow(), timeout=0.1)
+    assert cancelled.wait(1)
+
+def test_forked_process_gets_a_fresh_loop(runtime):
+    parent_loop = runtime.run(current_loop())
+    runtime._pid = -1
+    assert runtime.run(current_loop()) is not parent_loop
+
+@celery_app.task(soft_time_limit=0.3)
+def sleepy_task():
+    return run_async(asyncio.sleep(5))
+
+def test_soft_time_limit_is_enforced_without_prefork():
+    started = time.monotonic()
+    result = sleepy_task.apply()
+    assert isinstance(result.result, SoftTimeLimitExceeded)
+    assert time.monotonic() - started < 2
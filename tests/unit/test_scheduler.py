@@ -0,0 +1,105 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from app.config import settings
+from app.models.job import Job
+from app.models.project import Project
+from app.models.schedule import Schedule
+from app.models.user import User
+from app.services.scheduler import SchedulerService
+from app.workers.tasks import schedule_tasks
+
+NOW = datetime(2024, 6, 1, 12, 0, 10)
+
+def hourly(next_run_at: datetime) -> Schedule:
+    return Schedule(id=uuid.uuid4(), cron_expression="0 * * * *", jitter_seconds=0, next_run_at=next_run_at)
+
+@pytest.fixture
+def policy(monkeypatch):
+    def set_policy(value: str):
+        monkeypatch.setattr(settings, "SCHEDULER_CATCHUP_POLICY", value)
+    return set_policy
+
+def test_on_time_run_fires_under_every_policy(policy):
+    for value in ("skip", "once", "all"):
+        policy(value)
+        schedule = hourly(datetime(2024, 6, 1, 12))
+        assert SchedulerService(None)._advance(schedule, NOW) == [datetime(2024, 6, 1, 12)]
+        assert schedule.next_run_at == datetime(2024, 6, 1, 13)
+        assert schedule.last_run_at == NOW
+
+def test_skip_drops_missed_runs(policy):
+    policy("skip")
+    schedule = hourly(datetime(2024, 6, 1, 9))
+    assert SchedulerService(None)._advance(schedule, NOW) == []
+    assert schedule.next_run_at == datetime(2024, 6, 1, 13)
+    assert schedule.last_run_at is None
+
+def test_once_collapses_missed_runs(policy):
+    policy("once")
+    schedule = hourly(datetime(2024, 6, 1, 9))
+    assert SchedulerService(None)._advance(schedule, NOW) == [datetime(2024, 6, 1, 9)]
+    assert schedule.next_run_at == datetime(2024, 6, 1, 13)
+
+def test_all_replays_missed_runs_up_to_the_cap(policy, monkeypatch):
+    policy("all")
+    monkeypatch.setattr(settings, "SCHEDULER_MAX_CATCHUP_RUNS", 2)
+    schedule = hourly(datetime(2024, 6, 1, 9))
+    assert SchedulerService(None)._advance(schedule, NOW) == [datetime(2024, 6, 1, 9), datetime(2024, 6, 1, 10)]
+    # The rest are picked up by the following ticks.
+    assert schedule.next_run_at == datetime(2024, 6, 1, 11)
+
+class FlakyBroker:
+    def __init__(self):
+        self.down = True
+        self.sent = []
+
+    def apply_async(self, args=(), kwargs=None, task_id=None, **options):
+        if self.down:
+            raise ConnectionError("broker unavailable")
+        self.sent.append(args[1])
+
+def test_failed_dispatch_is_retried_by_the_next_tick(database, policy, monkeypatch):
+    policy("all")
+    _, async_session = database
+    broker = FlakyBroker()
+    monkeypatch.setattr(schedule_tasks, "AsyncSessionLocal", async_session)
+    monkeypatch.setattr(schedule_tasks, "_task_call", lambda task_type, job_id, project, params: (broker, (job_id, params["n"]), {}))
+    first_run = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+
+    async def scenario():
+        async with async_session() as db:
+            user = User(email="owner@example.com", password_hash="x")
+            db.add(user)
+            await db.flush()
+            project = Project(name="Site", domain="example.com", owner_id=user.id)
+            db.add(project)
+            await db.flush()
+            schedule = hourly(first_run)
+            schedule.project_id = project.id
+            schedule.task_type = "link_scan"
+            schedule.params = {"n": 1}
+            db.add(schedule)
+            await db.commit()
+
+        down = await schedule_tasks._tick()
+        async with async_session() as db:
+            rewound_to = (await db.get(Schedule, schedule.id)).next_run_at
+
+        broker.down = False
+        up = await schedule_tasks._tick()
+        async with async_session() as db:
+            advanced_to = (await db.get(Schedule, schedule.id)).next_run_at
+            statuses = sorted((await db.scalars(select(Job.status))).all())
+        return down, rewound_to, up, advanced_to, statuses
+
+    down, rewound_to, up, advanced_to, statuses = asyncio.run(scenario())
+    assert down == (1, 0)
+    assert rewound_to == first_run
+    # Every missed occurrence, including the one that failed, is dispatched.
+    assert up == (1, 3)
+    assert len(broker.sent) == 3
+    assert advanced_to > datetime.utcnow()
+    assert statuses == ["failed", "queued", "queued", "queued"]
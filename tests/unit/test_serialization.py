@@ -0,0 +1,66 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+import msgpack
+import pytest
+from app.config import settings
+from app.workers import serialization
+from app.workers.serialization import FRAME_RAW, FRAME_REF, FRAME_ZSTD, FileBlobStore, dumps, loads
+
+PAYLOAD = {
+    "job_id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "created_at": datetime(2024, 3, 1, 12, 30, 15, 250000),
+    "day": date(2024, 3, 1),
+    "price": Decimal("19.99"),
+    "raw": b"\x00\xff",
+    "keywords": ["seo", "audit"],
+    "counts": {1: 2},
+    "nothing": None,
+}
+
+@pytest.fixture
+def thresholds(monkeypatch):
+    def set_thresholds(compression: int, offload: int):
+        monkeypatch.setattr(settings, "CELERY_COMPRESSION_THRESHOLD", compression)
+        monkeypatch.setattr(settings, "CELERY_OFFLOAD_THRESHOLD", offload)
+    return set_thresholds
+
+def test_small_payload_is_sent_raw(thresholds):
+    thresholds(compression=1 << 20, offload=1 << 30)
+    data = dumps(PAYLOAD)
+    assert data[:1] == FRAME_RAW
+    assert loads(data) == PAYLOAD
+
+def test_large_payload_is_compressed(thresholds):
+    thresholds(compression=0, offload=1 << 30)
+    payload = {**PAYLOAD, "pages": ["https://example.com/page"] * 1000}
+    data = dumps(payload)
+    assert data[:1] == FRAME_ZSTD
+    assert len(data) < len(msgpack.packb(payload, default=serialization._default))
+    assert loads(data) == payload
+
+def test_oversized_payload_is_offloaded(thresholds, monkeypatch, tmp_path):
+    thresholds(compression=0, offload=0)
+    store = FileBlobStore(str(tmp_path))
+    monkeypatch.setattr(serialization, "get_blob_store", lambda: store)
+    data = dumps(PAYLOAD)
+    assert data[:1] == FRAME_REF
+    assert (tmp_path / data[1:].decode()).exists()
+    assert loads(data) == PAYLOAD
+
+def test_expired_offloaded_payload_raises(monkeypatch, tmp_path):
+    monkeypatch.setattr(serialization, "get_blob_store", lambda: FileBlobStore(str(tmp_path)))
+    with pytest.raises(KeyError):
+        loads(FRAME_REF + b"missing")
+
+def test_str_payload_from_transport_is_accepted(thresholds):
+    thresholds(compression=0, offload=1 << 30)
+    assert loads(dumps(PAYLOAD).decode("latin-1")) == PAYLOAD
+
+def test_unknown_frame_marker_is_rejected():
+    with pytest.raises(ValueError):
+        loads(b"\x7fpayload")
+
+def test_unsupported_type_is_rejected():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
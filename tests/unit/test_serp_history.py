@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+from datetime import date, datetime
+from sqlalchemy import select
+from app.models.serp import SerpHistory, SerpRankDaily, SerpRankWeekly
+from app.services.serp_history import choose_granularity, record_rankings
+from app.services.serp_service import SerpService
+
+PROJECT_ID = uuid.uuid4()
+
+def snapshot(*positions_by_domain):
+    return [{
+        "keyword": "seo tools",
+        "rankings": [{"domain": domain, "position": position} for domain, position in positions_by_domain]
+    }]
+
+def test_rollups_track_best_worst_average_and_latest(database):
+    sync_session, _ = database
+    with sync_session() as db:
+        # example.com holds two positions in the first SERP; only its best counts.
+        record_rankings(db, PROJECT_ID, snapshot(("example.com", 2), ("other.com", 3), ("example.com", 5)), datetime(2024, 6, 5, 9))
+        record_rankings(db, PROJECT_ID, snapshot(("example.com", 7)), datetime(2024, 6, 5, 18))
+        record_rankings(db, PROJECT_ID, snapshot(("example.com", 4)), datetime(2024, 6, 5, 12))
+        db.commit()
+
+        assert len(db.scalars(select(SerpHistory)).all()) == 5
+        daily = db.scalars(select(SerpRankDaily).where(SerpRankDaily.domain == "example.com")).one()
+        assert daily.bucket == date(2024, 6, 5)
+        assert (daily.best_rank, daily.worst_rank, daily.rank_sum, daily.samples) == (2, 7, 13, 3)
+        # Snapshots may arrive out of order; the latest by time wins.
+        assert (daily.last_rank, daily.last_seen_at) == (7, datetime(2024, 6, 5, 18))
+        weekly = db.scalars(select(SerpRankWeekly).where(SerpRankWeekly.domain == "example.com")).one()
+        assert weekly.bucket == date(2024, 6, 3)
+        assert weekly.samples == 3
+
+def test_snapshot_without_domains_writes_nothing(database):
+    sync_session, _ = database
+    with sync_session() as db:
+        assert record_rankings(db, PROJECT_ID, snapshot((None, 1))) == 0
+        assert db.scalars(select(SerpRankDaily)).all() == []
+
+def test_weekly_history_includes_the_week_containing_start(database):
+    sync_session, async_session = database
+    with sync_session() as db:
+        # Monday, and the Tuesday of the week after.
+        record_rankings(db, PROJECT_ID, snapshot(("example.com", 3)), datetime(2024, 6, 3, 9))
+        record_rankings(db, PROJECT_ID, snapshot(("example.com", 5)), datetime(2024, 6, 11, 9))
+        db.commit()
+
+    async def history(granularity):
+        async with async_session() as db:
+            # Starts on a Wednesday.
+            return await SerpService().get_rank_history(
+                db, PROJECT_ID, ["seo tools"], domain="example.com",
+                start=datetime(2024, 6, 5, 10), end=datetime(2024, 6, 30), granularity=granularity
+            )
+
+    weekly = asyncio.run(history("weekly"))
+    assert [point["date"] for point in weekly["series"][0]["points"]] == ["2024-06-03", "2024-06-10"]
+    daily = asyncio.run(history("daily"))
+    assert [point["date"] for point in daily["series"][0]["points"]] == ["2024-06-11"]
+
+def test_granularity_follows_range_and_retention():
+    now = datetime(2024, 6, 30)
+    assert choose_granularity(datetime(2024, 6, 1), now, now) == "raw"
+    assert choose_granularity(datetime(2024, 3, 1), now, now) == "daily"
+    assert choose_granularity(datetime(2023, 1, 1), now, now) == "weekly"
+    # Short, but older than raw retention.
+    assert choose_granularity(datetime(2024, 1, 1), datetime(2024, 1, 10), now) == "daily"
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+import pytest
+from app.models.user import User
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import INVALIDATION_CHANNEL, UserCache, materialize, user_fields
+
+def fields(user_id, role="manager"):
+    return {"id": user_id, "email": f"{user_id}@example.com", "role": role, "created_at": None}
+
+def make_cache(**options):
+    return UserCache(**{"max_size": 10, "ttl_seconds": 60, "redis_ttl_seconds": 60, "use_redis": False, **options})
+
+@pytest.fixture
+def cache(fake_redis, monkeypatch):
+    cache = make_cache(use_redis=True)
+    # Session events invalidate through the module-level instance.
+    monkeypatch.setattr(user_cache_module, "user_cache", cache)
+    return cache
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_size=2)
+
+    async def scenario():
+        await cache.set("a", fields("a"))
+        await cache.set("b", fields("b"))
+        await cache.get("a")
+        await cache.set("c", fields("c"))
+        return [await cache.get(user_id) is not None for user_id in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+    assert cache.stats()["evictions"] == 1
+
+def test_expired_entry_is_a_miss():
+    cache = make_cache(ttl_seconds=0)
+
+    async def scenario():
+        await cache.set("a", fields("a"))
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) is None
+    assert cache.stats()["misses"] == 1
+
+def test_cold_process_is_filled_from_redis(cache):
+    warm = make_cache(use_redis=True)
+
+    async def scenario():
+        await warm.set("a", fields("a"))
+        first = await cache.get("a")
+        second = await cache.get("a")
+        return first, second
+
+    assert asyncio.run(scenario()) == (fields("a"), fields("a"))
+    assert (cache.redis_hits, cache.hits) == (1, 1)
+
+def test_materialized_user_round_trips_cached_fields():
+    user = User(id=uuid.uuid4(), email="a@example.com", role="admin", created_at=datetime(2024, 1, 1))
+    assert user_fields(materialize(user_fields(user))) == user_fields(user)
+
+def test_invalidate_drops_every_tier_and_publishes(cache, fake_redis):
+    pubsub = fake_redis.pubsub()
+    pubsub.subscribe(INVALIDATION_CHANNEL)
+    pubsub.get_message(timeout=1)
+    asyncio.run(cache.set("a", fields("a")))
+
+    cache.invalidate(["a"])
+
+    assert cache.stats()["size"] == 0
+    assert fake_redis.get("user_cache:a") is None
+    assert json.loads(pubsub.get_message(timeout=1)["data"]) == ["a"]
+
+def test_listener_applies_invalidations_from_other_processes(cache):
+    other_process = make_cache(use_redis=True)
+
+    async def scenario():
+        listener = asyncio.create_task(cache.listen())
+        await asyncio.sleep(0.1)
+        await cache.set("a", fields("a"))
+        await cache.set("b", fields("b"))
+        await other_process.invalidate_async(["a"])
+        await asyncio.sleep(0.1)
+        listener.cancel()
+        return cache._get_local("a"), cache._get_local("b")
+
+    assert asyncio.run(scenario()) == (None, fields("b"))
+
+def _add_user(sync_session):
+    with sync_session() as db:
+        user = User(email="user@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return str(user.id)
+
+def _cache_user(cache, user_id):
+    asyncio.run(cache.set(user_id, fields(user_id)))
+
+@pytest.mark.parametrize("change, invalidated", [
+    ({"role": "admin"}, True),
+    ({"password_hash": "y"}, True),
+    ({"email": "other@example.com"}, True),
+    ({"created_at": datetime(2024, 1, 1)}, False),
+])
+def test_committing_a_sensitive_change_invalidates(database, cache, change, invalidated):
+    sync_session, _ = database
+    user_id = _add_user(sync_session)
+    _cache_user(cache, user_id)
+
+    with sync_session() as db:
+        user = db.get(User, uuid.UUID(user_id))
+        for field, value in change.items():
+            setattr(user, field, value)
+        db.commit()
+
+    assert (cache._get_local(user_id) is None) == invalidated
+
+def test_rolled_back_change_keeps_the_entry(database, cache):
+    sync_session, _ = database
+    user_id = _add_user(sync_session)
+    _cache_user(cache, user_id)
+
+    with sync_session() as db:
+        db.get(User, uuid.UUID(user_id)).role = "admin"
+        db.flush()
+        db.rollback()
+
+    assert cache._get_local(user_id) is not None
+
+def test_deleting_a_user_invalidates(database, cache):
+    sync_session, _ = database
+    user_id = _add_user(sync_session)
+    _cache_user(cache, user_id)
+
+    with sync_session() as db:
+        db.delete(db.get(User, uuid.UUID(user_id)))
+        db.commit()
+
+    assert cache._get_local(user_id) is None
+
+def test_request_session_invalidates_after_commit(database, cache):
+    sync_session, async_session = database
+    user_id = _add_user(sync_session)
+    _cache_user(cache, user_id)
+
+    async def scenario():
+        async with async_session() as db:
+            user = await db.get(User, uuid.UUID(user_id))
+            user.role = "admin"
+            await db.commit()
+
+    asyncio.run(scenario())
+    assert cache._get_local(user_id) is None